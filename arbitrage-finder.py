@@ -1,10 +1,28 @@
+import os
 import logging
 from datetime import datetime
-from itertools import combinations
+from collections import Counter
+from itertools import chain, combinations
+import numpy as np
 import pandas as pd
+from event_matcher import cluster_events
 
 logger = logging.getLogger("ArbitrageBot.ArbitrageFinder")
 
+# Event matching across bookmakers: "exact" requires identical names, "fuzzy" clusters similar names
+# (fuzzy catches differently spelled listings but costs far more per cycle, so it is opt-in)
+EVENT_MATCHING = os.getenv("EVENT_MATCHING", "exact")
+
+# Detection engine: "python" evaluates events one by one, "vectorized" evaluates them all in NumPy,
+# "incremental" keeps best prices between calls and only re-evaluates events whose quotes changed
+ARBITRAGE_ENGINE = os.getenv("ARBITRAGE_ENGINE", "python")
+
+# Total implied probability below which a set of best prices is reported as an arbitrage
+ARBITRAGE_THRESHOLD = 0.98
+
+# Total stake the recommended stakes are expressed against
+TOTAL_STAKE = 100
+
 def calculate_arbitrage(odds_list):
     """
     Calculate if there's an arbitrage opportunity in the given odds
@@ -16,11 +34,11 @@ def calculate_arbitrage(odds_list):
     
     # If total implied probability is less than 1, there's an arbitrage opportunity
     # The lower the total, the better the opportunity
-    if total_implied_prob < 0.98:  # Allow for a small margin for better opportunities
+    if total_implied_prob < ARBITRAGE_THRESHOLD:  # Allow for a small margin for better opportunities
         arbitrage_pct = (1 - total_implied_prob) * 100
         
         # Calculate optimal stake allocation
-        total_stake = 100  # Assuming a $100 total stake
+        total_stake = TOTAL_STAKE  # Assuming a $100 total stake
         stakes = [(prob / total_implied_prob) * total_stake for prob in implied_probs]
         
         # Calculate profit
@@ -39,8 +57,19 @@ def calculate_arbitrage(odds_list):
         "total_implied_probability": total_implied_prob
     }
 
-def find_matching_events(odds_data):
+def is_complete(best_odds):
+    """
+    Whether every selection has a usable best price
+    Parsers default missing odds to 0.0; a selection no bookmaker prices above zero
+    leaves the market incomplete, and leaving it out would understate the implied total.
+    """
+    return all(odd["odds"] > 0 for odd in best_odds.values())
+
+def find_matching_events(odds_data, matching=None):
     """Group events that match across different bookmakers"""
+    if (matching or EVENT_MATCHING) == "fuzzy":
+        return cluster_events(odds_data)
+    
     matched_events = {}
     
     # Group by normalized event name
@@ -52,14 +81,57 @@ def find_matching_events(odds_data):
     
     return matched_events
 
-def find_arbitrage_opportunities(odds_data):
-    """Find all arbitrage opportunities in the given odds data"""
+def build_opportunity(event_odds, best_odds, arbitrage_pct, stakes, guaranteed_profit):
+    """Format an arbitrage opportunity from the best quote per selection"""
+    opportunity = {
+        "type": "arbitrage",
+        "event_name": event_odds[0]["event_name"],
+        "sport": event_odds[0]["sport"],
+        "market": event_odds[0]["market"],
+        "arbitrage_percentage": arbitrage_pct,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "selections": []
+    }
+    
+    # Add details for each selection
+    for i, (selection, odd) in enumerate(best_odds.items()):
+        opportunity["selections"].append({
+            "selection": selection,
+            "bookmaker": odd["bookmaker"],
+            "odds": odd["odds"],
+            "recommended_stake": stakes[i]
+        })
+    
+    # Calculate guaranteed profit
+    opportunity["guaranteed_profit_per_100"] = guaranteed_profit
+    
+    logger.info(f"Found arbitrage opportunity: {opportunity['event_name']} - {opportunity['arbitrage_percentage']:.2f}%")
+    return opportunity
+
+def find_arbitrage_opportunities(odds_data, engine=None, matching=None):
+    """Find all arbitrage opportunities in the given odds data (a list of quotes or an OddsBatch)"""
     logger.info("Searching for arbitrage opportunities")
     
-    opportunities = []
+    engine = engine or ARBITRAGE_ENGINE
+    if engine == "incremental":
+        return get_incremental_engine().update(odds_data)
     
     # Match events across bookmakers
-    matched_events = find_matching_events(odds_data)
+    matched_events = find_matching_events(odds_data, matching)
+    
+    if engine == "vectorized":
+        opportunities = evaluate_events_vectorized(matched_events)
+    else:
+        opportunities = evaluate_events(matched_events)
+    
+    # Sort opportunities by arbitrage percentage (best first)
+    opportunities.sort(key=lambda x: x["arbitrage_percentage"], reverse=True)
+    
+    return opportunities
+
+def evaluate_events(matched_events):
+    """Check each matched event for arbitrage one at a time"""
+    opportunities = []
     
     # For each event, look for arbitrage opportunities
     for event_key, event_odds in matched_events.items():
@@ -78,8 +150,8 @@ def find_arbitrage_opportunities(odds_data):
             best_odd = max(odds_list, key=lambda x: x["odds"])
             best_odds[selection] = best_odd
         
-        # We need at least 2 outcomes (usually home/away) to check for arbitrage
-        if len(best_odds) >= 2:
+        # We need at least 2 outcomes (usually home/away) to check for arbitrage, each with a price
+        if len(best_odds) >= 2 and is_complete(best_odds):
             # Extract decimal odds for each outcome
             odds_values = [odd["odds"] for odd in best_odds.values()]
             
@@ -87,33 +159,329 @@ def find_arbitrage_opportunities(odds_data):
             arb_result = calculate_arbitrage(odds_values)
             
             if arb_result["arbitrage_exists"]:
-                # Format the opportunity details
-                opportunity = {
-                    "type": "arbitrage",
-                    "event_name": event_odds[0]["event_name"],
-                    "sport": event_odds[0]["sport"],
-                    "market": event_odds[0]["market"],
-                    "arbitrage_percentage": arb_result["arbitrage_percentage"],
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "selections": []
-                }
-                
-                # Add details for each selection
-                for i, (selection, odd) in enumerate(best_odds.items()):
-                    opportunity["selections"].append({
-                        "selection": selection,
-                        "bookmaker": odd["bookmaker"],
-                        "odds": odd["odds"],
-                        "recommended_stake": arb_result["optimal_stakes"][i]
-                    })
-                
-                # Calculate guaranteed profit
-                opportunity["guaranteed_profit_per_100"] = arb_result["guaranteed_profit_per_100"]
-                
-                opportunities.append(opportunity)
-                logger.info(f"Found arbitrage opportunity: {opportunity['event_name']} - {opportunity['arbitrage_percentage']:.2f}%")
+                opportunities.append(build_opportunity(
+                    event_odds, best_odds,
+                    arb_result["arbitrage_percentage"],
+                    arb_result["optimal_stakes"],
+                    arb_result["guaranteed_profit_per_100"]
+                ))
     
-    # Sort opportunities by arbitrage percentage (best first)
-    opportunities.sort(key=lambda x: x["arbitrage_percentage"], reverse=True)
+    return opportunities
+
+def evaluate_events_vectorized(matched_events):
+    """
+    Check every matched event for arbitrage at once
+    Quotes are pivoted into an events x selections x bookmakers price array; the best
+    price per outcome, implied-probability sums, arbitrage percentages and stakes are
+    computed in bulk, and Python only formats the events that turn out to be arbitrages.
+    Selections keep their first-seen order and ties go to the earliest quote, as in
+    evaluate_events, so the opportunities are the same.
+    """
+    events = list(matched_events.values())
+    quotes = list(chain.from_iterable(events))
+    if not quotes:
+        return []
+    
+    # Event, selection and bookmaker index of every quote
+    sizes = np.fromiter(map(len, events), dtype=np.int64, count=len(events))
+    event_idx = np.repeat(np.arange(len(events)), sizes)
+    selection_codes, selection_names = pd.factorize(np.array([odd["selection"] for odd in quotes], dtype=object))
+    bookmaker_idx, _ = pd.factorize(np.array([odd["bookmaker"] for odd in quotes], dtype=object))
+    prices = np.array([odd["odds"] for odd in quotes], dtype=np.float64)
+    
+    # Number selections within each event in first-seen order: quotes are grouped by event,
+    # so each event's (event, selection) pairs get consecutive first-seen codes
+    pair_idx, _ = pd.factorize(event_idx * len(selection_names) + selection_codes)
+    pair_event = np.zeros(pair_idx.max() + 1, dtype=np.int64)
+    pair_event[pair_idx] = event_idx
+    first_pair = np.full(len(events), len(pair_event), dtype=np.int64)
+    np.minimum.at(first_pair, pair_event, np.arange(len(pair_event)))
+    selection_idx = pair_idx - first_pair[event_idx]
+    selection_counts = np.bincount(pair_event, minlength=len(events))
+    
+    # events x selections x bookmakers, 0 where a bookmaker does not price a selection
+    price_cube = np.zeros((len(events), selection_counts.max(), bookmaker_idx.max() + 1))
+    np.maximum.at(price_cube, (event_idx, selection_idx, bookmaker_idx), prices)
+    best = price_cube.max(axis=2)
+    
+    implied = np.divide(1.0, best, out=np.zeros_like(best), where=best > 0)
+    total_implied = implied.sum(axis=1)
+    # Events with a selection no bookmaker prices above zero are incomplete, as in is_complete
+    complete = (best > 0).sum(axis=1) == selection_counts
+    arbitrage = (selection_counts >= 2) & complete & (total_implied < ARBITRAGE_THRESHOLD)
+    if not arbitrage.any():
+        return []
+    
+    arb_events = np.flatnonzero(arbitrage)
+    arb_implied = implied[arb_events]
+    arb_total = total_implied[arb_events]
+    arbitrage_pct = (1 - arb_total) * 100
+    stakes = arb_implied / arb_total[:, None] * TOTAL_STAKE
+    guaranteed_profit = stakes[:, 0] * (best[arb_events, 0] - 1) - stakes[:, 1:].sum(axis=1)
+    
+    # Earliest quote offering the best price for each selection of the arbitrage events
+    is_best = arbitrage[event_idx] & (prices == best[event_idx, selection_idx])
+    best_quote = np.full(best.shape, len(quotes), dtype=np.int64)
+    np.minimum.at(best_quote, (event_idx[is_best], selection_idx[is_best]), np.flatnonzero(is_best))
+    
+    opportunities = []
+    for row, event in enumerate(arb_events):
+        count = selection_counts[event]
+        best_odds = {}
+        for quote in best_quote[event, :count]:
+            best_odds[quotes[quote]["selection"]] = quotes[quote]
+        opportunities.append(build_opportunity(
+            events[event], best_odds,
+            float(arbitrage_pct[row]),
+            [float(stake) for stake in stakes[row, :count]],
+            float(guaranteed_profit[row])
+        ))
     
     return opportunities
+
+class SelectionPrices:
+    """Quotes for one selection of one event, with the best and runner-up price"""
+    
+    def __init__(self):
+        self.quotes = {}
+        self.best = None
+        self.runner_up = None
+    
+    def highest(self, exclude=None):
+        """Best quote from any bookmaker other than exclude"""
+        candidates = [quote for bookmaker, quote in self.quotes.items() if bookmaker != exclude]
+        return max(candidates, key=lambda x: x["odds"]) if candidates else None
+    
+    def set(self, quote):
+        """Add or reprice one bookmaker's quote; ties keep the current best"""
+        bookmaker = quote["bookmaker"]
+        self.quotes[bookmaker] = quote
+        best, runner_up = self.best, self.runner_up
+        
+        if best is not None and best["bookmaker"] == bookmaker:
+            if runner_up is None or quote["odds"] >= runner_up["odds"]:
+                self.best = quote
+            else:
+                # The best price dropped below the runner-up, which takes over
+                self.best = runner_up
+                self.runner_up = self.highest(exclude=runner_up["bookmaker"])
+        elif runner_up is not None and runner_up["bookmaker"] == bookmaker:
+            if quote["odds"] > best["odds"]:
+                self.best, self.runner_up = quote, best
+            elif quote["odds"] >= runner_up["odds"]:
+                self.runner_up = quote
+            else:
+                self.runner_up = self.highest(exclude=best["bookmaker"])
+        elif best is None or quote["odds"] > best["odds"]:
+            self.best, self.runner_up = quote, best
+        elif runner_up is None or quote["odds"] > runner_up["odds"]:
+            self.runner_up = quote
+    
+    def remove(self, bookmaker):
+        """Drop a bookmaker's quote"""
+        self.quotes.pop(bookmaker, None)
+        if self.best is not None and self.best["bookmaker"] == bookmaker:
+            self.best = self.runner_up
+            self.runner_up = self.highest(exclude=self.best["bookmaker"]) if self.best else None
+        elif self.runner_up is not None and self.runner_up["bookmaker"] == bookmaker:
+            self.runner_up = self.highest(exclude=self.best["bookmaker"])
+
+class EventPrices:
+    """Per-selection prices for one matched event"""
+    
+    def __init__(self, info):
+        self.info = info
+        self.selections = {}
+    
+    def best_odds(self):
+        return {
+            selection: prices.best
+            for selection, prices in self.selections.items()
+            if prices.best is not None
+        }
+
+class IncrementalArbitrageEngine:
+    """
+    Stateful arbitrage detection driven by price changes
+    Keeps the best and runner-up price per event and selection between calls. Each
+    update diffs the incoming quotes against the prices already applied, updates
+    only the selections that changed and re-evaluates only the events they belong
+    to, so detection cost follows the number of price changes rather than the size
+    of the book. Event matching is re-run only when new listings appear.
+    """
+    
+    def __init__(self, matching=None):
+        self.matching = matching
+        # (sport, market, normalized name, bookmaker, selection) -> (event key, canonical selection)
+        self.listings = {}
+        self.sport_listings = Counter()
+        self.prices = {}
+        self.events = {}
+        self.opportunities = {}
+        self.stats = {"updates": 0, "changed": 0, "evaluated": 0, "rematched": 0}
+    
+    @staticmethod
+    def identity(quote):
+        return (quote["sport"], quote["market"], quote["normalized_name"], quote["bookmaker"], quote["selection"])
+    
+    def update(self, odds_data, snapshot=True):
+        """
+        Apply a set of quotes and return all current opportunities, best first
+        With snapshot=True the quotes are the complete book for the sports they cover,
+        so listings of those sports that are missing are removed. With snapshot=False
+        they are only the quotes that changed.
+        """
+        current = {
+            (quote["sport"], quote["market"], quote["normalized_name"], quote["bookmaker"], quote["selection"]): quote
+            for quote in odds_data
+        }
+        
+        # One pass sorts quotes into unchanged, repriced and newly listed
+        prices = self.prices
+        listings = self.listings
+        changed = []
+        new_count = 0
+        for identity, quote in current.items():
+            price = prices.get(identity)
+            if price is None:
+                if identity not in listings:
+                    new_count += 1
+                changed.append(identity)
+            elif price != quote["odds"]:
+                changed.append(identity)
+        
+        touched = set()
+        if snapshot:
+            touched |= self.remove_missing(current, len(current) - new_count)
+        if new_count:
+            touched |= self.rematch(current)
+        
+        for identity in changed:
+            touched.add(self.apply(identity, current[identity]))
+        
+        for event_key in touched:
+            self.evaluate(event_key)
+        
+        self.stats["updates"] += 1
+        self.stats["changed"] += len(changed)
+        self.stats["evaluated"] += len(touched)
+        logger.info(f"Incremental update: {len(changed)} changed quotes, re-evaluated {len(touched)} "
+                    f"of {len(self.events)} events")
+        
+        opportunities = list(self.opportunities.values())
+        opportunities.sort(key=lambda x: x["arbitrage_percentage"], reverse=True)
+        return opportunities
+    
+    def remove_missing(self, current, known_count):
+        """Remove listings of the sports in a snapshot that the snapshot no longer contains"""
+        covered = {identity[0] for identity in current}
+        
+        # Every known listing of these sports is in the snapshot, so there is nothing to scan for
+        if known_count == sum(self.sport_listings[sport] for sport in covered):
+            return set()
+        
+        missing = [i for i in self.listings if i[0] in covered and i not in current]
+        return {self.remove(identity) for identity in missing}
+    
+    def rematch(self, current):
+        """Re-run event matching over every known listing, moving listings whose event changed"""
+        self.stats["rematched"] += 1
+        # Sorted so clusters, and the canonical event keys they produce, do not depend on set order
+        identities = sorted(set(self.listings) | set(current))
+        
+        # Matching only reads these fields, so match one lightweight record per listing
+        records = [
+            {"sport": i[0], "market": i[1], "normalized_name": i[2], "bookmaker": i[3], "selection": i[4], "identity": i}
+            for i in identities
+        ]
+        listings = {}
+        for event_key, items in find_matching_events(records, self.matching).items():
+            for item in items:
+                listings[item["identity"]] = (event_key, item["selection"])
+        
+        touched = set()
+        moved = []
+        for identity, target in self.listings.items():
+            if listings.get(identity) != target:
+                moved.append((identity, self.current_quote(identity)))
+                touched.add(self.remove(identity, forget=False))
+        
+        for identity in listings:
+            if identity not in self.listings:
+                self.sport_listings[identity[0]] += 1
+        self.listings.update(listings)
+        
+        # Moved listings are re-applied under their new event: with this update's quote, which
+        # update() only re-applies if its price changed, or else with their last price
+        for identity, quote in moved:
+            if identity in current:
+                touched.add(self.apply(identity, current[identity]))
+            elif quote is not None:
+                touched.add(self.apply(identity, dict(quote, selection=identity[4])))
+        return touched
+    
+    def current_quote(self, identity):
+        """The quote currently applied for a listing, or None"""
+        event_key, selection = self.listings[identity]
+        event = self.events.get(event_key)
+        if event is None or selection not in event.selections:
+            return None
+        return event.selections[selection].quotes.get(identity[3])
+    
+    def apply(self, identity, quote):
+        """Set one quote's price in its event, returning the event key"""
+        event_key, selection = self.listings[identity]
+        event = self.events.get(event_key)
+        if event is None:
+            event = self.events[event_key] = EventPrices(quote)
+        if quote["selection"] != selection:
+            quote = dict(quote, selection=selection)
+        event.selections.setdefault(selection, SelectionPrices()).set(quote)
+        self.prices[identity] = quote["odds"]
+        return event_key
+    
+    def remove(self, identity, forget=True):
+        """Drop one listing's quote from its event, returning the event key"""
+        event_key, selection = self.listings[identity]
+        if forget:
+            del self.listings[identity]
+            self.sport_listings[identity[0]] -= 1
+        self.prices.pop(identity, None)
+        
+        event = self.events.get(event_key)
+        if event is not None and selection in event.selections:
+            prices = event.selections[selection]
+            prices.remove(identity[3])
+            if not prices.quotes:
+                del event.selections[selection]
+            if not event.selections:
+                del self.events[event_key]
+        return event_key
+    
+    def evaluate(self, event_key):
+        """Recompute the opportunity for one event from its best prices"""
+        event = self.events.get(event_key)
+        best_odds = event.best_odds() if event is not None else {}
+        
+        if len(best_odds) >= 2 and is_complete(best_odds):
+            arb_result = calculate_arbitrage([odd["odds"] for odd in best_odds.values()])
+            if arb_result["arbitrage_exists"]:
+                self.opportunities[event_key] = build_opportunity(
+                    [event.info], best_odds,
+                    arb_result["arbitrage_percentage"],
+                    arb_result["optimal_stakes"],
+                    arb_result["guaranteed_profit_per_100"]
+                )
+                return
+        
+        self.opportunities.pop(event_key, None)
+
+# Engine shared by find_arbitrage_opportunities calls, created on first use
+incremental_engine = None
+
+def get_incremental_engine():
+    """Get the shared incremental engine"""
+    global incremental_engine
+    if incremental_engine is None:
+        incremental_engine = IncrementalArbitrageEngine()
+    return incremental_engine
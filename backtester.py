@@ -0,0 +1,214 @@
+"""
+Replay recorded odds history through the arbitrage detector
+
+Streams odds_history in time order, rebuilds the odds book at every tick (one
+polling interval of quotes, expired by the book's TTL against the recorded
+time rather than the wall clock) and runs detection over it, answering "which
+arbitrages would the bot have alerted over this period at this threshold".
+Memory stays bounded however much history is replayed: rows are read in chunks,
+the book is capped and only the alerts are written out.
+
+Usage: python backtester.py [--db arbitrage_data.db] [--days 30 | --since "2024-05-01 00:00:00"]
+                            [--until ...] [--threshold 0.98] [--tick 120] [--engine vectorized]
+                            [--output backtest.csv]
+"""
+import argparse
+import csv
+import heapq
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+import arbitrage_finder
+from arbitrage_finder import find_arbitrage_opportunities, IncrementalArbitrageEngine
+from data_storage import DataStorage, format_timestamp, parse_timestamp
+from odds_book import OddsBook
+from event_matcher import normalize_event_name
+from opportunity_tracker import OpportunityTracker
+
+logger = logging.getLogger("ArbitrageBot.Backtester")
+
+class Backtester:
+    """
+    Replays odds history tick by tick through an odds book and the arbitrage detector
+    Alerts go through an OpportunityTracker on the recorded clock, so a persistent
+    arbitrage is counted once, as it would have been emailed once. Delta history
+    (as recorded in the database) only repeats an unchanged price at keyframes, so
+    there quotes live until a tombstone or the keyframe interval passes rather than
+    for ODDS_TTL, and ticks without rows are still detected over.
+    """
+
+    def __init__(self, storage, tick=120, threshold=None, engine=None, ttl=None, max_quotes=None):
+        self.storage = storage
+        self.tick = tick
+        self.threshold = threshold
+        self.engine = engine or arbitrage_finder.ARBITRAGE_ENGINE
+        self.now = 0.0
+        keyframe_interval = storage.get_keyframe_interval()
+        if ttl is None and keyframe_interval is not None:
+            ttl = keyframe_interval + tick
+        self.book = OddsBook(ttl=ttl, max_quotes=max_quotes, clock=lambda: self.now)
+        self.tracker = OpportunityTracker()
+        self._incremental = None
+        self._sports = set()
+
+    def detect(self, quotes):
+        """Run the configured engine over the book's current quotes"""
+        if self.engine != "incremental":
+            return find_arbitrage_opportunities(quotes, self.engine)
+
+        # A snapshot only removes listings of the sports it covers, so start over when a sport empties out
+        sports = {quote["sport"] for quote in quotes}
+        if self._incremental is None or not self._sports <= sports:
+            self._incremental = IncrementalArbitrageEngine()
+        self._sports = sports
+        return self._incremental.update(quotes)
+
+    def run_tick(self, quotes, tick_end, report, on_alert):
+        """Fold one tick of history into the book and detect over it"""
+        self.now = tick_end
+        # Each quote ends the tick at its last row, which in delta history may be a tombstone (odds None)
+        latest = {OddsBook.key(quote): quote for quote in quotes}
+        self.book.update([quote for quote in latest.values() if quote["odds"] is not None], complete=False)
+        self.book.remove([quote for quote in latest.values() if quote["odds"] is None])
+        current = self.book.get_quotes()
+        report["peak_quotes"] = max(report["peak_quotes"], len(current))
+
+        started = time.perf_counter()
+        opportunities = self.detect(current) if current else []
+        report["detect_seconds"] += time.perf_counter() - started
+        report["ticks"] += 1
+        report["opportunity_ticks"] += len(opportunities)
+
+        for opportunity in self.tracker.filter(opportunities, now=tick_end):
+            opportunity = dict(opportunity, timestamp=format_timestamp(tick_end))
+            report["alerts"] += 1
+            report["by_sport"][opportunity["sport"]] += 1
+            entry = (opportunity["arbitrage_percentage"], report["alerts"], opportunity)
+            if len(report["best"]) < 10:
+                heapq.heappush(report["best"], entry)
+            else:
+                heapq.heappushpop(report["best"], entry)
+            if on_alert is not None:
+                on_alert(opportunity)
+
+    def run(self, since=None, until=None, chunk_size=50000, on_alert=None):
+        """
+        Replay history between since and until, calling on_alert for every alert
+        Returns a report with row and tick counts, throughput and the alerts found
+        """
+        report = {
+            "rows": 0, "ticks": 0, "opportunity_ticks": 0, "alerts": 0, "peak_quotes": 0,
+            "detect_seconds": 0.0, "by_sport": Counter(), "best": []
+        }
+        previous_threshold = arbitrage_finder.ARBITRAGE_THRESHOLD
+        if self.threshold is not None:
+            arbitrage_finder.ARBITRAGE_THRESHOLD = self.threshold
+
+        started = time.perf_counter()
+        try:
+            pending = []
+            tick_start = None
+            for rows in self.storage.iter_odds_history(since, until, chunk_size):
+                report["rows"] += len(rows)
+                for bookmaker, sport, event_name, market, selection, odds, epoch in rows:
+                    # A row stamped before the open tick (out of insertion order) joins the open tick
+                    start = epoch - epoch % self.tick
+                    if tick_start is None:
+                        tick_start = start
+                    elif start > tick_start:
+                        self.run_tick(pending, tick_start + self.tick, report, on_alert)
+                        pending = []
+                        # Ticks without rows still count: quotes live on in the book through them
+                        tick_start += self.tick
+                        while tick_start < start:
+                            self.run_tick([], tick_start + self.tick, report, on_alert)
+                            tick_start += self.tick
+                        tick_start = start
+
+                    pending.append({
+                        "bookmaker": bookmaker,
+                        "sport": sport,
+                        "event_name": event_name,
+                        "market": market,
+                        "selection": selection,
+                        "odds": odds,
+                        "timestamp": epoch,
+                        "normalized_name": normalize_event_name(event_name, sport)
+                    })
+
+            if pending:
+                self.run_tick(pending, tick_start + self.tick, report, on_alert)
+                # Delta history may end in a stretch of unchanged prices, so run on to the end of the range
+                if until is not None:
+                    end = parse_timestamp(until)
+                    tick_start += self.tick
+                    while tick_start < end:
+                        self.run_tick([], tick_start + self.tick, report, on_alert)
+                        tick_start += self.tick
+        finally:
+            arbitrage_finder.ARBITRAGE_THRESHOLD = previous_threshold
+
+        report["seconds"] = time.perf_counter() - started
+        report["rows_per_second"] = report["rows"] / report["seconds"] if report["seconds"] else 0.0
+        report["best"] = [entry[2] for entry in sorted(report["best"], key=lambda entry: entry[:2], reverse=True)]
+        report["book"] = self.book.get_stats()
+        logger.info(f"Backtest replayed {report['rows']} rows over {report['ticks']} ticks in "
+                    f"{report['seconds']:.1f}s ({report['rows_per_second']:.0f} rows/s), {report['alerts']} alerts")
+        return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default="arbitrage_data.db")
+    parser.add_argument("--days", type=float, help="replay the last N days (ignored with --since)")
+    parser.add_argument("--since", help='start time, "%%Y-%%m-%%d %%H:%%M:%%S"')
+    parser.add_argument("--until", help='end time, "%%Y-%%m-%%d %%H:%%M:%%S"')
+    parser.add_argument("--threshold", type=float, help="implied probability sum below which a market is an arbitrage")
+    parser.add_argument("--tick", type=int, default=120, help="seconds of history per detection pass")
+    parser.add_argument("--engine", choices=["python", "vectorized", "incremental"], default="vectorized")
+    parser.add_argument("--ttl", type=float,
+                        help="seconds a quote stays usable (default ODDS_TTL, or a keyframe interval and a tick "
+                             "for history the database records as delta-encoded)")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--output", help="write every alert to this CSV file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Detection logs every opportunity and incremental update; keep the replay's own summary only
+    logging.getLogger("ArbitrageBot.ArbitrageFinder").setLevel(logging.WARNING)
+
+    since = args.since
+    if since is None and args.days is not None:
+        since = (datetime.now() - timedelta(days=args.days)).strftime("%Y-%m-%d %H:%M:%S")
+
+    output = open(args.output, "w", newline="") if args.output else None
+    on_alert = None
+    if output is not None:
+        writer = csv.writer(output)
+        writer.writerow(["timestamp", "sport", "event_name", "market", "arbitrage_percentage",
+                         "guaranteed_profit_per_100", "selections"])
+        on_alert = lambda o: writer.writerow([
+            o["timestamp"], o["sport"], o["event_name"], o["market"],
+            round(o["arbitrage_percentage"], 4), round(o["guaranteed_profit_per_100"], 4),
+            "; ".join(f"{s['selection']} @ {s['odds']} ({s['bookmaker']})" for s in o["selections"])
+        ])
+
+    try:
+        backtester = Backtester(DataStorage(args.db), args.tick, args.threshold, args.engine, args.ttl)
+        report = backtester.run(since, args.until, args.chunk_size, on_alert)
+    finally:
+        if output is not None:
+            output.close()
+
+    print(f"Rows replayed:      {report['rows']} ({report['rows_per_second']:.0f} rows/s, "
+          f"{report['detect_seconds']:.1f}s of {report['seconds']:.1f}s detecting)")
+    print(f"Ticks:              {report['ticks']} of {args.tick}s, peak book {report['peak_quotes']} quotes")
+    print(f"Alerts:             {report['alerts']} ({report['opportunity_ticks']} opportunity-ticks)")
+    for sport, count in report["by_sport"].most_common():
+        print(f"  {sport:<18}{count}")
+    for opportunity in report["best"]:
+        print(f"  {opportunity['timestamp']}  {opportunity['arbitrage_percentage']:.2f}%  "
+              f"{opportunity['event_name']} ({opportunity['market']})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark the Python and vectorized arbitrage detection engines
+
+Builds synthetic matched events (three bookmakers pricing two- and three-way
+markets, with a share of them priced into arbitrages), checks both engines
+report the same opportunities, and times detection at each quote count.
+Event matching is shared by both engines and is not included in the timings.
+The incremental engine is timed on an update after --changed (a fraction) of
+the prices moved, both given the whole book (snapshot) and only the moved
+quotes (delta).
+
+Usage: python benchmarks/arbitrage-engines.py [--quotes 1000 10000 100000] [--arb-rate 0.02]
+                                              [--changed 0.01] [--repeat 3]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arbitrage_finder import evaluate_events, evaluate_events_vectorized, IncrementalArbitrageEngine
+
+BOOKMAKERS = ["bet365", "betmgm", "stake"]
+
+def build_events(quote_count, arb_rate, seed=11):
+    """Matched events keyed like find_matching_events, totalling about quote_count quotes"""
+    rng = random.Random(seed)
+    events = {}
+    quotes = 0
+    i = 0
+    while quotes < quote_count:
+        selections = [f"Team {i}", f"Team {i + 1}"] + (["Draw"] if i % 3 == 0 else [])
+        margin = 0.93 if rng.random() < arb_rate else 1.06
+        fair = [rng.uniform(1, 3) for _ in selections]
+        total = sum(fair)
+        name = f"Team {i} vs Team {i + 1}"
+        event_odds = []
+        for bookmaker in BOOKMAKERS:
+            for selection, weight in zip(selections, fair):
+                price = round(total / weight / margin * rng.uniform(0.97, 1.03), 2)
+                event_odds.append({
+                    "bookmaker": bookmaker,
+                    "sport": "soccer",
+                    "event_id": f"{bookmaker}-{i}",
+                    "event_name": name,
+                    "market": "match_winner",
+                    "selection": selection,
+                    "odds": max(price, 1.01),
+                    "timestamp": time.time(),
+                    "normalized_name": name.lower()
+                })
+        events[f"{name.lower()}_match_winner"] = event_odds
+        quotes += len(event_odds)
+        i += 1
+    return events, quotes
+
+def summarize(opportunities):
+    return [
+        (o["event_name"], round(o["arbitrage_percentage"], 9),
+         tuple((s["selection"], s["bookmaker"], s["odds"], round(s["recommended_stake"], 9)) for s in o["selections"]))
+        for o in opportunities
+    ]
+
+def best_time(func, events, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(events)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def time_incremental(events, changed, repeat, seed=13):
+    """Best times for a snapshot and a delta update after `changed` of the prices moved"""
+    rng = random.Random(seed)
+    quotes = [odd for event_odds in events.values() for odd in event_odds]
+    snapshot_times, delta_times = [], []
+    for _ in range(repeat):
+        moved = [
+            dict(odd, odds=round(odd["odds"] * rng.uniform(0.95, 1.05), 2)) if rng.random() < changed else odd
+            for odd in quotes
+        ]
+        delta = [new for new, old in zip(moved, quotes) if new is not old]
+        
+        for times, update, snapshot in ((snapshot_times, moved, True), (delta_times, delta, False)):
+            engine = IncrementalArbitrageEngine(matching="exact")
+            engine.update(quotes)
+            start = time.perf_counter()
+            engine.update(update, snapshot=snapshot)
+            times.append(time.perf_counter() - start)
+    return min(snapshot_times), min(delta_times)
+
+def run(args):
+    logging.getLogger("ArbitrageBot").setLevel(logging.WARNING)
+    print(f"{'quotes':>8} {'events':>8} {'arbs':>6} {'python ms':>10} {'vector ms':>10} {'speedup':>8} "
+          f"{'snapshot ms':>12} {'delta ms':>9}")
+    for quote_count in args.quotes:
+        events, quotes = build_events(quote_count, args.arb_rate)
+        python_time, expected = best_time(evaluate_events, events, args.repeat)
+        vector_time, actual = best_time(evaluate_events_vectorized, events, args.repeat)
+        if summarize(expected) != summarize(actual):
+            raise SystemExit(f"Engines disagree at {quotes} quotes")
+        snapshot_time, delta_time = time_incremental(events, args.changed, args.repeat)
+        print(f"{quotes:>8} {len(events):>8} {len(actual):>6} {python_time * 1000:>10.1f} "
+              f"{vector_time * 1000:>10.1f} {python_time / vector_time:>7.1f}x "
+              f"{snapshot_time * 1000:>12.1f} {delta_time * 1000:>9.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quotes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--arb-rate", type=float, default=0.02)
+    parser.add_argument("--changed", type=float, default=0.01, help="fraction of prices moved per update")
+    parser.add_argument("--repeat", type=int, default=3)
+    run(parser.parse_args())
@@ -0,0 +1,96 @@
+"""
+Benchmark backtest throughput and memory over a synthetic odds history
+
+Fills a scratch SQLite database with polling cycles of quotes (three bookmakers
+pricing --events live events whose prices drift, with events finishing and new
+ones starting every cycle and the odd arbitrage), then replays it with the
+backtester. Reports rows/s and peak resident memory, which should stay flat as
+--rows grows.
+
+Usage: python benchmarks/backtest-throughput.py [--rows 1000000] [--events 2000] [--engine vectorized]
+                                                [--db /tmp/backtest-bench.db] [--keep]
+"""
+import argparse
+import logging
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester import Backtester
+from data_storage import DataStorage
+
+BOOKMAKERS = ["bet365", "betmgm", "stake"]
+SPORTS = ["soccer", "basketball", "tennis", "hockey"]
+
+def generate_history(db_path, rows, events, interval=120, seed=5):
+    """Insert about `rows` quotes, one polling cycle every `interval` seconds"""
+    rng = random.Random(seed)
+    storage = DataStorage(db_path, persistent=True, delta=False)
+
+    live = {}
+    next_id = 0
+    per_cycle = events * len(BOOKMAKERS) * 2
+    start = time.time() - (rows // per_cycle + 1) * interval
+    written = 0
+    cycle = 0
+    while written < rows:
+        # A few events finish each cycle and new ones take their place
+        for event_id in [e for e in live if rng.random() < 0.02]:
+            del live[event_id]
+        while len(live) < events:
+            fair = rng.uniform(1.2, 3.0)
+            live[next_id] = {"sport": SPORTS[next_id % len(SPORTS)], "fair": [fair, fair / (fair - 1)]}
+            next_id += 1
+
+        stamp = int(start + cycle * interval)
+        batch = []
+        for event_id, event in live.items():
+            event["fair"][0] = min(max(event["fair"][0] * rng.uniform(0.98, 1.02), 1.05), 20.0)
+            event["fair"][1] = event["fair"][0] / (event["fair"][0] - 1)
+            margin = 0.96 if rng.random() < 0.001 else 1.05
+            name = f"Team {event_id} vs Team {event_id + 1}"
+            for bookmaker in BOOKMAKERS:
+                for selection, fair in zip((f"Team {event_id}", f"Team {event_id + 1}"), event["fair"]):
+                    odds = round(fair / margin * rng.uniform(0.99, 1.01), 2)
+                    batch.append((bookmaker, event["sport"], name, "moneyline", selection, odds, stamp))
+        storage.save_odds_records(batch)
+        written += len(batch)
+        cycle += 1
+
+    storage.close()
+    return written, cycle
+
+def run(args):
+    logging.getLogger("ArbitrageBot").setLevel(logging.WARNING)
+    if os.path.exists(args.db):
+        os.remove(args.db)
+
+    started = time.perf_counter()
+    rows, cycles = generate_history(args.db, args.rows, args.events)
+    print(f"Wrote {rows} rows over {cycles} cycles in {time.perf_counter() - started:.1f}s "
+          f"({os.path.getsize(args.db) / 1024 / 1024:.0f} MB)")
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report = Backtester(DataStorage(args.db), engine=args.engine).run(chunk_size=args.chunk_size)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"{'rows':>10} {'ticks':>7} {'alerts':>7} {'seconds':>8} {'rows/s':>9} {'detect s':>9} {'peak MB':>8}")
+    print(f"{report['rows']:>10} {report['ticks']:>7} {report['alerts']:>7} {report['seconds']:>8.1f} "
+          f"{report['rows_per_second']:>9.0f} {report['detect_seconds']:>9.1f} {max(peak, baseline) / 1024:>8.0f}")
+
+    if not args.keep:
+        os.remove(args.db)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--events", type=int, default=2000, help="live events per cycle")
+    parser.add_argument("--engine", choices=["python", "vectorized", "incremental"], default="vectorized")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--db", default="/tmp/backtest-bench.db")
+    parser.add_argument("--keep", action="store_true", help="keep the database for further runs")
+    run(parser.parse_args())
@@ -0,0 +1,132 @@
+"""
+Benchmark fuzzy cross-bookmaker event matching against exact-name grouping
+
+Generates the same synthetic events listed by three bookmakers with differing
+spellings (abbreviations, club suffixes, typos) and reports time, number of
+clusters and how many events were fully matched across all three bookmakers.
+A naive pairwise matcher (quadratic) is timed on the smallest sizes for comparison. Every
+matcher starts with cold feature and similarity caches.
+
+Usage: python benchmarks/event-matching.py [--events 1000 10000 20000] [--naive-limit 1000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arbitrage_finder import find_matching_events
+from event_matcher import MATCH_THRESHOLD, score_sides, side_features, split_sides, token_similarity
+from odds_fetcher import normalize_event_names
+
+WORDS = [
+    "north", "south", "river", "city", "rovers", "athletic", "wanderers", "rangers", "united",
+    "falcons", "tigers", "lions", "eagles", "sharks", "comets", "pioneers", "royals", "titans",
+    "harbor", "valley", "forest", "county", "albion", "dynamo", "sporting", "olympic", "academy"
+]
+
+def team_name(rng, i):
+    return f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}"
+
+def variant(rng, name):
+    """A bookmaker's own spelling of a team name"""
+    choice = rng.random()
+    if choice < 0.2:
+        return f"{name} FC"
+    if choice < 0.35 and "United" in name:
+        return name.replace("United", "Utd")
+    if choice < 0.5:
+        words = name.split()
+        word = words[0]
+        if len(word) > 4:
+            position = rng.randrange(1, len(word) - 1)
+            words[0] = word[:position] + word[position + 1:]
+        return " ".join(words)
+    return name
+
+def generate(events, seed=7):
+    rng = random.Random(seed)
+    separators = {"bet365": " v ", "betmgm": " @ ", "stake": " - "}
+    odds_data = []
+    for i in range(events):
+        home, away = team_name(rng, 2 * i), team_name(rng, 2 * i + 1)
+        for bookmaker, separator in separators.items():
+            home_name, away_name = variant(rng, home), variant(rng, away)
+            for selection in (home_name, away_name):
+                odds_data.append({
+                    "bookmaker": bookmaker,
+                    "sport": "soccer",
+                    "event_id": f"{bookmaker}_{i}",
+                    "event_name": f"{home_name}{separator}{away_name}",
+                    "market": "moneyline",
+                    "selection": selection,
+                    "odds": round(rng.uniform(1.5, 3.5), 2),
+                    "timestamp": 0.0,
+                    "normalized_name": ""
+                })
+    return normalize_event_names(odds_data)
+
+def fully_matched(matched_events):
+    """Number of events whose cluster holds all three bookmakers"""
+    return sum(1 for quotes in matched_events.values() if len({q["bookmaker"] for q in quotes}) == 3)
+
+def clear_caches():
+    """Drop cached side features and token similarities so each matcher starts cold"""
+    side_features.cache_clear()
+    token_similarity.cache_clear()
+
+def naive_match(odds_data):
+    """
+    Pairwise comparison of every distinct name against every cluster
+    Like the index, each name joins its best scoring cluster with none of its
+    bookmakers; only the trigram candidate lookup is replaced by scoring them all.
+    """
+    names = {}
+    for item in odds_data:
+        names.setdefault(item["normalized_name"], set()).add(item["bookmaker"])
+
+    clusters = []
+    for name, bookmakers in names.items():
+        sides = [side_features(side) for side in split_sides(name, "soccer")]
+        best_cluster = None
+        best_score = MATCH_THRESHOLD
+        for cluster in clusters:
+            score = score_sides(cluster["sides"], sides)[0]
+            if score >= best_score and not cluster["bookmakers"] & bookmakers:
+                best_cluster, best_score = cluster, score
+                if score == 1.0:
+                    break
+        if best_cluster is not None:
+            best_cluster["bookmakers"] |= bookmakers
+        else:
+            clusters.append({"sides": sides, "bookmakers": set(bookmakers)})
+    return clusters
+
+def run(sizes, naive_limit):
+    print(f"{'events':>8} {'matcher':<8} {'seconds':>9} {'clusters':>9} {'matched x3':>11}")
+    for events in sizes:
+        odds_data = generate(events)
+
+        for matching in ("exact", "fuzzy"):
+            clear_caches()
+            start = time.perf_counter()
+            matched = find_matching_events(odds_data, matching=matching)
+            elapsed = time.perf_counter() - start
+            print(f"{events:>8} {matching:<8} {elapsed:>9.3f} {len(matched):>9} {fully_matched(matched):>11}")
+
+        if events <= naive_limit:
+            clear_caches()
+            start = time.perf_counter()
+            clusters = naive_match(odds_data)
+            elapsed = time.perf_counter() - start
+            matched_x3 = sum(1 for c in clusters if len(c["bookmakers"]) == 3)
+            print(f"{events:>8} {'naive':<8} {elapsed:>9.3f} {len(clusters):>9} {matched_x3:>11}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 10000, 20000])
+    parser.add_argument("--naive-limit", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.events, args.naive_limit)
@@ -0,0 +1,150 @@
+"""
+Compare full and delta-encoded odds history on the same simulated polling
+
+Polls three bookmakers pricing --events two-way events every --interval
+seconds for --hours, where each bookmaker moves a given price with probability
+--change per poll and events finish and are replaced over time. Every poll is
+saved per (bookmaker, sport) with save_batch_odds once into a full history and
+once into a delta history (ODDS_HISTORY_DELTA). Reports rows written, database
+size and write time for each, checks that get_odds_series returns the same
+price changes from both for --sample quotes, and replays both with the backtester.
+
+Usage: python benchmarks/history-delta.py [--hours 12] [--events 300] [--change 0.05] [--interval 120]
+                                          [--keyframe 1800] [--sample 200] [--db /tmp/history-delta]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester import Backtester
+from data_storage import DataStorage, OddsDeltaEncoder
+
+BOOKMAKERS = ["bet365", "betmgm", "stake"]
+SPORTS = ["soccer", "basketball", "tennis", "hockey"]
+
+def simulate(args, start, seed=7):
+    """Yield (epoch, batches) per poll from start, a batch being one bookmaker's quotes for one sport"""
+    rng = random.Random(seed)
+    live = {}
+    next_id = 0
+    for poll in range(int(args.hours * 3600 / args.interval)):
+        now = start + poll * args.interval
+        # Events last about eight hours
+        for event_id in [e for e in live if rng.random() < args.interval / 28800]:
+            del live[event_id]
+        while len(live) < args.events:
+            fair = rng.uniform(1.3, 3.0)
+            live[next_id] = {
+                "sport": SPORTS[next_id % len(SPORTS)],
+                "prices": {bookmaker: [round(fair / 1.05, 2), round(fair / (fair - 1) / 1.05, 2)]
+                           for bookmaker in BOOKMAKERS}
+            }
+            next_id += 1
+
+        batches = {(bookmaker, sport): [] for bookmaker in BOOKMAKERS for sport in SPORTS}
+        for event_id, event in live.items():
+            name = f"Team {event_id} vs Team {event_id + 1}"
+            for bookmaker, prices in event["prices"].items():
+                for side, selection in enumerate(("home", "away")):
+                    if rng.random() < args.change:
+                        prices[side] = round(max(1.01, prices[side] * rng.uniform(0.95, 1.05)), 2)
+                    batches[(bookmaker, event["sport"])].append({
+                        "bookmaker": bookmaker, "sport": event["sport"], "event_name": name,
+                        "market": "moneyline", "selection": selection, "odds": prices[side], "timestamp": now
+                    })
+        yield now, batches
+
+def write_history(db_path, args, start, delta):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    storage = DataStorage(db_path, persistent=True, delta=delta)
+    if delta:
+        storage.delta = OddsDeltaEncoder(args.keyframe)
+
+    quotes = 0
+    seconds = 0.0
+    for _, batches in simulate(args, start):
+        for batch in batches.values():
+            quotes += len(batch)
+            started = time.perf_counter()
+            storage.save_batch_odds(batch)
+            seconds += time.perf_counter() - started
+    storage.close()
+    return storage, quotes, seconds
+
+def count_rows(storage):
+    conn = storage._open_reader()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM odds_history").fetchone()[0]
+    finally:
+        storage._close_reader(conn)
+
+def quote_keys(storage):
+    conn = storage._open_reader()
+    try:
+        return conn.execute('''
+        SELECT b.name, e.name, m.name, sel.name
+        FROM (SELECT DISTINCT bookmaker_id, event_id, market_id, selection_id FROM odds_history) o
+        JOIN bookmakers b ON b.id = o.bookmaker_id
+        JOIN events e ON e.id = o.event_id
+        JOIN markets m ON m.id = o.market_id
+        JOIN selections sel ON sel.id = o.selection_id
+        ''').fetchall()
+    finally:
+        storage._close_reader(conn)
+
+def run(args):
+    logging.getLogger("ArbitrageBot").setLevel(logging.WARNING)
+    results = {}
+    start = int(time.time() - args.hours * 3600)
+    for name, delta in (("full", False), ("delta", True)):
+        db_path = f"{args.db}-{name}.db"
+        storage, quotes, seconds = write_history(db_path, args, start, delta)
+        results[name] = {
+            "storage": storage,
+            "quotes": quotes,
+            "rows": count_rows(storage),
+            "mb": os.path.getsize(db_path) / 1e6,
+            "seconds": seconds
+        }
+        if delta:
+            results[name]["encoder"] = dict(storage.delta.stats)
+
+    print(f"{'history':>8} {'quotes':>9} {'rows':>9} {'size MB':>8} {'write s':>8} {'alerts':>7}")
+    for name, r in results.items():
+        report = Backtester(r["storage"], tick=args.interval).run()
+        print(f"{name:>8} {r['quotes']:>9} {r['rows']:>9} {r['mb']:>8.1f} {r['seconds']:>8.2f} {report['alerts']:>7}")
+    stats = results["delta"]["encoder"]
+    print(f"delta rows: {stats['changes']} changes, {stats['keyframes']} keyframes, {stats['tombstones']} tombstones; "
+          f"{results['full']['rows'] / results['delta']['rows']:.1f}x fewer rows, "
+          f"{results['full']['mb'] / results['delta']['mb']:.1f}x less disk")
+
+    # Full history has no tombstones; every other point must match
+    full, delta = results["full"]["storage"], results["delta"]["storage"]
+    keys = quote_keys(full)
+    keys = random.Random(1).sample(keys, min(args.sample, len(keys)))
+    mismatched = sum(
+        1 for key in keys
+        if full.get_odds_series(*key) != [point for point in delta.get_odds_series(*key) if point[1] is not None]
+    )
+    print(f"series checked: {len(keys)}, mismatched: {mismatched}")
+
+    for r in results.values():
+        r["storage"].close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=12)
+    parser.add_argument("--events", type=int, default=300)
+    parser.add_argument("--change", type=float, default=0.05, help="chance a price moves between polls")
+    parser.add_argument("--interval", type=int, default=120, help="seconds between polls")
+    parser.add_argument("--keyframe", type=float, default=1800, help="ODDS_KEYFRAME_INTERVAL for the delta history")
+    parser.add_argument("--sample", type=int, default=200, help="quotes whose series are compared")
+    parser.add_argument("--db", default="/tmp/history-delta", help="path prefix of the two scratch databases")
+    run(parser.parse_args())
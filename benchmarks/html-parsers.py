@@ -0,0 +1,88 @@
+"""
+Benchmark the HTML parser backends on synthetic Bet365, BetMGM and Stake pages
+
+Reports per-page parse time (tree build plus odds extraction) and peak memory
+for every backend available in this environment.
+
+Usage: python benchmarks/html-parsers.py [--events 200] [--noise 2000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_backend import parse_html, get_available_backends
+from odds_fetcher import parse_bet365_html, parse_betmgm_html, parse_stake_html
+
+def noise_markup(count):
+    """Navigation, promos and other markup the parsers never look at"""
+    return "".join(
+        f'<div class="nav-item promo-{i}"><a href="/promo/{i}"><span>Promo {i}</span>'
+        f'<img src="/img/{i}.png" alt="banner"></a><p>Terms and conditions apply {i}</p></div>'
+        for i in range(count)
+    )
+
+def bet365_page(events, noise):
+    containers = "".join(
+        f'<div class="gl-Market_Container"><div class="rcl-MarketHeaderLabel">Team {i} vs Team {i + 1}</div>'
+        f'<div class="gl-MarketGroup"><div class="gl-MarketGroupButton_Text">Match Winner</div>'
+        f'<div class="gl-Participant"><span class="gl-Participant_Name">Team {i}</span>'
+        f'<span class="gl-Participant_Odds">6/4</span></div>'
+        f'<div class="gl-Participant"><span class="gl-Participant_Name">Team {i + 1}</span>'
+        f'<span class="gl-Participant_Odds">2.10</span></div></div></div>'
+        for i in range(events)
+    )
+    return f"<html><body>{noise_markup(noise)}{containers}{noise_markup(noise)}</body></html>"
+
+def betmgm_page(events, noise):
+    containers = "".join(
+        f'<div class="option-group"><div class="event-header-description">Team {i} @ Team {i + 1}</div>'
+        f'<div class="market-option"><span class="option-name">Team {i}</span><span class="option-price">2.05</span></div>'
+        f'<div class="market-option"><span class="option-name">Team {i + 1}</span><span class="option-price">1.85</span></div></div>'
+        for i in range(events)
+    )
+    return f"<html><body>{noise_markup(noise)}{containers}{noise_markup(noise)}</body></html>"
+
+def stake_page(events, noise):
+    containers = "".join(
+        f'<div class="sport-event"><div class="event-header">Team {i} - Team {i + 1}</div>'
+        f'<div class="market-container"><div class="market-header">Match Winner</div>'
+        f'<div class="selection"><span class="selection-name">Team {i}</span><span class="odds-value">1.95</span></div>'
+        f'<div class="selection"><span class="selection-name">Team {i + 1}</span><span class="odds-value">1.95</span></div></div></div>'
+        for i in range(events)
+    )
+    return f"<html><body>{noise_markup(noise)}{containers}{noise_markup(noise)}</body></html>"
+
+PAGES = {
+    "bet365": (bet365_page, parse_bet365_html),
+    "betmgm": (betmgm_page, parse_betmgm_html),
+    "stake": (stake_page, parse_stake_html)
+}
+
+def run(events, noise, repeat):
+    print(f"{'bookmaker':<10} {'backend':<22} {'ms/page':>10} {'peak MB':>10} {'records':>8}")
+    for bookmaker, (build_page, parse_odds) in PAGES.items():
+        page = build_page(events, noise)
+        for backend in get_available_backends():
+            start = time.perf_counter()
+            for _ in range(repeat):
+                records = parse_odds(parse_html(page, bookmaker, backend), "soccer")
+            elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+
+            tracemalloc.start()
+            parse_odds(parse_html(page, bookmaker, backend), "soccer")
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"{bookmaker:<10} {backend:<22} {elapsed_ms:>10.1f} {peak / 1024 / 1024:>10.2f} {len(records):>8}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--noise", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.events, args.noise, args.repeat)
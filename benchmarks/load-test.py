@@ -0,0 +1,129 @@
+"""
+End-to-end load test of fetch -> detect against the synthetic bookmaker server
+
+Starts synthetic-bookmaker.py's app in-process at increasing event counts and
+points the fetchers at it. For each scale it reports cycle time, quote
+throughput, and detection latency and recall for the injected arbitrages that
+were open when the cycle started. With --pipeline the streaming fetch -> detect
+pipeline is used instead, so latency is measured when each opportunity is
+emitted rather than at the end of the cycle.
+
+Usage: python benchmarks/load-test.py [--base-events 20] [--scales 1 10 100] [--cycles 3]
+                                      [--engine async] [--pipeline] [--tick 2] [--arb-rate 0.02]
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+from werkzeug.serving import make_server
+
+import odds_fetcher
+from arbitrage_finder import find_arbitrage_opportunities
+from event_matcher import normalize_event_name
+from odds_pipeline import OddsPipeline
+
+def load_synthetic_module():
+    """Import synthetic-bookmaker.py, whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location("synthetic_bookmaker", os.path.join(ROOT, "synthetic-bookmaker.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def start_server(app):
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def point_fetchers_at(base_url):
+    odds_fetcher.BET365_BASE_URL = base_url
+    odds_fetcher.BETMGM_BASE_URL = base_url
+    odds_fetcher.STAKE_BASE_URL = base_url
+    odds_fetcher.STAKE_API_URL = f"{base_url}/graphql"
+    odds_fetcher.PACING_SCALE = 0.0
+    odds_fetcher.PROXIES.clear()
+    odds_fetcher.response_cache.clear()
+
+def event_key(sport, name):
+    return normalize_event_name(name, sport)
+
+def run_scale(synthetic, events_per_sport, args):
+    world = synthetic.SyntheticWorld(events_per_sport, args.markets, args.movement_rate,
+                                     args.arb_rate, args.tick, seed=42)
+    server, base_url = start_server(synthetic.create_app(world))
+    point_fetchers_at(base_url)
+
+    cycle_times, throughputs, latencies = [], [], []
+    found_total = open_total = 0
+    try:
+        for _ in range(args.cycles):
+            open_at_start = requests.get(f"{base_url}/_synthetic/arbitrages", timeout=10).json()["active"]
+
+            start = time.time()
+            if args.pipeline:
+                detected = {}
+                pipeline = OddsPipeline(
+                    notify=lambda o: detected.setdefault(event_key(o["sport"], o["event_name"]), time.time())
+                )
+                pipeline.run_cycle()
+                finished = time.time()
+                quotes = len(pipeline.book)
+            else:
+                odds = odds_fetcher.fetch_all_odds(engine=args.engine)
+                opportunities = find_arbitrage_opportunities(odds)
+                finished = time.time()
+                quotes = len(odds)
+                detected = {event_key(o["sport"], o["event_name"]): finished for o in opportunities}
+
+            cycle_times.append(finished - start)
+            throughputs.append(quotes / (finished - start))
+
+            for arb in open_at_start:
+                open_total += 1
+                key = event_key(arb["sport"], f"{arb['home']} vs {arb['away']}")
+                if key in detected:
+                    found_total += 1
+                    latencies.append(detected[key] - arb["injected_at"])
+    finally:
+        server.shutdown()
+
+    return {
+        "events": events_per_sport * len(odds_fetcher.SPORTS),
+        "cycle": statistics.mean(cycle_times),
+        "throughput": statistics.mean(throughputs),
+        "latency_mean": statistics.mean(latencies) if latencies else float("nan"),
+        "latency_max": max(latencies) if latencies else float("nan"),
+        "recall": found_total / open_total if open_total else float("nan")
+    }
+
+def run(args):
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    synthetic = load_synthetic_module()
+    print(f"{'scale':>6} {'events':>8} {'cycle s':>9} {'quotes/s':>10} {'lat mean':>9} {'lat max':>9} {'recall':>7}")
+    for scale in args.scales:
+        result = run_scale(synthetic, args.base_events * scale, args)
+        print(f"{scale:>5}x {result['events']:>8} {result['cycle']:>9.2f} {result['throughput']:>10.0f} "
+              f"{result['latency_mean']:>9.2f} {result['latency_max']:>9.2f} {result['recall']:>7.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-events", type=int, default=20, help="events per sport at scale 1")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--engine", default="async", choices=["thread", "async"])
+    parser.add_argument("--pipeline", action="store_true", help="use the streaming fetch -> detect pipeline")
+    parser.add_argument("--markets", type=int, default=3)
+    parser.add_argument("--movement-rate", type=float, default=0.1)
+    parser.add_argument("--arb-rate", type=float, default=0.02)
+    parser.add_argument("--tick", type=float, default=2.0)
+    args = parser.parse_args()
+    run(args)
@@ -0,0 +1,82 @@
+"""
+Measure per-quote memory of an OddsBatch against the list-of-dicts form
+
+Builds the same synthetic quotes both ways under tracemalloc and reports the
+bytes held per quote, then checks that arbitrage detection gives the same
+opportunities for either input.
+
+Usage: python benchmarks/odds-batch-memory.py [--quotes 10000 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arbitrage_finder import find_arbitrage_opportunities
+from odds_batch import OddsBatch
+from odds_fetcher import BOOKMAKERS, SPORTS, normalize_event_names
+
+def generate_quotes(count, seed=11):
+    """Quotes shaped like the parsers' output: two selections per event per bookmaker"""
+    rng = random.Random(seed)
+    events = max(1, count // (2 * len(BOOKMAKERS)))
+    quotes = []
+    now = time.time()
+    for i in range(events):
+        sport = SPORTS[i % len(SPORTS)]
+        home, away = f"Home Team {i}", f"Away Team {i}"
+        for bookmaker in BOOKMAKERS:
+            for selection in (home, away):
+                quotes.append({
+                    "bookmaker": bookmaker,
+                    "sport": sport,
+                    "event_id": f"{bookmaker}_{i}",
+                    "event_name": f"{home} vs {away}",
+                    "market": "moneyline",
+                    "selection": selection,
+                    "odds": round(rng.uniform(1.6, 2.4), 2),
+                    "timestamp": now,
+                    "normalized_name": ""
+                })
+    return quotes[:count]
+
+def fresh_copy(quote):
+    """Copy a quote with new string objects, as each parsed response produces its own strings"""
+    return {
+        key: "".join([value[:1], value[1:]]) if isinstance(value, str) else value
+        for key, value in quote.items()
+    }
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, current
+
+def run(sizes):
+    print(f"{'quotes':>8} {'dicts B/quote':>14} {'batch B/quote':>14} {'reduction':>10}")
+    for count in sizes:
+        source = generate_quotes(count)
+        dicts, dict_bytes = measure(lambda: [fresh_copy(q) for q in source])
+        batch, batch_bytes = measure(lambda: OddsBatch.from_records(fresh_copy(q) for q in source))
+
+        normalize_event_names(dicts)
+        normalize_event_names(batch)
+        same = (
+            [(o["event_name"], o["arbitrage_percentage"]) for o in find_arbitrage_opportunities(dicts)] ==
+            [(o["event_name"], o["arbitrage_percentage"]) for o in find_arbitrage_opportunities(batch)]
+        )
+
+        print(f"{count:>8} {dict_bytes / count:>14.1f} {batch_bytes / count:>14.1f} "
+              f"{dict_bytes / batch_bytes:>9.1f}x" + ("" if same else "  (opportunities differ!)"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quotes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+    run(args.quotes)
@@ -0,0 +1,90 @@
+"""
+Benchmark parse throughput in fetcher threads vs the parse process pool
+
+Builds Bet365, BetMGM and Stake JSON and HTML payloads with the synthetic
+bookmaker's payload builders, then parses and normalizes them with the same
+number of concurrent callers as the fetch engine: first in threads (sharing
+the GIL), then on process pools of increasing size. Reports payloads/s,
+quotes/s and speedup over threads for each worker count.
+
+Usage: python benchmarks/parse-scaling.py [--events 500] [--payloads 60] [--workers 1 2 4 8]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from odds_fetcher import parse_payload, normalize_event_names
+from parse_pool import get_parse_pool, parse_in_pool, shutdown_parse_pool
+
+def load_synthetic_module():
+    """Import synthetic-bookmaker.py, whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location("synthetic_bookmaker", os.path.join(ROOT, "synthetic-bookmaker.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def build_payloads(events_per_payload, markets):
+    """One payload of each kind, as the raw bodies make_request would hand to the parser"""
+    synthetic = load_synthetic_module()
+    world = synthetic.SyntheticWorld(events_per_payload, markets, arb_rate=0.0, seed=7)
+    events = world.snapshot("soccer")
+    stake_api = {"data": {"sport": {"matches": synthetic.stake_matches(events, markets, "odds")}}}
+    return [
+        ("bet365_json", json.dumps(synthetic.bet365_payload(events, markets)).encode()),
+        ("betmgm_json", json.dumps(synthetic.betmgm_payload(events, markets)).encode()),
+        ("stake_json", json.dumps(stake_api).encode()),
+        ("bet365_html", synthetic.bet365_html(events)),
+        ("betmgm_html", synthetic.betmgm_html(events)),
+        ("stake_html", synthetic.stake_html(events, markets))
+    ]
+
+def parse_in_thread(kind, body, sport):
+    return normalize_event_names(parse_payload(kind, body, sport))
+
+def run_workload(workload, parse, callers):
+    """Parse every payload with `callers` concurrent threads, returning (seconds, quotes)"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        results = list(executor.map(lambda item: parse(item[0], item[1], "soccer"), workload))
+    return time.perf_counter() - start, sum(len(result) for result in results)
+
+def run(args):
+    payloads = build_payloads(args.events, args.markets)
+    workload = [payloads[i % len(payloads)] for i in range(args.payloads)]
+    size = sum(len(body) for _, body in workload) / len(workload)
+    print(f"{len(workload)} payloads, {size / 1024:.0f} KB average, {os.cpu_count()} CPUs")
+    print(f"{'mode':>12} {'payloads/s':>11} {'quotes/s':>10} {'speedup':>8}")
+
+    seconds, quotes = run_workload(workload, parse_in_thread, args.callers)
+    baseline = len(workload) / seconds
+    print(f"{'threads':>12} {baseline:>11.1f} {quotes / seconds:>10.0f} {1.0:>7.2f}x")
+
+    for workers in args.workers:
+        # Start the workers before timing so process spawn is not counted
+        pool = get_parse_pool(workers)
+        list(pool.map(abs, range(workers)))
+        callers = max(args.callers, workers)
+        seconds, quotes = run_workload(
+            workload, lambda kind, body, sport: parse_in_pool(kind, body, sport, workers), callers
+        )
+        rate = len(workload) / seconds
+        print(f"{f'{workers} procs':>12} {rate:>11.1f} {quotes / seconds:>10.0f} {rate / baseline:>7.2f}x")
+
+    shutdown_parse_pool()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=500, help="events per payload")
+    parser.add_argument("--markets", type=int, default=3)
+    parser.add_argument("--payloads", type=int, default=60)
+    parser.add_argument("--callers", type=int, default=3, help="concurrent fetcher threads")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    run(parser.parse_args())
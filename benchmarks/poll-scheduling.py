@@ -0,0 +1,149 @@
+"""
+Simulate fixed vs adaptive polling on the same request budget
+
+Each bookmaker host can make one request every --slot seconds, the rate a
+fixed 2-minute cycle over ten sports uses. Sports differ in how close their
+markets sit to arbitrage, how often their prices move and how often an
+arbitrage opens (a bookmaker mispricing one selection for a while). The fixed
+policy polls every sport in turn; the adaptive policy gives each slot to the
+highest-priority due (bookmaker, sport) from PollScheduler. Reports requests
+made, arbitrages caught before they closed and the delay from opening to
+detection.
+
+Usage: python benchmarks/poll-scheduling.py [--hours 12] [--slot 12] [--seed 3]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from poll_scheduler import PollScheduler
+
+BOOKMAKERS = ["bet365", "betmgm", "stake"]
+SPORTS = ["soccer", "basketball", "hockey", "baseball", "tennis", "football", "mma", "boxing", "golf", "rugby"]
+
+# (bookmaker margin, seconds between price moves, seconds between arbitrages) per kind of market
+PROFILES = {
+    "hot": (1.015, 60, 1200),
+    "warm": (1.04, 300, 7200),
+    "cold": (1.08, 1800, 43200)
+}
+SPORT_PROFILES = dict(zip(SPORTS, ["hot", "hot", "warm", "warm", "warm", "cold", "cold", "cold", "cold", "cold"]))
+
+EVENTS_PER_SPORT = 6
+ARB_DURATION = 240
+
+class Market:
+    """Prices of one sport's events at every bookmaker, moving and mispricing at random"""
+
+    def __init__(self, sport, rng):
+        self.sport = sport
+        self.rng = rng
+        self.margin, self.move_every, self.arb_every = PROFILES[SPORT_PROFILES[sport]]
+        self.fair = [rng.uniform(1.3, 3.0) for _ in range(EVENTS_PER_SPORT)]
+        self.prices = {}
+        self.reprice()
+        # (opened at, closes at, bookmaker, event) of the open arbitrage, if any
+        self.arbitrage = None
+
+    def reprice(self):
+        for i, home in enumerate(self.fair):
+            away = home / (home - 1)
+            for bookmaker in BOOKMAKERS:
+                noise = [self.rng.uniform(0.985, 1.015) for _ in range(2)]
+                self.prices[(bookmaker, i)] = [home / self.margin * noise[0], away / self.margin * noise[1]]
+
+    def step(self, now):
+        """Advance one second, returning an arbitrage that opened"""
+        if self.rng.random() < 1.0 / self.move_every:
+            self.fair = [min(max(f * self.rng.uniform(0.95, 1.05), 1.1), 10.0) for f in self.fair]
+            self.reprice()
+        if self.arbitrage is not None and now >= self.arbitrage[1]:
+            self.arbitrage = None
+            self.reprice()
+        if self.arbitrage is None and self.rng.random() < 1.0 / self.arb_every:
+            bookmaker = self.rng.choice(BOOKMAKERS)
+            event = self.rng.randrange(EVENTS_PER_SPORT)
+            self.arbitrage = (now, now + self.rng.expovariate(1.0 / ARB_DURATION), bookmaker, event)
+            home = self.fair[event]
+            self.prices[(bookmaker, event)][0] = home * 1.08
+            return self.arbitrage
+        return None
+
+    def quotes(self, bookmaker):
+        return [
+            {"bookmaker": bookmaker, "sport": self.sport, "normalized_name": f"{self.sport} event {i}",
+             "market": "moneyline", "selection": side, "odds": round(prices[j], 2)}
+            for (quoted_by, i), prices in self.prices.items() if quoted_by == bookmaker
+            for j, side in enumerate(("home", "away"))
+        ]
+
+def simulate(policy, hours, slot, seed):
+    rng = random.Random(seed)
+    markets = {sport: Market(sport, random.Random(rng.random())) for sport in SPORTS}
+    scheduler = PollScheduler([(b, s) for b in BOOKMAKERS for s in SPORTS])
+    book = {}
+    requests = 0
+    opened = []
+    delays = []
+    pending = {}
+    rotation = {bookmaker: 0 for bookmaker in BOOKMAKERS}
+    # Stagger the hosts' slots like the per-host token buckets do
+    next_slot = {bookmaker: i * slot / len(BOOKMAKERS) for i, bookmaker in enumerate(BOOKMAKERS)}
+
+    for now in range(int(hours * 3600)):
+        for sport, market in markets.items():
+            arbitrage = market.step(now)
+            if arbitrage is not None:
+                opened.append(arbitrage)
+                pending[sport] = arbitrage
+            elif sport in pending and market.arbitrage is None:
+                del pending[sport]
+
+        for bookmaker in BOOKMAKERS:
+            if now < next_slot[bookmaker]:
+                continue
+            if policy == "fixed":
+                sport = SPORTS[rotation[bookmaker] % len(SPORTS)]
+                rotation[bookmaker] += 1
+            else:
+                due = [s for b, s in scheduler.due(now) if b == bookmaker]
+                if not due:
+                    continue
+                sport = due[0]
+            next_slot[bookmaker] = now + slot
+            requests += 1
+
+            quotes = markets[sport].quotes(bookmaker)
+            book[(bookmaker, sport)] = quotes
+            scheduler.record_poll(bookmaker, sport, quotes, now)
+            scheduler.update_closeness([quote for quotes in book.values() for quote in quotes])
+
+            arbitrage = pending.get(sport)
+            if arbitrage is not None and arbitrage[2] == bookmaker:
+                delays.append(now - arbitrage[0])
+                del pending[sport]
+
+    return requests, len(opened), delays
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)] if ordered else float("nan")
+
+def run(args):
+    print(f"{'policy':>9} {'requests':>9} {'arbs':>5} {'caught':>7} {'mean delay s':>13} {'p90 delay s':>12}")
+    for policy in ("fixed", "adaptive"):
+        requests, arbs, delays = simulate(policy, args.hours, args.slot, args.seed)
+        mean = sum(delays) / len(delays) if delays else float("nan")
+        print(f"{policy:>9} {requests:>9} {arbs:>5} {len(delays) / max(arbs, 1):>6.0%} "
+              f"{mean:>13.1f} {percentile(delays, 0.9):>12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=12)
+    parser.add_argument("--slot", type=float, default=12, help="seconds between requests to one host")
+    parser.add_argument("--seed", type=int, default=3)
+    run(parser.parse_args())
@@ -0,0 +1,191 @@
+"""
+Benchmark storage query latency before and after the normalized schema migration
+
+Builds a version 1 database (names as text, string timestamps, no indexes) with
+--odds-rows quotes and --opportunities arbitrage opportunities, times the
+dashboard and history queries on it, migrates it with DataStorage and times the
+same queries on the version 2 schema. Reports the median of --repeat runs per
+query, the migration time and the size of the data before and after.
+
+Usage: python benchmarks/query-latency.py [--odds-rows 20000000] [--opportunities 2000000] [--repeat 5]
+                                          [--db /tmp/query-bench.db] [--keep]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_storage import DataStorage
+from storage_schema import SCHEMA_V1
+
+BOOKMAKERS = ["bet365", "betmgm", "stake"]
+SPORTS = ["soccer", "basketball", "tennis", "hockey", "baseball", "football", "mma", "boxing", "golf", "rugby"]
+MARKETS = ["moneyline", "spread", "total"]
+LIVE_EVENTS = 2000
+POLL_INTERVAL = 120
+
+# The version 1 queries, as DataStorage ran them before the migration
+V1_QUERIES = {
+    "recent opportunities": ["SELECT * FROM arbitrage_opportunities ORDER BY timestamp DESC LIMIT 20"],
+    "opportunity stats": [
+        "SELECT COUNT(*) FROM arbitrage_opportunities",
+        "SELECT AVG(arbitrage_percentage) FROM arbitrage_opportunities",
+        "SELECT event_name, arbitrage_percentage, guaranteed_profit, timestamp "
+        "FROM arbitrage_opportunities ORDER BY arbitrage_percentage DESC LIMIT 1",
+        "SELECT sport, COUNT(*) as count FROM arbitrage_opportunities GROUP BY sport ORDER BY count DESC"
+    ]
+}
+
+def stamp(epoch):
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S")
+
+def build_v1(db_path, odds_rows, opportunities, seed=11):
+    """Fill a version 1 database; returns the epoch of the last poll"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    for statement in SCHEMA_V1:
+        conn.execute(statement)
+
+    per_poll = LIVE_EVENTS * len(BOOKMAKERS) * 2
+    polls = odds_rows // per_poll + 1
+    start = int(time.time()) - polls * POLL_INTERVAL
+
+    def odds():
+        written = 0
+        for poll in range(polls):
+            when = stamp(start + poll * POLL_INTERVAL)
+            # Events run for about a day of polls, then the next ones take over
+            first = poll * LIVE_EVENTS // 720
+            for event_id in range(first, first + LIVE_EVENTS):
+                sport = SPORTS[event_id % len(SPORTS)]
+                name = f"Team {event_id} vs Team {event_id + 1}"
+                for bookmaker in BOOKMAKERS:
+                    for selection in (f"Team {event_id}", f"Team {event_id + 1}"):
+                        if written == odds_rows:
+                            return
+                        written += 1
+                        yield (bookmaker, sport, name, "moneyline", selection,
+                               round(rng.uniform(1.2, 4.0), 2), when)
+
+    conn.executemany('''
+    INSERT INTO odds_history (bookmaker, sport, event_name, market, selection, odds, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', odds())
+
+    span = polls * POLL_INTERVAL
+    conn.executemany('''
+    INSERT INTO arbitrage_opportunities
+    (event_name, sport, market, arbitrage_percentage, guaranteed_profit, timestamp, details, notified)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        (f"Team {i} vs Team {i + 1}", SPORTS[i % len(SPORTS)], rng.choice(MARKETS), round(rng.uniform(0.1, 5.0), 3),
+         round(rng.uniform(0.1, 5.0), 3), stamp(start + i * span // opportunities),
+         json.dumps([{"selection": f"Team {i}", "bookmaker": rng.choice(BOOKMAKERS), "odds": 2.1,
+                      "recommended_stake": 49.0}]), 1)
+        for i in range(opportunities)
+    ))
+    conn.commit()
+    conn.close()
+    return start + (polls - 1) * POLL_INTERVAL
+
+def data_mb(db_path):
+    """Size of the pages in use, leaving out pages freed by the migration"""
+    conn = sqlite3.connect(db_path)
+    pages, free, size = (conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                         for pragma in ("page_count", "freelist_count", "page_size"))
+    conn.close()
+    return (pages - free) * size / 1e6
+
+def median_ms(query, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+def run_v1(db_path, last_poll, key, repeat):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA cache_size=-65536")
+
+    def execute_all(statements, params=()):
+        return lambda: [conn.execute(statement, params).fetchall() for statement in statements]
+
+    def first_chunk():
+        cursor = conn.execute("SELECT bookmaker, sport, event_name, market, selection, odds, "
+                              "CAST(strftime('%s', timestamp) AS INTEGER) FROM odds_history "
+                              "WHERE timestamp >= ? ORDER BY id", (stamp(last_poll - 3600),))
+        cursor.fetchmany(50000)
+
+    timings = {name: median_ms(execute_all(statements), repeat) for name, statements in V1_QUERIES.items()}
+    timings["odds series"] = median_ms(execute_all([
+        "SELECT timestamp, odds FROM odds_history WHERE bookmaker = ? AND event_name = ? "
+        "AND market = ? AND selection = ? ORDER BY id"
+    ], key), repeat)
+    timings["odds series, last day"] = median_ms(execute_all([
+        "SELECT timestamp, odds FROM odds_history WHERE bookmaker = ? AND event_name = ? "
+        "AND market = ? AND selection = ? AND timestamp >= ? ORDER BY id"
+    ], key + (stamp(last_poll - 86400),)), repeat)
+    timings["history, last hour"] = median_ms(first_chunk, repeat)
+    conn.close()
+    return timings
+
+def run_v2(storage, last_poll, key, repeat):
+    def first_chunk():
+        next(storage.iter_odds_history(since=last_poll - 3600), None)
+
+    return {
+        "recent opportunities": median_ms(lambda: storage.get_recent_opportunities(20), repeat),
+        "opportunity stats": median_ms(storage.get_opportunity_stats, repeat),
+        "odds series": median_ms(lambda: storage.get_odds_series(*key), repeat),
+        "odds series, last day": median_ms(lambda: storage.get_odds_series(*key, since=last_poll - 86400), repeat),
+        "history, last hour": median_ms(first_chunk, repeat)
+    }
+
+def run(args):
+    logging.getLogger("ArbitrageBot").setLevel(logging.WARNING)
+    if os.path.exists(args.db):
+        os.remove(args.db)
+
+    started = time.perf_counter()
+    last_poll = build_v1(args.db, args.odds_rows, args.opportunities)
+    print(f"Built version 1 database: {args.odds_rows} odds rows, {args.opportunities} opportunities "
+          f"in {time.perf_counter() - started:.0f}s ({data_mb(args.db):.0f} MB)")
+
+    # A quote of an event that was live at the end
+    event_id = (args.odds_rows // (LIVE_EVENTS * len(BOOKMAKERS) * 2)) * LIVE_EVENTS // 720
+    key = ("bet365", f"Team {event_id} vs Team {event_id + 1}", "moneyline", f"Team {event_id}")
+    before = run_v1(args.db, last_poll, key, args.repeat)
+
+    started = time.perf_counter()
+    storage = DataStorage(args.db, persistent=True)
+    print(f"Migrated to version 2 in {time.perf_counter() - started:.0f}s ({data_mb(args.db):.0f} MB)")
+    after = run_v2(storage, last_poll, key, args.repeat)
+    storage.close()
+
+    print(f"{'query':>24} {'v1 ms':>10} {'v2 ms':>10} {'speedup':>8}")
+    for name in before:
+        print(f"{name:>24} {before[name]:>10.2f} {after[name]:>10.2f} {before[name] / after[name]:>7.0f}x")
+
+    if not args.keep:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--odds-rows", type=int, default=20000000)
+    parser.add_argument("--opportunities", type=int, default=2000000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query; the median is reported")
+    parser.add_argument("--db", default="/tmp/query-bench.db")
+    parser.add_argument("--keep", action="store_true", help="keep the migrated database")
+    run(parser.parse_args())
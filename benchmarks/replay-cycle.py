@@ -0,0 +1,56 @@
+"""
+Run whole fetch -> detect cycles offline from a recorded response archive
+
+Record an archive by running the bot with RECORD_PATH set, e.g.
+    RECORD_PATH=recordings/cycle.jsonl.gz python main.py
+then replay it here to time or profile cycles without touching the live sites.
+
+Usage: python benchmarks/replay-cycle.py recordings/cycle.jsonl.gz [--speed 0] [--cycles 3]
+                                          [--engine thread|async] [--profile]
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import odds_fetcher
+from arbitrage_finder import find_arbitrage_opportunities
+
+def run_cycle(engine):
+    start = time.perf_counter()
+    odds = odds_fetcher.fetch_all_odds(engine=engine)
+    fetched = time.perf_counter()
+    opportunities = find_arbitrage_opportunities(odds)
+    detected = time.perf_counter()
+    return len(odds), len(opportunities), fetched - start, detected - fetched
+
+def run(archive, speed, cycles, engine, profile):
+    odds_fetcher.response_recorder.start_replay(archive, speed)
+    profiler = cProfile.Profile() if profile else None
+
+    print(f"{'cycle':>5} {'quotes':>8} {'opps':>6} {'fetch s':>9} {'detect s':>9}")
+    for cycle in range(1, cycles + 1):
+        if profiler:
+            profiler.enable()
+        quotes, opportunities, fetch_time, detect_time = run_cycle(engine)
+        if profiler:
+            profiler.disable()
+        print(f"{cycle:>5} {quotes:>8} {opportunities:>6} {fetch_time:>9.3f} {detect_time:>9.3f}")
+
+    print(odds_fetcher.response_recorder.get_stats())
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("archive")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay speed multiplier, 0 for no waiting")
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--engine", default=None, choices=["thread", "async"])
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+    run(args.archive, args.speed, args.cycles, args.engine, args.profile)
@@ -0,0 +1,154 @@
+"""
+Benchmark DataStorage inserts/s with per-call vs persistent WAL connections
+
+For each connection mode, saves --batches odds batches of --batch-size quotes
+(one fetched sport's worth) and --opportunities single opportunities on a fresh
+database. It then repeats the batch inserts while a reader thread polls
+get_recent_opportunities and get_opportunity_stats. Reports inserts/s, how long
+the caller waits per batch, how much the readers slowed ingest, reader latency
+and any failed (locked) operations. The write-behind mode hands batches to an
+OddsWriter on persistent connections and counts its final flush in the time.
+With the default --pace 0 batches arrive faster than any disk takes them, so
+write-behind callers end up waiting on its backpressure; pace them (e.g. 0.005)
+to see the caller's wait at a steady ingest rate (rows/s then only reflects the pace).
+
+Usage: python benchmarks/storage-throughput.py [--batches 500] [--batch-size 200] [--opportunities 1000]
+                                               [--pace 0] [--db /tmp/storage-bench.db]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_storage import DataStorage
+from odds_writer import OddsWriter
+
+BOOKMAKERS = ["bet365", "betmgm", "stake"]
+
+class ErrorCounter(logging.Handler):
+    """Counts the errors DataStorage logs instead of raising"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+def build_batch(size, rng):
+    now = time.time()
+    return [
+        {"bookmaker": rng.choice(BOOKMAKERS), "sport": "soccer", "event_name": f"Team {i} vs Team {i + 1}",
+         "market": "match_winner", "selection": f"Team {i}", "odds": round(rng.uniform(1.2, 5.0), 2),
+         "timestamp": now}
+        for i in range(size)
+    ]
+
+def build_opportunity(i):
+    return {
+        "event_name": f"Team {i} vs Team {i + 1}", "sport": "soccer", "market": "match_winner",
+        "arbitrage_percentage": 1.5, "guaranteed_profit_per_100": 1.4,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "selections": [{"selection": f"Team {i}", "bookmaker": "bet365", "odds": 2.1, "recommended_stake": 49.0}]
+    }
+
+def ingest(storage, batches, writer=None, pace=0.0):
+    """Save every batch, returning (seconds until all were written, each call's latency)"""
+    started = time.perf_counter()
+    calls = []
+    for batch in batches:
+        call = time.perf_counter()
+        if writer is not None:
+            writer.submit(batch)
+        else:
+            storage.save_batch_odds(batch)
+        calls.append(time.perf_counter() - call)
+        if pace:
+            time.sleep(pace)
+    if writer is not None:
+        writer.flush()
+    return time.perf_counter() - started, sorted(calls)
+
+def read_loop(storage, stop, latencies):
+    while not stop.is_set():
+        started = time.perf_counter()
+        storage.get_recent_opportunities(20)
+        storage.get_opportunity_stats()
+        latencies.append(time.perf_counter() - started)
+
+def run_mode(persistent, write_behind, args, errors):
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    rng = random.Random(1)
+    batches = [build_batch(args.batch_size, rng) for _ in range(args.batches)]
+    storage = DataStorage(args.db, persistent=persistent)
+    writer = OddsWriter(storage) if write_behind else None
+    errors.count = 0
+
+    seconds, calls = ingest(storage, batches, writer, args.pace)
+    rows_per_second = args.batches * args.batch_size / seconds
+
+    started = time.perf_counter()
+    for i in range(args.opportunities):
+        storage.save_arbitrage_opportunity(build_opportunity(i))
+    opportunities_per_second = args.opportunities / (time.perf_counter() - started)
+
+    # Same ingest again, now with a thread reading the dashboards throughout
+    stop = threading.Event()
+    latencies = []
+    reader = threading.Thread(target=read_loop, args=(storage, stop, latencies))
+    reader.start()
+    contended, _ = ingest(storage, batches, writer, args.pace)
+    stop.set()
+    reader.join()
+
+    if writer is not None:
+        writer.close()
+    if persistent:
+        storage.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.db + suffix):
+            os.remove(args.db + suffix)
+
+    latencies.sort()
+    return {
+        "rows_per_second": rows_per_second,
+        "caller_p50": calls[len(calls) // 2],
+        "caller_max": calls[-1],
+        "opportunities_per_second": opportunities_per_second,
+        "contended_rows_per_second": args.batches * args.batch_size / contended,
+        "read_p50": latencies[len(latencies) // 2] if latencies else float("nan"),
+        "read_max": latencies[-1] if latencies else float("nan"),
+        "reads": len(latencies),
+        "errors": errors.count
+    }
+
+def run(args):
+    errors = ErrorCounter()
+    logging.getLogger("ArbitrageBot").setLevel(logging.ERROR)
+    logging.getLogger("ArbitrageBot.DataStorage").addHandler(errors)
+    logging.getLogger("ArbitrageBot.DataStorage").propagate = False
+
+    print(f"{'mode':>12} {'rows/s':>9} {'call p50 ms':>12} {'call max ms':>12} {'opps/s':>8} {'rows/s +reads':>14} "
+          f"{'read p50 ms':>12} {'read max ms':>12} {'reads':>6} {'errors':>7}")
+    for name, persistent, write_behind in (
+        ("per-call", False, False), ("persistent", True, False), ("write-behind", True, True)
+    ):
+        r = run_mode(persistent, write_behind, args, errors)
+        print(f"{name:>12} {r['rows_per_second']:>9.0f} {r['caller_p50'] * 1000:>12.3f} {r['caller_max'] * 1000:>12.2f} "
+              f"{r['opportunities_per_second']:>8.0f} {r['contended_rows_per_second']:>14.0f} "
+              f"{r['read_p50'] * 1000:>12.2f} {r['read_max'] * 1000:>12.2f} {r['reads']:>6} {r['errors']:>7}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batches", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=200, help="quotes per save_batch_odds call")
+    parser.add_argument("--opportunities", type=int, default=1000)
+    parser.add_argument("--pace", type=float, default=0.0, help="seconds between batches")
+    parser.add_argument("--db", default="/tmp/storage-bench.db")
+    run(parser.parse_args())
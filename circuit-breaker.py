@@ -0,0 +1,133 @@
+import time
+import logging
+import threading
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("ArbitrageBot.CircuitBreaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+def endpoint_key(method, url):
+    """Identify the endpoint a request targets: method, host and path, ignoring query and fragment"""
+    parts = urlsplit(url)
+    return f"{method} {parts.scheme}://{parts.netloc}{parts.path or '/'}"
+
+class CircuitBreaker:
+    """
+    Health of one endpoint
+    After `failure_threshold` consecutive failed attempts the circuit opens and
+    requests are refused for `cool_down` seconds. It then half-opens and lets a
+    single probe through: success closes it again, failure re-opens it with the
+    cool-down doubled (up to `max_cool_down`).
+    """
+
+    def __init__(self, endpoint, failure_threshold=3, cool_down=300.0, max_cool_down=1800.0):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.base_cool_down = cool_down
+        self.max_cool_down = max_cool_down
+        self.cool_down = cool_down
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Whether a request to the endpoint may be attempted now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.time() - self.opened_at >= self.cool_down:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+                logger.info(f"Circuit for {self.endpoint} half-open, probing for recovery")
+
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+
+            self.skipped += 1
+            return False
+
+    def release(self):
+        """Give back a half-open probe that ended without reaching the endpoint"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit for {self.endpoint} closed, endpoint recovered")
+            self.state = CLOSED
+            self.failures = 0
+            self.cool_down = self.base_cool_down
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+            if self.state == HALF_OPEN:
+                self.cool_down = min(self.cool_down * 2, self.max_cool_down)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.probe_in_flight = False
+        self.times_opened += 1
+        logger.warning(f"Circuit for {self.endpoint} opened after {self.failures} failures, "
+                       f"skipping it for {self.cool_down:.0f}s")
+
+    @property
+    def is_open(self):
+        return self.state == OPEN
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "times_opened": self.times_opened,
+                "skipped": self.skipped,
+                "cool_down": self.cool_down
+            }
+
+class CircuitBreakerRegistry:
+    """Circuit breakers created on demand, one per endpoint"""
+
+    def __init__(self, failure_threshold=3, cool_down=300.0, max_cool_down=1800.0):
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.max_cool_down = max_cool_down
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, method, url):
+        """Get the breaker for the endpoint a request targets"""
+        key = endpoint_key(method, url)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(key, self.failure_threshold, self.cool_down, self.max_cool_down)
+                self._breakers[key] = breaker
+            return breaker
+
+    def get_stats(self):
+        """Get state and counters for every endpoint seen so far"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.endpoint: breaker.get_stats() for breaker in breakers}
+
+    def reset(self):
+        """Forget all endpoint health"""
+        with self._lock:
+            self._breakers.clear()
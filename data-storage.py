@@ -2,81 +2,302 @@ import os
 import json
 import pandas as pd
 import sqlite3
+import threading
 from datetime import datetime
+from functools import lru_cache
 import logging
+from odds_batch import OddsBatch
+from storage_schema import migrate
 
 logger = logging.getLogger("ArbitrageBot.DataStorage")
 
+# Keep one writer and per-thread reader connections open in WAL mode instead of connecting per call
+DB_PERSISTENT_CONNECTIONS = os.getenv("DB_PERSISTENT_CONNECTIONS", "true").lower() == "true"
+
+# Durability of commits in WAL mode: NORMAL survives crashes of the bot, FULL also power loss
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+
+# SQLite page cache per connection, in KB
+DB_CACHE_KB = int(os.getenv("DB_CACHE_KB", "65536"))
+
+# Seconds to wait for a lock held by another connection before failing
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "5"))
+
+# Compiled statements kept per connection; a long-lived connection re-runs its inserts without re-preparing them
+DB_CACHED_STATEMENTS = 256
+
+# Store a quote in odds history only when its price changed since it was last stored
+ODDS_HISTORY_DELTA = os.getenv("ODDS_HISTORY_DELTA", "false").lower() == "true"
+
+# Seconds after which an unchanged price is stored again in delta mode, so any point in history
+# is at most this far from a full picture of what was quoted
+ODDS_KEYFRAME_INTERVAL = float(os.getenv("ODDS_KEYFRAME_INTERVAL", "1800"))
+
+# Names and name combinations whose integer keys are remembered; past it the cache starts over
+DB_KEY_CACHE_SIZE = 200000
+
+INSERT_OPPORTUNITY_SQL = '''
+INSERT INTO arbitrage_opportunities 
+(event_id, sport_id, market_id, arbitrage_percentage, guaranteed_profit, timestamp, details, notified)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_ODDS_SQL = '''
+INSERT INTO odds_history 
+(bookmaker_id, event_id, market_id, selection_id, odds, timestamp)
+VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Opportunities with their names, newest first
+SELECT_OPPORTUNITIES_SQL = '''
+SELECT o.id, e.name AS event_name, s.name AS sport, m.name AS market, o.arbitrage_percentage,
+       o.guaranteed_profit, o.timestamp, o.details, o.notified
+FROM arbitrage_opportunities o
+JOIN events e ON e.id = o.event_id
+JOIN sports s ON s.id = o.sport_id
+JOIN markets m ON m.id = o.market_id
+ORDER BY o.timestamp DESC
+'''
+
+@lru_cache(maxsize=4096)
+def format_timestamp(second):
+    """Format a stored epoch second for display; memoized since rows read together share a handful of seconds"""
+    return datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+
+def parse_timestamp(value):
+    """Epoch second of a "%Y-%m-%d %H:%M:%S" local time string (or of an epoch already)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp())
+
+class OddsDeltaEncoder:
+    """
+    Reduces odds history rows to price changes
+    Remembers the last stored price of every (event, market, selection) each
+    bookmaker quotes in a sport and passes a row through only if the price is new
+    or different, or if it was last stored ODDS_KEYFRAME_INTERVAL seconds ago (a
+    keyframe). A batch covers whole (bookmaker, sport) listings, so a quote
+    missing from a listing that came back is stored once more with odds NULL
+    (a tombstone) to mark when it was pulled.
+    """
+    
+    def __init__(self, keyframe_interval=None):
+        self.keyframe_interval = ODDS_KEYFRAME_INTERVAL if keyframe_interval is None else keyframe_interval
+        # (bookmaker, sport) -> {(event_name, market, selection): (odds, epoch stored)}
+        self.last = {}
+        self.stats = {"quotes": 0, "changes": 0, "keyframes": 0, "tombstones": 0}
+        self._lock = threading.Lock()
+    
+    def encode(self, rows):
+        """Filter (bookmaker, sport, event_name, market, selection, odds, epoch) rows down to those to store"""
+        encoded = []
+        with self._lock:
+            # (bookmaker, sport) -> [keys in this batch, latest epoch]
+            seen = {}
+            for row in rows:
+                bookmaker, sport, event_name, market, selection, odds, timestamp = row
+                listing = (bookmaker, sport)
+                key = (event_name, market, selection)
+                batch = seen.get(listing)
+                if batch is None:
+                    batch = seen[listing] = [set(), timestamp]
+                batch[0].add(key)
+                batch[1] = max(batch[1], timestamp)
+                self.stats["quotes"] += 1
+                
+                stored = self.last.setdefault(listing, {})
+                previous = stored.get(key)
+                if previous is None or previous[0] != odds:
+                    self.stats["changes"] += 1
+                elif timestamp - previous[1] >= self.keyframe_interval:
+                    self.stats["keyframes"] += 1
+                else:
+                    continue
+                stored[key] = (odds, timestamp)
+                encoded.append(row)
+            
+            for listing, (keys, latest) in seen.items():
+                stored = self.last[listing]
+                for key in [key for key in stored if key not in keys]:
+                    del stored[key]
+                    encoded.append((*listing, *key, None, latest))
+                    self.stats["tombstones"] += 1
+        return encoded
+    
+    def reset(self):
+        """Forget stored prices, so the next batches are written in full"""
+        with self._lock:
+            self.last.clear()
+
 class DataStorage:
-    def __init__(self, db_path="arbitrage_data.db"):
+    def __init__(self, db_path="arbitrage_data.db", persistent=None, delta=None):
         """Initialize the data storage with a SQLite database path"""
         self.db_path = db_path
+        self.persistent = DB_PERSISTENT_CONNECTIONS if persistent is None else persistent
+        
+        # Odds history keeps price changes only, with keyframes and tombstones
+        self.delta = OddsDeltaEncoder() if (ODDS_HISTORY_DELTA if delta is None else delta) else None
+        
+        # Writes share one connection in turn; each thread reads on its own connection,
+        # which in WAL mode sees the last commit without waiting for the writer
+        self._write_lock = threading.Lock()
+        self._write_conn = None
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        
+        # Integer keys of names and of (bookmaker, sport, event, market, selection) quotes, filled as rows are written
+        self._keys = {}
+        # Whether this instance has recorded its delta encoding in storage_meta
+        self._delta_recorded = False
+        if self.persistent:
+            self._write_conn = self._connect()
+            self._write_conn.execute("PRAGMA journal_mode=WAL")
+        
         self._create_tables_if_needed()
         logger.info(f"Data storage initialized with database: {db_path}")
     
+    def _connect(self, readonly=False):
+        """Open a connection, tuned for long-lived use in persistent mode"""
+        conn = sqlite3.connect(
+            self.db_path, timeout=DB_BUSY_TIMEOUT, check_same_thread=False,
+            cached_statements=DB_CACHED_STATEMENTS
+        )
+        if self.persistent:
+            conn.execute(f"PRAGMA synchronous={DB_SYNCHRONOUS}")
+            conn.execute(f"PRAGMA cache_size=-{DB_CACHE_KB}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            if readonly:
+                conn.execute("PRAGMA query_only=ON")
+        return conn
+    
+    def _open_writer(self):
+        """
+        Connection to write on: the shared writer, or a new one per call
+        Either way the write lock is held until _close_writer, since it also guards the
+        key cache that per-call connections share.
+        """
+        self._write_lock.acquire()
+        if self.persistent:
+            return self._write_conn
+        try:
+            return self._connect()
+        except Exception:
+            self._write_lock.release()
+            raise
+    
+    def _close_writer(self, conn):
+        if conn is None:
+            return
+        # A write that failed part way must not leave its transaction open for the next writer,
+        # nor keys of the names it added in the cache
+        if conn.in_transaction:
+            conn.rollback()
+            self._keys = {}
+        if not self.persistent:
+            conn.close()
+        self._write_lock.release()
+    
+    def _open_reader(self):
+        """Connection to read on: this thread's reader, kept open, or a new one per call"""
+        if not self.persistent:
+            return self._connect(readonly=True)
+        conn = getattr(self._local, "reader", None)
+        if conn is None:
+            conn = self._local.reader = self._connect(readonly=True)
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+    
+    def _close_reader(self, conn):
+        if conn is not None and not self.persistent:
+            conn.close()
+    
+    def close(self):
+        """Close the writer and every thread's reader connection"""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._local = threading.local()
+        with self._write_lock:
+            if self._write_conn is not None:
+                self._write_conn.close()
+                self._write_conn = None
+    
     def _create_tables_if_needed(self):
-        """Create database tables if they don't exist"""
+        """
+        Create the database schema, or migrate an older one to the current version
+        Failures propagate (a database from a newer bot raises RuntimeError): the
+        bot must not run on a schema its queries do not match.
+        """
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Create table for arbitrage opportunities
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS arbitrage_opportunities (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_name TEXT,
-                sport TEXT,
-                market TEXT,
-                arbitrage_percentage REAL,
-                guaranteed_profit REAL,
-                timestamp TEXT,
-                details TEXT,
-                notified INTEGER DEFAULT 0
-            )
-            ''')
-            
-            # Create table for odds history
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS odds_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                bookmaker TEXT,
-                sport TEXT,
-                event_name TEXT,
-                market TEXT,
-                selection TEXT,
-                odds REAL,
-                timestamp TEXT
-            )
-            ''')
-            
-            conn.commit()
-            logger.info("Database tables created or already exist")
+            conn = self._open_writer()
+            version = migrate(conn)
         except Exception as e:
             logger.error(f"Error creating database tables: {str(e)}")
+            raise
         finally:
-            if conn:
-                conn.close()
+            self._close_writer(conn)
+        logger.info(f"Database schema at version {version}")
+    
+    def _name_id(self, cursor, table, name):
+        """Integer key of a name in a dimension table, adding the name if new"""
+        key = (table, name)
+        name_id = self._keys.get(key)
+        if name_id is None:
+            cursor.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+            name_id = cursor.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+            self._keys[key] = name_id
+        return name_id
+    
+    def _event_id(self, cursor, sport, event_name):
+        """Integer keys of an event and its sport, adding them if new"""
+        sport_id = self._name_id(cursor, "sports", sport)
+        key = ("events", sport_id, event_name)
+        event_id = self._keys.get(key)
+        if event_id is None:
+            cursor.execute("INSERT OR IGNORE INTO events (sport_id, name) VALUES (?, ?)", (sport_id, event_name))
+            event_id = cursor.execute(
+                "SELECT id FROM events WHERE name = ? AND sport_id = ?", (event_name, sport_id)
+            ).fetchone()[0]
+            self._keys[key] = event_id
+        return event_id, sport_id
+    
+    def _quote_ids(self, cursor, bookmaker, sport, event_name, market, selection):
+        """(bookmaker_id, event_id, market_id, selection_id) of a quote, one lookup once it has been seen"""
+        key = (bookmaker, sport, event_name, market, selection)
+        ids = self._keys.get(key)
+        if ids is None:
+            if len(self._keys) >= DB_KEY_CACHE_SIZE:
+                self._keys = {}
+            ids = self._keys[key] = (
+                self._name_id(cursor, "bookmakers", bookmaker),
+                self._event_id(cursor, sport, event_name)[0],
+                self._name_id(cursor, "markets", market),
+                self._name_id(cursor, "selections", selection)
+            )
+        return ids
     
     def save_arbitrage_opportunity(self, opportunity, notified=False):
         """Save an arbitrage opportunity to the database"""
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._open_writer()
             cursor = conn.cursor()
             
             # Convert selections list to JSON string
             details = json.dumps(opportunity["selections"])
+            event_id, sport_id = self._event_id(cursor, opportunity["sport"], opportunity["event_name"])
             
-            cursor.execute('''
-            INSERT INTO arbitrage_opportunities 
-            (event_name, sport, market, arbitrage_percentage, guaranteed_profit, timestamp, details, notified)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                opportunity["event_name"],
-                opportunity["sport"],
-                opportunity["market"],
+            cursor.execute(INSERT_OPPORTUNITY_SQL, (
+                event_id,
+                sport_id,
+                self._name_id(cursor, "markets", opportunity["market"]),
                 opportunity["arbitrage_percentage"],
                 opportunity["guaranteed_profit_per_100"],
-                opportunity["timestamp"],
+                parse_timestamp(opportunity["timestamp"]),
                 details,
                 1 if notified else 0
             ))
@@ -88,61 +309,215 @@ class DataStorage:
             logger.error(f"Error saving arbitrage opportunity: {str(e)}")
             return None
         finally:
-            if conn:
-                conn.close()
+            self._close_writer(conn)
     
-    def save_batch_odds(self, odds_data):
-        """Save a batch of odds data to the database"""
+    def prepare_odds_records(self, odds_data):
+        """Turn a list of quotes or an OddsBatch into (bookmaker, sport, event_name, market, selection, odds, epoch) records"""
+        # Read an OddsBatch's columns directly
+        columns = ("bookmaker", "sport", "event_name", "market", "selection", "odds", "timestamp")
+        if isinstance(odds_data, OddsBatch):
+            rows = odds_data.iter_tuples(*columns)
+        else:
+            rows = (tuple(odd[column] for column in columns) for odd in odds_data)
+        if self.delta is not None:
+            rows = self.delta.encode(rows)
+        
+        return [
+            (bookmaker, sport, event_name, market, selection, odds, int(timestamp))
+            for bookmaker, sport, event_name, market, selection, odds, timestamp in rows
+        ]
+    
+    def save_odds_records(self, odds_records):
+        """Insert prepared odds records in one transaction, returning whether they were saved"""
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            # Hold the writer only for the insert itself
+            conn = self._open_writer()
             cursor = conn.cursor()
-            
-            # Prepare data for batch insertion
-            odds_records = []
-            for odd in odds_data:
-                odds_records.append((
-                    odd["bookmaker"],
-                    odd["sport"],
-                    odd["event_name"],
-                    odd["market"],
-                    odd["selection"],
-                    odd["odds"],
-                    datetime.fromtimestamp(odd["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-                ))
-            
-            # Batch insert
-            cursor.executemany('''
-            INSERT INTO odds_history 
-            (bookmaker, sport, event_name, market, selection, odds, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', odds_records)
+            quote_ids = self._quote_ids
+            rows = [
+                (*quote_ids(cursor, bookmaker, sport, event_name, market, selection), odds, timestamp)
+                for bookmaker, sport, event_name, market, selection, odds, timestamp in odds_records
+            ]
+            cursor.executemany(INSERT_ODDS_SQL, rows)
+            delta = self.delta
+            if delta is not None and not self._delta_recorded:
+                # Readers such as the backtester take the history's encoding from the database, not their environment
+                cursor.execute(
+                    "INSERT OR REPLACE INTO storage_meta (key, value) VALUES ('odds_keyframe_interval', ?)",
+                    (str(delta.keyframe_interval),)
+                )
             
             conn.commit()
-            logger.info(f"Saved {len(odds_records)} odds records to database")
+            self._delta_recorded = delta is not None
+            return True
         except Exception as e:
             logger.error(f"Error saving odds data: {str(e)}")
+            # The encoder already counts these rows as stored; start the delta stream over from a full write
+            if self.delta is not None:
+                self.delta.reset()
+            return False
         finally:
-            if conn:
-                conn.close()
+            self._close_writer(conn)
+    
+    def save_batch_odds(self, odds_data):
+        """Save a batch of odds data (a list of quotes or an OddsBatch) to the database"""
+        try:
+            odds_records = self.prepare_odds_records(odds_data)
+        except Exception as e:
+            logger.error(f"Error saving odds data: {str(e)}")
+            return
+        
+        if self.save_odds_records(odds_records):
+            logger.info(f"Saved {len(odds_records)} odds records to database")
+    
+    def _first_id_at(self, cursor, epoch):
+        """
+        Lowest odds_history id from which rows are stamped at or after epoch
+        Rows are appended as they are fetched, so ids are in time order and can be bisected.
+        """
+        # Separate queries, as SQLite only answers a lone MIN or MAX from the end of the table
+        low = cursor.execute("SELECT MIN(id) FROM odds_history").fetchone()[0]
+        if low is None:
+            return 0
+        high = cursor.execute("SELECT MAX(id) FROM odds_history").fetchone()[0] + 1
+        while low < high:
+            middle = (low + high) // 2
+            stamped = cursor.execute(
+                "SELECT timestamp FROM odds_history WHERE id >= ? ORDER BY id LIMIT 1", (middle,)
+            ).fetchone()[0]
+            if stamped >= epoch:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+    
+    def _time_range(self, cursor, since, until):
+        """WHERE conditions and parameters selecting odds_history rows stamped between since and until"""
+        conditions = []
+        params = []
+        if since is not None:
+            since = parse_timestamp(since)
+            conditions.append("o.id >= ? AND o.timestamp >= ?")
+            params.extend([self._first_id_at(cursor, since), since])
+        if until is not None:
+            until = parse_timestamp(until)
+            conditions.append("o.id < ? AND o.timestamp < ?")
+            params.extend([self._first_id_at(cursor, until), until])
+        return conditions, params
+    
+    def get_keyframe_interval(self):
+        """
+        Keyframe interval the odds history was delta-encoded with, or None if it holds every poll
+        Read from the database, whatever ODDS_HISTORY_DELTA is set to in this process
+        """
+        conn = None
+        try:
+            conn = self._open_reader()
+            row = conn.execute("SELECT value FROM storage_meta WHERE key = 'odds_keyframe_interval'").fetchone()
+            return float(row[0]) if row is not None else None
+        except Exception as e:
+            logger.error(f"Error reading storage metadata: {str(e)}")
+            return None
+        finally:
+            self._close_reader(conn)
+    
+    def iter_odds_history(self, since=None, until=None, chunk_size=50000):
+        """
+        Stream odds history in insertion (and so time) order, in chunks of rows
+        Each row is (bookmaker, sport, event_name, market, selection, odds, epoch seconds);
+        in delta history odds is None where a quote was pulled. since/until are
+        "%Y-%m-%d %H:%M:%S" local times or epoch seconds, found by bisecting ids.
+        """
+        conn = None
+        try:
+            conn = self._open_reader()
+            cursor = conn.cursor()
+            
+            conditions, params = self._time_range(cursor, since, until)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            
+            # Rows are appended as they are fetched, so rowid order is time order without sorting the table
+            cursor.execute(f'''
+            SELECT b.name, s.name, e.name, m.name, sel.name, o.odds, o.timestamp
+            FROM odds_history o
+            JOIN bookmakers b ON b.id = o.bookmaker_id
+            JOIN events e ON e.id = o.event_id
+            JOIN sports s ON s.id = e.sport_id
+            JOIN markets m ON m.id = o.market_id
+            JOIN selections sel ON sel.id = o.selection_id
+            {where}
+            ORDER BY o.id
+            ''', params)
+            
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        except Exception as e:
+            logger.error(f"Error reading odds history: {str(e)}")
+        finally:
+            self._close_reader(conn)
+    
+    def get_odds_series(self, bookmaker, event_name, market, selection, since=None, until=None):
+        """
+        Price history of one quote as (timestamp, odds) at each change
+        Repeats of a price (every poll in full history, keyframes in delta history) fold
+        into the row that set it, so both ways of storing give the same series. Delta
+        history also marks when the quote was pulled, with odds None.
+        """
+        conn = None
+        try:
+            conn = self._open_reader()
+            cursor = conn.cursor()
+            
+            # Without an index on the quote, a time range keeps the scan to its stretch of ids,
+            # and the names are turned into keys once so rows are matched on integers
+            conditions, params = self._time_range(cursor, since, until)
+            conditions += [
+                "o.bookmaker_id = (SELECT id FROM bookmakers WHERE name = ?)",
+                "o.event_id IN (SELECT id FROM events WHERE name = ?)",
+                "o.market_id = (SELECT id FROM markets WHERE name = ?)",
+                "o.selection_id = (SELECT id FROM selections WHERE name = ?)"
+            ]
+            params += [bookmaker, event_name, market, selection]
+            
+            cursor.execute(f'''
+            SELECT o.timestamp, o.odds
+            FROM odds_history o
+            WHERE {' AND '.join(conditions)}
+            ORDER BY o.id
+            ''', params)
+            
+            series = []
+            for timestamp, odds in cursor:
+                if not series or series[-1][1] != odds:
+                    series.append((format_timestamp(timestamp), odds))
+            return series
+        except Exception as e:
+            logger.error(f"Error reading odds series: {str(e)}")
+            return []
+        finally:
+            self._close_reader(conn)
     
     def get_recent_opportunities(self, limit=10):
         """Get recent arbitrage opportunities"""
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = self._open_reader()
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             
-            cursor.execute('''
-            SELECT * FROM arbitrage_opportunities
-            ORDER BY timestamp DESC
-            LIMIT ?
-            ''', (limit,))
+            # Walks the timestamp index from the newest end and stops after `limit` rows
+            cursor.execute(SELECT_OPPORTUNITIES_SQL + "LIMIT ?", (limit,))
             
             rows = cursor.fetchall()
             opportunities = []
             
             for row in rows:
                 opp = dict(row)
+                opp["timestamp"] = format_timestamp(opp["timestamp"])
                 # Parse JSON details back to list
                 opp["selections"] = json.loads(opp["details"])
                 del opp["details"]
@@ -153,17 +528,17 @@ class DataStorage:
             logger.error(f"Error retrieving recent opportunities: {str(e)}")
             return []
         finally:
-            if conn:
-                conn.close()
+            self._close_reader(conn)
     
     def export_opportunities_to_csv(self, filename="arbitrage_opportunities.csv"):
         """Export all arbitrage opportunities to a CSV file"""
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            query = "SELECT * FROM arbitrage_opportunities ORDER BY timestamp DESC"
-            df = pd.read_sql_query(query, conn)
+            conn = self._open_reader()
+            df = pd.read_sql_query(SELECT_OPPORTUNITIES_SQL, conn)
             
             # Process the details column to make it readable
+            df["timestamp"] = df["timestamp"].apply(format_timestamp)
             df["details"] = df["details"].apply(lambda x: json.loads(x) if x else [])
             
             df.to_csv(filename, index=False)
@@ -173,13 +548,13 @@ class DataStorage:
             logger.error(f"Error exporting opportunities to CSV: {str(e)}")
             return False
         finally:
-            if conn:
-                conn.close()
+            self._close_reader(conn)
     
     def get_opportunity_stats(self):
         """Get statistics about arbitrage opportunities"""
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._open_reader()
             cursor = conn.cursor()
             
             # Total opportunities
@@ -192,18 +567,21 @@ class DataStorage:
             
             # Best opportunity
             cursor.execute("""
-            SELECT event_name, arbitrage_percentage, guaranteed_profit, timestamp 
-            FROM arbitrage_opportunities 
-            ORDER BY arbitrage_percentage DESC LIMIT 1
+            SELECT e.name, o.arbitrage_percentage, o.guaranteed_profit, o.timestamp
+            FROM arbitrage_opportunities o
+            JOIN events e ON e.id = o.event_id
+            ORDER BY o.arbitrage_percentage DESC LIMIT 1
             """)
             best = cursor.fetchone()
+            if best is not None:
+                best = (best[0], best[1], best[2], format_timestamp(best[3]))
             
             # Opportunities by sport
             cursor.execute("""
-            SELECT sport, COUNT(*) as count 
-            FROM arbitrage_opportunities 
-            GROUP BY sport 
-            ORDER BY count DESC
+            SELECT s.name, c.count
+            FROM (SELECT sport_id, COUNT(*) AS count FROM arbitrage_opportunities GROUP BY sport_id) c
+            JOIN sports s ON s.id = c.sport_id
+            ORDER BY c.count DESC
             """)
             sports = {row[0]: row[1] for row in cursor.fetchall()}
             
@@ -217,5 +595,4 @@ class DataStorage:
             logger.error(f"Error getting opportunity stats: {str(e)}")
             return {}
         finally:
-            if conn:
-                conn.close()
+            self._close_reader(conn)
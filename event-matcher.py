@@ -0,0 +1,280 @@
+import os
+import re
+import logging
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+logger = logging.getLogger("ArbitrageBot.EventMatcher")
+
+# Minimum similarity (0-1) for two event names to be treated as the same event
+MATCH_THRESHOLD = float(os.getenv("EVENT_MATCH_THRESHOLD", "0.75"))
+
+# Number of best-overlapping clusters scored in full for each new event name
+MAX_CANDIDATES = 5
+
+# Trigrams shared by more clusters than this are too common to narrow the search
+MAX_POSTINGS = 200
+
+# Common abbreviations expanded before comparison
+TEAM_ALIASES = {
+    "man utd": "manchester united",
+    "man united": "manchester united",
+    "man city": "manchester city",
+    "utd": "united",
+    "st": "saint",
+    "ny": "new york",
+    "la": "los angeles",
+    "okc": "oklahoma city",
+    "psg": "paris saint germain"
+}
+
+# Tokens that carry no identity
+STOPWORDS = {"fc", "afc", "cf", "sc", "ac", "the", "club"}
+
+SIDE_SEPARATOR_PATTERN = re.compile(r'\s+(?:vs|v|@)\s+', flags=re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+ALIAS_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(alias) for alias in sorted(TEAM_ALIASES, key=len, reverse=True)) + r')\b'
+)
+
+# Precompiled patterns for event name normalization
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PARENTHESES_PATTERN = re.compile(r'\([^)]*\)')
+AT_SEPARATOR_PATTERN = re.compile(r'@')
+V_SEPARATOR_PATTERN = re.compile(r' v ')
+DASH_SEPARATOR_PATTERN = re.compile(r' - ')
+VS_SPLIT_PATTERN = re.compile(r'\s+vs\s+', flags=re.IGNORECASE)
+
+# Maximum number of distinct (event_name, sport) pairs kept in the normalization cache
+NORMALIZE_CACHE_SIZE = int(os.getenv("NORMALIZE_CACHE_SIZE", "4096"))
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_event_name(name, sport):
+    """Normalize a single event name; memoized since the same events recur every cycle"""
+    # Remove common formatting differences
+    name = WHITESPACE_PATTERN.sub(' ', name).strip()  # Normalize whitespace
+    name = PARENTHESES_PATTERN.sub('', name).strip()  # Remove parentheses
+    name = AT_SEPARATOR_PATTERN.sub('vs', name)  # Standardize team separator
+    name = V_SEPARATOR_PATTERN.sub(' vs ', name)  # Another common separator
+    name = DASH_SEPARATOR_PATTERN.sub(' vs ', name)  # Another common separator
+
+    # Extract teams
+    if "vs" in name.lower():
+        parts = VS_SPLIT_PATTERN.split(name)
+        teams = [p.strip() for p in parts if p.strip()]
+
+        # Sort teams alphabetically for consistency
+        if len(teams) >= 2:
+            teams = sorted(teams[:2])
+            normalized_name = f"{teams[0]} vs {teams[1]}"
+        else:
+            normalized_name = name
+    else:
+        normalized_name = name
+
+    # Add sport for further disambiguation
+    return f"{normalized_name} ({sport})"
+
+@lru_cache(maxsize=65536)
+def side_features(text):
+    """
+    Features for one side of an event (a team or player name)
+    Returns (tokens, trigrams): tokens are used for scoring, trigrams for the candidate index
+    """
+    text = ALIAS_PATTERN.sub(lambda m: TEAM_ALIASES[m.group(1)], text.lower())
+    tokens = tuple(token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS)
+
+    trigrams = set()
+    for token in tokens:
+        padded = f"#{token}#"
+        for i in range(len(padded) - 2):
+            trigrams.add(padded[i:i + 3])
+    return tokens, frozenset(trigrams)
+
+@lru_cache(maxsize=65536)
+def token_similarity(a, b):
+    """Similarity of two tokens, tolerant of small spelling differences"""
+    if a == b:
+        return 1.0
+    # Numbers (squad numbers, age groups, years) must match exactly: "U21" is not "U23"
+    if any(char.isdigit() for char in a + b):
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+def side_similarity(a, b):
+    """
+    Similarity of two sides from their tokens
+    Every token on each side must have a close counterpart on the other, so
+    "Team 2" and "Team 3" or "Chelsea" and "Chelsea Reserves" stay apart
+    """
+    tokens_a, tokens_b = a[0], b[0]
+    if tokens_a == tokens_b:
+        return 1.0
+    if not tokens_a or not tokens_b:
+        return 0.0
+
+    return min(
+        best_token_matches(tokens_a, tokens_b) / len(tokens_a),
+        best_token_matches(tokens_b, tokens_a) / len(tokens_b)
+    )
+
+def best_token_matches(tokens, others):
+    """Sum over tokens of the similarity to their closest counterpart in others"""
+    total = 0.0
+    for token in tokens:
+        if token in others:
+            total += 1.0
+        else:
+            total += max(token_similarity(token, other) for other in others)
+    return total
+
+def split_sides(normalized_name, sport):
+    """Split a normalized event name into its sides, dropping the sport suffix"""
+    suffix = f" ({sport})"
+    if normalized_name.endswith(suffix):
+        normalized_name = normalized_name[:-len(suffix)]
+    return [side.strip() for side in SIDE_SEPARATOR_PATTERN.split(normalized_name) if side.strip()]
+
+def score_sides(sides_a, sides_b):
+    """
+    Similarity of two events compared side by side
+    Returns (score, alignment) where alignment[j] is the index in sides_a matching sides_b[j].
+    Every side has to match, so sharing one team is not enough.
+    """
+    if len(sides_a) != len(sides_b) or not sides_a:
+        return 0.0, None
+
+    if len(sides_a) == 1:
+        return side_similarity(sides_a[0], sides_b[0]), [0]
+
+    if len(sides_a) == 2:
+        straight = min(side_similarity(sides_a[0], sides_b[0]), side_similarity(sides_a[1], sides_b[1]))
+        if straight == 1.0:
+            return straight, [0, 1]
+        crossed = min(side_similarity(sides_a[0], sides_b[1]), side_similarity(sides_a[1], sides_b[0]))
+        if crossed > straight:
+            return crossed, [1, 0]
+        return straight, [0, 1]
+
+    # More than two sides: compare in order
+    return min(side_similarity(a, b) for a, b in zip(sides_a, sides_b)), list(range(len(sides_a)))
+
+class EventCluster:
+    """A canonical event and the differently-named listings merged into it"""
+
+    def __init__(self, name, sides, bookmakers):
+        self.name = name
+        self.sides = sides
+        self.bookmakers = set(bookmakers)
+        self.members = [(name, None)]
+
+class EventIndex:
+    """Trigram index of canonical events for one sport and market"""
+
+    def __init__(self, threshold=None):
+        self.threshold = MATCH_THRESHOLD if threshold is None else threshold
+        self.clusters = []
+        self.postings = defaultdict(list)
+
+    def add(self, name, sides, bookmakers):
+        """Place an event name into the best matching cluster, or start a new one"""
+        features = set().union(*(trigrams for _, trigrams in sides))
+
+        # Count shared trigrams with existing clusters, skipping overly common trigrams
+        overlap = Counter()
+        for trigram in features:
+            posting = self.postings.get(trigram)
+            if posting and len(posting) <= MAX_POSTINGS:
+                overlap.update(posting)
+
+        best_cluster = None
+        best_score = self.threshold
+        best_alignment = None
+        for cluster_id, _ in overlap.most_common(MAX_CANDIDATES):
+            cluster = self.clusters[cluster_id]
+
+            # A bookmaker lists each event once, so never merge two of its own listings
+            if cluster.bookmakers & bookmakers:
+                continue
+
+            score, alignment = score_sides(cluster.sides, sides)
+            if score >= best_score:
+                best_cluster, best_score, best_alignment = cluster, score, alignment
+                if score == 1.0:
+                    break
+
+        if best_cluster is not None:
+            best_cluster.members.append((name, best_alignment))
+            best_cluster.bookmakers |= bookmakers
+            return best_cluster
+
+        cluster = EventCluster(name, sides, bookmakers)
+        cluster_id = len(self.clusters)
+        self.clusters.append(cluster)
+        for trigram in features:
+            self.postings[trigram].append(cluster_id)
+        return cluster
+
+def canonical_selections(cluster, items_by_name, threshold):
+    """Map each side of the canonical event to the selection name its own listing uses"""
+    side_selections = {}
+    for item in items_by_name[cluster.name]:
+        side = match_selection_side(item["selection"], cluster.sides, threshold)
+        if side is not None and side not in side_selections:
+            side_selections[side] = item["selection"]
+    return side_selections
+
+def match_selection_side(selection, sides, threshold):
+    """Index of the event side a selection names, or None (e.g. for a draw)"""
+    features = side_features(selection)
+    best_side = None
+    best_score = threshold
+    for i, side in enumerate(sides):
+        score = side_similarity(features, side)
+        if score >= best_score:
+            best_side, best_score = i, score
+    return best_side
+
+def cluster_events(odds_data, threshold=None):
+    """
+    Group quotes into canonical events across bookmakers using fuzzy name matching
+    Candidates are found through a trigram index per sport and market and only the best
+    few are scored, so the cost is close to linear in the number of distinct event names.
+    Quotes from merged listings have their selection renamed to the canonical listing's
+    selection for the same side.
+    Returns a dict of "<canonical name>_<market>" -> list of quotes
+    """
+    threshold = MATCH_THRESHOLD if threshold is None else threshold
+
+    # Identical normalized names need no fuzzy matching
+    items_by_group = {}
+    for item in odds_data:
+        group = items_by_group.setdefault((item["sport"], item["market"]), {})
+        group.setdefault(item["normalized_name"], []).append(item)
+
+    matched_events = {}
+    for (sport, market), items_by_name in items_by_group.items():
+        index = EventIndex(threshold)
+        for name, items in items_by_name.items():
+            sides = [side_features(side) for side in split_sides(name, sport)]
+            index.add(name, sides, {item["bookmaker"] for item in items})
+
+        for cluster in index.clusters:
+            event_odds = list(items_by_name[cluster.name])
+
+            if len(cluster.members) > 1:
+                side_selections = canonical_selections(cluster, items_by_name, threshold)
+                for name, alignment in cluster.members[1:]:
+                    member_sides = [side_features(side) for side in split_sides(name, sport)]
+                    for item in items_by_name[name]:
+                        side = match_selection_side(item["selection"], member_sides, threshold)
+                        canonical = side_selections.get(alignment[side]) if side is not None else None
+                        if canonical is not None and canonical != item["selection"]:
+                            item = dict(item, selection=canonical)
+                        event_odds.append(item)
+                logger.debug(f"Matched {len(cluster.members)} listings as {cluster.name}")
+
+            matched_events[f"{cluster.name}_{market}"] = event_odds
+
+    return matched_events
@@ -0,0 +1,90 @@
+import os
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger("ArbitrageBot.HTMLBackend")
+
+try:
+    import lxml
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Containers each bookmaker's HTML parser actually reads
+TARGET_CONTAINERS = {
+    "bet365": {"classes": {"gl-Market_Container"}, "json_scripts": False},
+    "betmgm": {"classes": {"option-group"}, "json_scripts": False},
+    "stake": {"classes": {"sport-event"}, "json_scripts": True}
+}
+
+# Selected parser backend (see BACKENDS)
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "html.parser")
+
+# Backends we have already warned about, so a bad setting is logged once rather than per page
+_warned_backends = set()
+
+def get_target_strainer(bookmaker):
+    """Build a SoupStrainer that keeps only the containers the bookmaker's parser reads"""
+    target = TARGET_CONTAINERS.get(bookmaker)
+    if target is None:
+        return None
+
+    classes = target["classes"]
+    json_scripts = target["json_scripts"]
+
+    def is_target(name, attrs=None):
+        # Newer bs4 releases only pass the tag name here; keep everything rather than guess
+        if attrs is None:
+            return True
+        if json_scripts and name == "script" and attrs.get("type") == "application/json":
+            return True
+        tag_classes = attrs.get("class") or ""
+        if isinstance(tag_classes, str):
+            tag_classes = tag_classes.split()
+        return any(tag_class in classes for tag_class in tag_classes)
+
+    return SoupStrainer(is_target)
+
+def parse_full_python(text, bookmaker):
+    """Build the full tree with the pure-Python html.parser"""
+    return BeautifulSoup(text, "html.parser")
+
+def parse_full_lxml(text, bookmaker):
+    """Build the full tree with the C-accelerated lxml parser"""
+    return BeautifulSoup(text, "lxml")
+
+def parse_targeted_python(text, bookmaker):
+    """Build only the relevant container subtrees with html.parser"""
+    return BeautifulSoup(text, "html.parser", parse_only=get_target_strainer(bookmaker))
+
+def parse_targeted_lxml(text, bookmaker):
+    """Build only the relevant container subtrees with lxml"""
+    return BeautifulSoup(text, "lxml", parse_only=get_target_strainer(bookmaker))
+
+BACKENDS = {
+    "html.parser": parse_full_python,
+    "lxml": parse_full_lxml,
+    "html.parser-targeted": parse_targeted_python,
+    "lxml-targeted": parse_targeted_lxml
+}
+
+def get_available_backends():
+    """List the backends that can run in this environment"""
+    return [name for name in BACKENDS if LXML_AVAILABLE or not name.startswith("lxml")]
+
+def parse_html(text, bookmaker, backend=None):
+    """Parse a bookmaker HTML page with the selected backend, returning a BeautifulSoup tree"""
+    backend = backend or HTML_PARSER_BACKEND
+
+    if backend not in BACKENDS:
+        if backend not in _warned_backends:
+            _warned_backends.add(backend)
+            logger.warning(f"Unknown HTML parser backend '{backend}', using html.parser")
+        backend = "html.parser"
+    elif backend.startswith("lxml") and not LXML_AVAILABLE:
+        if backend not in _warned_backends:
+            _warned_backends.add(backend)
+            logger.warning(f"lxml is not installed, using html.parser instead of '{backend}'")
+        backend = backend.replace("lxml", "html.parser", 1)
+
+    return BACKENDS[backend](text, bookmaker)
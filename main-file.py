@@ -5,8 +5,14 @@ import threading
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
-from odds_fetcher import fetch_all_odds
+from odds_fetcher import BOOKMAKERS, FETCH_ENGINE, SPORTS, fetch_all_odds, fetch_selected_odds, normalize_event_names
 from arbitrage_finder import find_arbitrage_opportunities
+from odds_pipeline import OddsPipeline
+from odds_book import OddsBook
+from opportunity_tracker import OpportunityTracker
+from poll_scheduler import PollScheduler
+from data_storage import DataStorage
+from odds_writer import OddsWriter
 from email_sender import send_email, send_test_email
 from heartbeat import ping_heartbeat
 from server import start_server
@@ -28,9 +34,47 @@ logger = logging.getLogger("ArbitrageBot")
 # Track if we've sent the initial test email
 test_email_sent = False
 
+# "barrier" fetches everything before detecting, "streaming" detects per sport as quotes arrive
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "barrier")
+
+# Keep quotes in a long-lived odds book so a bookmaker missing one cycle still counts until its quotes expire
+USE_ODDS_BOOK = os.getenv("ODDS_BOOK", "false").lower() == "true"
+
+odds_book = OddsBook() if USE_ODDS_BOOK else None
+
+# Remembers alerted opportunities so a persistent arb is emailed once, not every cycle
+opportunity_tracker = OpportunityTracker()
+
+# "fixed" runs a full cycle every 2 minutes, "adaptive" polls each bookmaker and sport on its own interval
+POLL_MODE = os.getenv("POLL_MODE", "fixed")
+
+# Seconds between checks for bookmakers and sports that are due a poll
+POLL_CHECK_INTERVAL = int(os.getenv("POLL_CHECK_INTERVAL", "5"))
+
+# Adaptive mode polls subsets of the markets, so the latest quotes for the rest live in an odds book
+poll_book = OddsBook()
+poll_scheduler = PollScheduler([(bookmaker, sport) for bookmaker in BOOKMAKERS for sport in SPORTS],
+                               ttl_for=poll_book.ttl_for)
+
+# Record every fetched quote in odds_history (e.g. for backtester.py), written behind the fetch loop
+STORE_ODDS_HISTORY = os.getenv("STORE_ODDS_HISTORY", "false").lower() == "true"
+
+odds_writer = OddsWriter(DataStorage()) if STORE_ODDS_HISTORY else None
+
+# Streaming pipeline, created on first use so its fresh-quote book carries across cycles
+odds_pipeline = None
+
+def send_alerts(alerts):
+    """Email each alert, telling the tracker which were delivered so failed ones are retried"""
+    for opp in alerts:
+        if send_email(opp):
+            opportunity_tracker.mark_sent(opp)
+        else:
+            opportunity_tracker.mark_failed(opp)
+
 def check_for_arbitrage():
     """Main function to check for arbitrage opportunities"""
-    global test_email_sent
+    global test_email_sent, odds_pipeline
     
     try:
         logger.info("Starting arbitrage check")
@@ -41,18 +85,40 @@ def check_for_arbitrage():
             test_email_sent = True
             logger.info("Test email sent successfully")
         
+        if PIPELINE_MODE == "streaming":
+            if odds_pipeline is None:
+                odds_pipeline = OddsPipeline(notify=send_email, tracker=opportunity_tracker)
+            
+            # Opportunities are emailed by the pipeline as soon as they are detected
+            opportunities = odds_pipeline.run_cycle()
+            if not opportunities:
+                logger.info("No new arbitrage opportunities found")
+            return
+        
         # Fetch odds from all bookmakers
         all_odds = fetch_all_odds()
         logger.info(f"Fetched odds for {len(all_odds)} events")
         
+        if odds_writer is not None:
+            odds_writer.submit(all_odds)
+        
+        if odds_book is not None:
+            odds_book.update(all_odds)
+            all_odds = odds_book.get_quotes()
+            stats = odds_book.get_stats()
+            logger.info(f"Odds book holds {stats['quotes']} quotes for {stats['events']} events "
+                        f"({stats['expired']} expired, {stats['delisted']} delisted, {stats['evicted']} evicted so far)")
+        
         # Find arbitrage opportunities
         opportunities = find_arbitrage_opportunities(all_odds)
         
-        # Send email if opportunities found
+        # Send email for new or materially changed opportunities
         if opportunities:
             logger.info(f"Found {len(opportunities)} arbitrage opportunities!")
-            for opp in opportunities:
-                send_email(opp)
+            alerts = opportunity_tracker.pending(opportunities)
+            if len(alerts) < len(opportunities):
+                logger.info(f"{len(opportunities) - len(alerts)} already alerted and unchanged, emailing {len(alerts)}")
+            send_alerts(alerts)
         else:
             logger.info("No arbitrage opportunities found")
             
@@ -70,6 +136,63 @@ def check_for_arbitrage():
         except Exception as email_error:
             logger.error(f"Failed to send error email: {str(email_error)}")
 
+def check_due_markets():
+    """Poll the bookmakers and sports that are due and check the odds book for arbitrage"""
+    global test_email_sent
+    
+    targets = poll_scheduler.due()
+    if not targets:
+        return
+    
+    try:
+        if not test_email_sent:
+            send_test_email()
+            test_email_sent = True
+            logger.info("Test email sent successfully")
+        
+        logger.info(f"Polling {len(targets)} due markets: {', '.join(f'{b}/{s}' for b, s in targets)}")
+        collector = fetch_selected_odds(targets)
+        
+        for bookmaker, sport in targets:
+            key = (bookmaker, sport)
+            # A failed or unfinished poll must not delist the bookmaker's quotes or reset the
+            # target's prices; they stay until their TTL runs out and the target is retried
+            if key in collector.errors or key not in collector.results:
+                poll_scheduler.record_failure(bookmaker, sport)
+                continue
+            
+            odds = normalize_event_names(collector.results[key])
+            poll_book.update(odds, listings=[(sport, bookmaker)])
+            poll_scheduler.record_poll(bookmaker, sport, odds)
+            if odds_writer is not None:
+                odds_writer.submit(odds)
+        
+        # Detection covers the whole book so opportunities in markets not polled this time stay open
+        quotes = poll_book.get_quotes()
+        poll_scheduler.update_closeness(quotes)
+        opportunities = find_arbitrage_opportunities(quotes)
+        
+        alerts = opportunity_tracker.pending(opportunities)
+        if alerts:
+            logger.info(f"Found {len(alerts)} new or changed arbitrage opportunities!")
+            send_alerts(alerts)
+        
+        next_poll = poll_scheduler.next_wakeup()
+        logger.info(f"Odds book holds {len(poll_book)} quotes; next market due in {next_poll:.0f}s")
+        
+    except Exception as e:
+        error_message = f"Error in arbitrage check: {str(e)}"
+        logger.error(error_message)
+        
+        try:
+            send_email({
+                "type": "error",
+                "message": error_message,
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            })
+        except Exception as email_error:
+            logger.error(f"Failed to send error email: {str(email_error)}")
+
 def start_flask_server():
     """Start the Flask server in a separate thread"""
     thread = threading.Thread(target=start_server)
@@ -84,11 +207,23 @@ def main():
     # Start the Flask server for health checks
     start_flask_server()
     
-    # Run immediately on startup
-    check_for_arbitrage()
-    
-    # Schedule regular checks
-    schedule.every(2).minutes.do(check_for_arbitrage)
+    if POLL_MODE == "adaptive":
+        # Adaptive polls go through the poll book with the threaded fetcher; CYCLE_DEADLINE still applies
+        unused = [name for name, used in [("PIPELINE_MODE=streaming", PIPELINE_MODE == "streaming"),
+                                          ("ODDS_BOOK", USE_ODDS_BOOK),
+                                          ("FETCH_ENGINE=async", FETCH_ENGINE == "async")] if used]
+        if unused:
+            logger.warning(f"POLL_MODE=adaptive ignores {', '.join(unused)}")
+        
+        # Every market is due on startup; after that each is polled on its own interval
+        check_due_markets()
+        schedule.every(POLL_CHECK_INTERVAL).seconds.do(check_due_markets)
+    else:
+        # Run immediately on startup
+        check_for_arbitrage()
+        
+        # Schedule regular checks
+        schedule.every(2).minutes.do(check_for_arbitrage)
     schedule.every(3).minutes.do(ping_heartbeat)
     
     logger.info("Scheduled tasks have been set up")
@@ -114,6 +249,10 @@ def main():
             pass
         
         raise
+    finally:
+        # Write out odds history still queued before exiting
+        if odds_writer is not None:
+            odds_writer.close()
 
 if __name__ == "__main__":
     main()
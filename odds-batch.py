@@ -0,0 +1,150 @@
+import logging
+from array import array
+
+logger = logging.getLogger("ArbitrageBot.OddsBatch")
+
+# Repeated string fields stored once per distinct value, with a code per quote
+CATEGORICAL_COLUMNS = [
+    "bookmaker", "sport", "event_id", "event_name", "market", "selection", "normalized_name"
+]
+
+# Numeric fields stored in typed arrays
+NUMERIC_COLUMNS = ["odds", "timestamp"]
+
+COLUMNS = CATEGORICAL_COLUMNS + NUMERIC_COLUMNS
+
+class Categorical:
+    """Column of repeated values stored as integer codes into a table of distinct values"""
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+        self.codes = array("I")
+
+    def encode(self, value):
+        """Get the code for a value, adding it to the table if new"""
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.index[value] = code
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self.encode(value))
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __len__(self):
+        return len(self.codes)
+
+class OddsBatch:
+    """
+    Compact columnar store of odds quotes
+    Accepts the same quote dicts the parsers produce (append/extend like a list)
+    and yields them back as dicts when iterated, so it can stand in for a list of
+    quotes while holding each distinct string once and prices in typed arrays.
+    """
+
+    def __init__(self, records=None):
+        self.categoricals = {name: Categorical() for name in CATEGORICAL_COLUMNS}
+        self.numerics = {name: array("d") for name in NUMERIC_COLUMNS}
+        if records is not None:
+            self.extend(records)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a batch from an iterable of quote dicts"""
+        return cls(records)
+
+    def append(self, record):
+        """Append one quote dict"""
+        for name, column in self.categoricals.items():
+            column.append(record.get(name, ""))
+        self.numerics["odds"].append(float(record["odds"]))
+        self.numerics["timestamp"].append(float(record["timestamp"]))
+
+    def extend(self, records):
+        """Append quote dicts, or all rows of another batch"""
+        if isinstance(records, OddsBatch):
+            for name, column in self.categoricals.items():
+                other = records.categoricals[name]
+                remap = [column.encode(value) for value in other.values]
+                column.codes.extend(remap[code] for code in other.codes)
+            for name, column in self.numerics.items():
+                column.extend(records.numerics[name])
+            return
+
+        for record in records:
+            self.append(record)
+
+    def truncate(self, length):
+        """Drop the quotes after the first length, like del records[length:] on a list"""
+        for column in self.categoricals.values():
+            del column.codes[length:]
+        for column in self.numerics.values():
+            del column[length:]
+
+    def __len__(self):
+        return len(self.numerics["odds"])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def row(self, i):
+        """Materialize one quote as a dict"""
+        record = {name: column[i] for name, column in self.categoricals.items()}
+        for name, column in self.numerics.items():
+            record[name] = column[i]
+        return record
+
+    def to_records(self):
+        """Materialize all quotes as a list of dicts"""
+        return list(self)
+
+    def column(self, name):
+        """Get a column as a list of values"""
+        if name in self.numerics:
+            return list(self.numerics[name])
+        column = self.categoricals[name]
+        values = column.values
+        return [values[code] for code in column.codes]
+
+    def iter_tuples(self, *names):
+        """Yield one tuple per quote holding the requested columns, without building dicts"""
+        columns = [self.column(name) for name in names]
+        return zip(*columns)
+
+    def value_counts(self, name):
+        """Count quotes per distinct value of a categorical column"""
+        column = self.categoricals[name]
+        counts = [0] * len(column.values)
+        for code in column.codes:
+            counts[code] += 1
+        return {value: count for value, count in zip(column.values, counts) if count}
+
+    def set_normalized_names(self, normalize):
+        """
+        Fill the normalized_name column using normalize(event_name, sport)
+        Each distinct (event_name, sport) pair is normalized once
+        """
+        event_names = self.categoricals["event_name"]
+        sports = self.categoricals["sport"]
+        normalized = Categorical()
+        cache = {}
+
+        for event_code, sport_code in zip(event_names.codes, sports.codes):
+            key = (event_code, sport_code)
+            code = cache.get(key)
+            if code is None:
+                code = normalized.encode(normalize(event_names.values[event_code], sports.values[sport_code]))
+                cache[key] = code
+            normalized.codes.append(code)
+
+        self.categoricals["normalized_name"] = normalized
+        return self
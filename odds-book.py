@@ -0,0 +1,167 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger("ArbitrageBot.OddsBook")
+
+# Seconds a quote stays usable after it was fetched
+ODDS_TTL = float(os.getenv("ODDS_TTL", "300"))
+
+# Per-sport TTL overrides, e.g. "tennis=120,basketball=180"
+ODDS_TTLS = {
+    sport.strip(): float(ttl)
+    for sport, ttl in (
+        item.split("=", 1) for item in os.getenv("ODDS_TTLS", "").split(",") if "=" in item
+    )
+}
+
+# Maximum quotes held; beyond it the least recently updated events are evicted whole
+ODDS_BOOK_MAX_QUOTES = int(os.getenv("ODDS_BOOK_MAX_QUOTES", "200000"))
+
+class OddsBook:
+    """
+    Long-lived book of the latest quote per (event, market, selection, bookmaker)
+    Quotes are updated in place as cycles arrive and expire once older than their
+    sport's TTL. Each sport keeps its quotes in update order, so with one TTL per
+    sport the oldest quotes are always at the front and expiry only touches what
+    it removes. Events a bookmaker stops listing are dropped with its next update,
+    and past the quote cap the least recently updated events are evicted.
+    """
+
+    def __init__(self, ttl=None, sport_ttls=None, max_quotes=None, clock=None):
+        self.ttl = ODDS_TTL if ttl is None else ttl
+        self.sport_ttls = dict(ODDS_TTLS if sport_ttls is None else sport_ttls)
+        self.max_quotes = ODDS_BOOK_MAX_QUOTES if max_quotes is None else max_quotes
+        # Current time for expiry; replaced with a simulated clock when replaying history
+        self.clock = clock or time.time
+
+        # sport -> OrderedDict of (event, market, selection, bookmaker) -> quote, oldest first
+        self.quotes = {}
+        # (sport, event) -> set of quote keys, least recently updated first
+        self.events = OrderedDict()
+        # (sport, bookmaker) -> set of quote keys
+        self.listings = {}
+        self.counters = {"updated": 0, "inserted": 0, "expired": 0, "delisted": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+    def ttl_for(self, sport):
+        return self.sport_ttls.get(sport, self.ttl)
+
+    @staticmethod
+    def key(quote):
+        return (quote["normalized_name"], quote["market"], quote["selection"], quote["bookmaker"])
+
+    def update(self, odds_data, complete=True, listings=()):
+        """
+        Add or replace quotes
+        With complete=True the quotes are everything their bookmakers list for their sports,
+        so those bookmakers' other quotes in those sports (finished or pulled events) are dropped.
+        `listings` names (sport, bookmaker) pairs covered even if they came back empty.
+        """
+        with self._lock:
+            listed = {listing: set() for listing in listings} if complete else {}
+            for quote in odds_data:
+                sport = quote["sport"]
+                key = self.key(quote)
+                book = self.quotes.setdefault(sport, OrderedDict())
+                if key in book:
+                    book.move_to_end(key)
+                    self.counters["updated"] += 1
+                else:
+                    self.counters["inserted"] += 1
+                book[key] = quote
+
+                event = (sport, key[0])
+                keys = self.events.get(event)
+                if keys is None:
+                    keys = self.events[event] = set()
+                else:
+                    self.events.move_to_end(event)
+                keys.add(key)
+                self.listings.setdefault((sport, key[3]), set()).add(key)
+
+                if complete:
+                    listed.setdefault((sport, key[3]), set()).add(key)
+
+            for (sport, bookmaker), keys in listed.items():
+                self._delist(sport, bookmaker, keys)
+
+            self._expire(self.clock())
+            self._enforce_cap()
+
+    def remove(self, quotes):
+        """Drop the given quotes' keys, e.g. quotes a bookmaker pulled"""
+        with self._lock:
+            for quote in quotes:
+                sport = quote["sport"]
+                if self.key(quote) in self.quotes.get(sport, ()):
+                    self._remove(sport, self.key(quote))
+                    self.counters["delisted"] += 1
+
+    def _delist(self, sport, bookmaker, listed):
+        stale = self.listings.get((sport, bookmaker), set()) - listed
+        for key in stale:
+            self._remove(sport, key)
+        self.counters["delisted"] += len(stale)
+
+    def _expire(self, now):
+        for sport, book in self.quotes.items():
+            cutoff = now - self.ttl_for(sport)
+            while book:
+                key, quote = next(iter(book.items()))
+                if quote["timestamp"] >= cutoff:
+                    break
+                self._remove(sport, key)
+                self.counters["expired"] += 1
+
+    def _enforce_cap(self):
+        while self.events and len(self) > self.max_quotes:
+            (sport, _), keys = next(iter(self.events.items()))
+            for key in list(keys):
+                self._remove(sport, key)
+                self.counters["evicted"] += 1
+
+    def _remove(self, sport, key):
+        self.quotes[sport].pop(key, None)
+        listing = self.listings.get((sport, key[3]))
+        if listing is not None:
+            listing.discard(key)
+        event = (sport, key[0])
+        keys = self.events.get(event)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.events[event]
+
+    def expire(self, now=None):
+        """Drop quotes older than their sport's TTL"""
+        with self._lock:
+            self._expire(self.clock() if now is None else now)
+
+    def get_quotes(self, sport=None):
+        """Fresh quotes, for one sport or all of them"""
+        with self._lock:
+            self._expire(self.clock())
+            if sport is not None:
+                return list(self.quotes.get(sport, {}).values())
+            return [quote for book in self.quotes.values() for quote in book.values()]
+
+    def get_bookmakers(self, sport):
+        """Bookmakers with fresh quotes for a sport"""
+        with self._lock:
+            self._expire(self.clock())
+            return {key[3] for key in self.quotes.get(sport, {})}
+
+    def __len__(self):
+        return sum(len(book) for book in self.quotes.values())
+
+    def get_stats(self):
+        """Size and eviction counters"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["quotes"] = len(self)
+            stats["events"] = len(self.events)
+            stats["max_quotes"] = self.max_quotes
+            return stats
@@ -1,13 +1,24 @@
+import os
 import requests
 import logging
-from bs4 import BeautifulSoup
+import threading
+from requests.adapters import HTTPAdapter
 import json
 import time
-import re
+import asyncio
 from fake_useragent import UserAgent
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait
 import random
 from datetime import datetime
+from response_cache import ResponseCache
+from streaming_json import iter_json_items
+from html_backend import parse_html
+from odds_batch import OddsBatch
+from event_matcher import normalize_event_name
+from response_recorder import recorder_from_env
+from circuit_breaker import CircuitBreakerRegistry
+from parse_pool import PARSE_PROCESSES, parse_in_pool
+from rate_limiter import HostRateLimiter, parse_retry_after
 
 logger = logging.getLogger("ArbitrageBot.OddsFetcher")
 
@@ -23,6 +34,12 @@ SPORTS = [
     "football", "mma", "boxing", "golf", "rugby"
 ]
 
+# Bookmaker endpoints - override to point the fetchers at a local synthetic server
+BET365_BASE_URL = os.getenv("BET365_BASE_URL", "https://www.bet365.com")
+BETMGM_BASE_URL = os.getenv("BETMGM_BASE_URL", "https://sports.betmgm.com")
+STAKE_BASE_URL = os.getenv("STAKE_BASE_URL", "https://stake.com")
+STAKE_API_URL = os.getenv("STAKE_API_URL", "https://api.stake.com/graphql")
+
 # Proxy configuration - replace with your actual proxies
 PROXIES = [
     {"http": "http://proxy1.example.com:8080", "https": "https://proxy1.example.com:8080"},
@@ -53,120 +70,468 @@ def get_random_proxy():
         return None
     return random.choice(PROXIES)
 
-def make_request(url, max_retries=3, json_response=False):
-    """Make a request with retries and rotating proxies"""
+# Cache of parsed responses so unchanged payloads skip re-parsing
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+response_cache = ResponseCache(max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "500")))
+
+# Stream JSON API bodies and parse them one event at a time instead of loading the whole feed
+JSON_STREAMING = os.getenv("JSON_STREAMING", "false").lower() == "true"
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "65536"))
+
+# Parse each cycle's quotes straight into a columnar OddsBatch instead of a list of dicts
+ODDS_BATCH = os.getenv("ODDS_BATCH", "false").lower() == "true"
+
+# Multiplier for the per-host request intervals (0 disables rate limiting, e.g. for load tests)
+PACING_SCALE = float(os.getenv("PACING_SCALE", "1.0"))
+
+# Permitted request rate per bookmaker host, in requests per minute
+HOST_RATE_LIMITS = {
+    "bet365": float(os.getenv("BET365_RATE_LIMIT", "10")),
+    "betmgm": float(os.getenv("BETMGM_RATE_LIMIT", "12")),
+    "stake": float(os.getenv("STAKE_RATE_LIMIT", "12"))
+}
+
+# Back-off applied when a host answers 429 without a Retry-After header
+RETRY_AFTER_DEFAULT = float(os.getenv("RETRY_AFTER_DEFAULT", "30"))
+
+rate_limiter = HostRateLimiter(
+    HOST_RATE_LIMITS,
+    default_limit=float(os.getenv("DEFAULT_RATE_LIMIT", "12")),
+    burst=int(os.getenv("RATE_LIMIT_BURST", "2"))
+)
+
+# Record raw responses (RECORD_PATH) or serve them back offline (REPLAY_PATH, REPLAY_SPEED)
+response_recorder = recorder_from_env()
+
+# Skip endpoints that keep failing for a cool-down period instead of retrying them every cycle
+CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+circuit_breakers = CircuitBreakerRegistry(
+    failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3")),
+    cool_down=float(os.getenv("CIRCUIT_COOL_DOWN", "300")),
+    max_cool_down=float(os.getenv("CIRCUIT_MAX_COOL_DOWN", "1800"))
+)
+
+# Connection pool configuration for the per-bookmaker keep-alive sessions
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_session(bookmaker, pool_connections=None, pool_maxsize=None):
+    """Get the shared keep-alive session for a bookmaker, creating it on first use"""
+    with _sessions_lock:
+        session = _sessions.get(bookmaker)
+        if session is None:
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections or POOL_CONNECTIONS,
+                pool_maxsize=pool_maxsize or POOL_MAXSIZE
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[bookmaker] = session
+        return session
+
+def close_sessions():
+    """Close all bookmaker sessions and their pooled connections"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+def get_connection_stats():
+    """Get connection reuse statistics for each bookmaker session"""
+    stats = {}
+    with _sessions_lock:
+        sessions = list(_sessions.items())
+    
+    for bookmaker, session in sessions:
+        adapter = session.get_adapter("https://")
+        managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+        connections = 0
+        total_requests = 0
+        
+        # Each urllib3 pool counts the connections it opened and the requests it served
+        for manager in managers:
+            for key in list(manager.pools.keys()):
+                try:
+                    pool = manager.pools[key]
+                except KeyError:
+                    continue
+                connections += pool.num_connections
+                total_requests += pool.num_requests
+        
+        stats[bookmaker] = {
+            "requests": total_requests,
+            "connections_opened": connections,
+            "connections_reused": max(total_requests - connections, 0)
+        }
+    
+    return stats
+
+# Cancellation flag of the fetch cycle the current worker thread is running for
+_cycle_state = threading.local()
+
+def cycle_cancelled():
+    """Whether the fetch cycle running on this thread has hit its deadline"""
+    cancel_event = getattr(_cycle_state, "cancel_event", None)
+    return cancel_event is not None and cancel_event.is_set()
+
+def run_in_cycle(cancel_event, func, *args):
+    """Run func on this thread as part of the fetch cycle owning cancel_event"""
+    _cycle_state.cancel_event = cancel_event
+    try:
+        return func(*args)
+    finally:
+        _cycle_state.cancel_event = None
+
+def pacing_scale():
+    """Multiplier for request intervals, following the replay speed when replaying recorded responses"""
+    if response_recorder.replaying:
+        if not response_recorder.speed:
+            return 0.0
+        return PACING_SCALE / response_recorder.speed
+    return PACING_SCALE
+
+def throttle(bookmaker):
+    """
+    Wait for the bookmaker's request budget
+    Returns False if the current fetch cycle was cancelled while waiting.
+    """
+    scale = pacing_scale()
+    if not scale:
+        return not cycle_cancelled()
+    cancel_event = getattr(_cycle_state, "cancel_event", None)
+    return rate_limiter.acquire(bookmaker, scale, cancel_event)
+
+def make_request(url, max_retries=3, json_response=False, bookmaker=None, method="GET", json_data=None,
+                 extra_headers=None, stream=False):
+    """
+    Make a request with retries and rotating proxies over the bookmaker's pooled session
+    Returns None straight away while the endpoint's circuit breaker is open, so callers
+    go directly to their fallback.
+    """
+    session = get_session(bookmaker or "default")
+    breaker = circuit_breakers.get(method, url) if CIRCUIT_BREAKER_ENABLED else None
+    
+    # A 304 is only a valid answer when we sent validators for a conditional request
+    conditional = bool(extra_headers) and any(
+        name in extra_headers for name in ("If-None-Match", "If-Modified-Since")
+    )
+    
     for attempt in range(max_retries):
+        if cycle_cancelled():
+            logger.debug(f"Fetch cycle deadline reached, abandoning {url}")
+            return None
+        
+        if breaker is not None and not breaker.allow_request():
+            logger.debug(f"Circuit open for {breaker.endpoint}, skipping {url}")
+            return None
+        
         try:
             headers = get_random_headers()
             proxy = get_random_proxy()
+            if json_data is not None:
+                headers["Content-Type"] = "application/json"
+            if extra_headers:
+                headers.update(extra_headers)
             
-            # Add random delay to avoid detection
-            time.sleep(random.uniform(1.0, 3.0))
+            # Stay within the host's request budget
+            if not throttle(bookmaker or "default"):
+                if breaker is not None:
+                    breaker.release()
+                return None
             
-            response = requests.get(
-                url, 
-                headers=headers, 
-                proxies=proxy,
-                timeout=10
-            )
+            if response_recorder.replaying:
+                response = response_recorder.replay(method, url, json_data, headers)
+                if response is None:
+                    logger.warning(f"No recorded response for {url}")
+                    if breaker is not None:
+                        breaker.release()
+                    return None
+            else:
+                started = time.time()
+                response = session.request(
+                    method,
+                    url, 
+                    headers=headers, 
+                    proxies=proxy,
+                    json=json_data,
+                    timeout=10,
+                    stream=stream
+                )
+                if response_recorder.recording:
+                    response_recorder.record(method, url, json_data, response, time.time() - started)
             
             if response.status_code == 200:
+                if breaker is not None:
+                    breaker.record_success()
                 if json_response:
                     return response.json()
                 return response
             
+            if response.status_code == 304 and conditional:
+                if breaker is not None:
+                    breaker.record_success()
+                return response
+            
+            # Release the pooled connection held by an unread streamed body
+            response.close()
+            
+            if response.status_code == 429:
+                # Rate limited: hold the whole host rather than count it against the endpoint's health
+                delay = parse_retry_after(response.headers.get("Retry-After"), RETRY_AFTER_DEFAULT)
+                scale = pacing_scale()
+                if scale:
+                    rate_limiter.defer(bookmaker or "default", delay * scale)
+                if breaker is not None:
+                    breaker.release()
+                logger.warning(f"Rate limited by {bookmaker or url}, retrying ({attempt+1}/{max_retries})")
+                continue
+            
             logger.warning(f"Request failed with status {response.status_code}, retrying ({attempt+1}/{max_retries})")
         except Exception as e:
             logger.warning(f"Request error: {str(e)}, retrying ({attempt+1}/{max_retries})")
-            
-        # Increase delay on retry
-        time.sleep(random.uniform(2.0, 5.0))
+        
+        if breaker is not None:
+            breaker.record_failure()
+            if breaker.is_open:
+                break
     
-    logger.error(f"Failed to fetch {url} after {max_retries} attempts")
+    logger.error(f"Failed to fetch {url} after up to {max_retries} attempts")
     return None
 
+def new_odds_sink():
+    """Get an empty container for one fetch's quotes: an OddsBatch with ODDS_BATCH, else a list"""
+    return OddsBatch() if ODDS_BATCH else []
+
+def truncate_odds(events, length):
+    """Drop quotes appended to a sink after it held length, e.g. from a parse that failed part way"""
+    if isinstance(events, OddsBatch):
+        events.truncate(length)
+    else:
+        del events[length:]
+
+def payload_parser(kind, sport):
+    """
+    Build the fetch_parsed callback for a payload kind
+    The callback appends the quotes to the sink it is given. With PARSE_PROCESSES set the
+    body is parsed and normalized on the process pool, so large pages do not hold the GIL
+    against the other bookmakers' fetches.
+    """
+    def parse(response, events):
+        # JSON decoders detect the encoding from the bytes; HTML needs the decoded text
+        body = response.content if kind.endswith("_json") else response.text
+        if PARSE_PROCESSES > 0:
+            events.extend(parse_in_pool(kind, body, sport, PARSE_PROCESSES))
+            return events
+        return parse_payload(kind, body, sport, events)
+    return parse
+
+def fetch_parsed(url, parse, bookmaker, sport, method="GET", json_data=None, max_retries=3, events=None):
+    """
+    Fetch a URL and parse the response, reusing the previous parse when the payload is unchanged
+    Quotes are appended to events (an empty list or OddsBatch sink, a new list by default).
+    Returns the sink, or None if the request failed
+    """
+    events = [] if events is None else events
+    
+    def parse_response(response):
+        # Undecodable payloads count as failed requests so callers fall back
+        try:
+            return parse(response, events)
+        except ValueError as e:
+            logger.warning(f"Could not decode response from {url}: {str(e)}")
+            truncate_odds(events, 0)
+            return None
+    
+    if not RESPONSE_CACHE_ENABLED:
+        response = make_request(url, max_retries=max_retries, bookmaker=bookmaker,
+                                method=method, json_data=json_data)
+        return parse_response(response) if response is not None else None
+    
+    key = response_cache.make_key(method, url, json_data)
+    response = make_request(
+        url,
+        max_retries=max_retries,
+        bookmaker=bookmaker,
+        method=method,
+        json_data=json_data,
+        extra_headers=response_cache.conditional_headers(key)
+    )
+    if response is None:
+        return None
+    
+    cached = response_cache.get_parsed(key, response, bookmaker, sport)
+    if cached is not None:
+        events.extend(cached)
+        return events
+    
+    if response.status_code == 304:
+        # Validators matched but we no longer hold the parse, so fetch unconditionally
+        response = make_request(url, max_retries=max_retries, bookmaker=bookmaker,
+                                method=method, json_data=json_data)
+        if response is None:
+            return None
+    
+    if parse_response(response) is None:
+        return None
+    response_cache.store(key, response, events)
+    return events
+
+def fetch_streamed(url, iter_records, bookmaker, sport, max_retries=3, events=None):
+    """
+    Fetch a JSON API response and parse it incrementally as the body arrives
+    Each event's quotes go into events (an empty list or OddsBatch sink, a new list by
+    default) as soon as it is parsed, so the raw feed is never held whole. The body is
+    never hashed, so the response cache only serves unchanged payloads when the server
+    answers a conditional request with 304 (ETag/Last-Modified); otherwise it is re-parsed.
+    Returns the sink, or None if the request failed
+    """
+    events = [] if events is None else events
+    key = response_cache.make_key("GET", url)
+    extra_headers = response_cache.conditional_headers(key) if RESPONSE_CACHE_ENABLED else None
+    response = make_request(url, max_retries=max_retries, bookmaker=bookmaker,
+                            extra_headers=extra_headers, stream=True)
+    if response is None:
+        return None
+    
+    try:
+        if RESPONSE_CACHE_ENABLED:
+            cached = response_cache.get_parsed(key, response, bookmaker, sport, check_content=False)
+            if cached is not None:
+                events.extend(cached)
+                return events
+            if response.status_code == 304:
+                response.close()
+                response = make_request(url, max_retries=max_retries, bookmaker=bookmaker, stream=True)
+                if response is None:
+                    return None
+        
+        for record in iter_records(response.iter_content(chunk_size=STREAM_CHUNK_SIZE), sport):
+            events.append(record)
+    except ValueError as e:
+        logger.warning(f"Could not decode streamed response from {url}: {str(e)}")
+        # Drop the events parsed before the failure so the fallback starts from an empty sink
+        truncate_odds(events, 0)
+        return None
+    finally:
+        response.close()
+    
+    if RESPONSE_CACHE_ENABLED:
+        response_cache.store(key, response, events, check_content=False)
+    return events
+
 # BET365 IMPLEMENTATION
-def fetch_bet365_odds():
+def fetch_bet365_sport_odds(sport):
+    """
+    Fetch odds from Bet365 for a single sport, parsed straight into a new odds sink
+    Raises RuntimeError when neither the API nor the HTML page gave a usable response
+    (failed requests, an open circuit breaker, undecodable payloads), so a failed fetch
+    is told apart from a sport with no events listed.
+    """
+    odds_data = new_odds_sink()
+    
+    # Bet365 typically uses an API endpoint for odds
+    api_url = f"{BET365_BASE_URL}/SportsBook.API/web?sport={sport}&lid=1&zid=0"
+    
+    # First try the API endpoint
+    if JSON_STREAMING:
+        events = fetch_streamed(api_url, iter_bet365_json, "bet365", sport, events=odds_data)
+    else:
+        events = fetch_parsed(
+            api_url,
+            payload_parser("bet365_json", sport),
+            "bet365", sport,
+            events=odds_data
+        )
+    if events is None:
+        # Fall back to HTML scraping if API fails
+        html_url = f"{BET365_BASE_URL}/#{sport}/main"
+        events = fetch_parsed(
+            html_url,
+            payload_parser("bet365_html", sport),
+            "bet365", sport,
+            events=odds_data
+        )
+    
+    if events is None:
+        raise RuntimeError(f"No usable response from Bet365 for {sport}")
+    
+    return odds_data
+
+def fetch_bet365_odds(collector=None):
     """Fetch odds from Bet365 for all sports"""
     logger.info("Fetching odds from Bet365")
-    odds_data = []
+    return fetch_bookmaker_odds("bet365", collector)
+
+def parse_bet365_event(event, sport, events=None):
+    """Parse a single event object from the Bet365 API into odds records"""
+    events = [] if events is None else events
     
-    try:
-        for sport in SPORTS:
-            # Bet365 typically uses an API endpoint for odds
-            api_url = f"https://www.bet365.com/SportsBook.API/web?sport={sport}&lid=1&zid=0"
+    event_name = event.get('name', 'Unknown Event')
+    event_id = event.get('id', f'bet365_{hash(event_name)}')
+    
+    # Process markets - common structure in betting APIs
+    if 'markets' in event:
+        for market in event['markets']:
+            market_type = market.get('type', 'moneyline')
             
-            # First try the API endpoint
-            json_response = make_request(api_url, json_response=True)
-            if json_response:
-                events = parse_bet365_json(json_response, sport)
-                odds_data.extend(events)
-            else:
-                # Fall back to HTML scraping if API fails
-                html_url = f"https://www.bet365.com/#{sport}/main"
-                response = make_request(html_url)
-                if response:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    events = parse_bet365_html(soup, sport)
-                    odds_data.extend(events)
+            # Skip markets other than moneyline for simplicity
+            if market_type.lower() != 'moneyline':
+                continue
+            
+            # Process selections within market
+            if 'selections' in market:
+                for selection in market['selections']:
+                    selection_name = selection.get('name', 'Unknown')
+                    odds_value = selection.get('odds', 0.0)
                     
-            # Respect rate limits
-            time.sleep(random.uniform(2.5, 4.0))
-    except Exception as e:
-        logger.error(f"Error fetching Bet365 odds: {str(e)}")
+                    # Convert fractional odds to decimal if needed
+                    if isinstance(odds_value, str) and '/' in odds_value:
+                        numerator, denominator = map(int, odds_value.split('/'))
+                        odds_value = round(numerator / denominator + 1, 2)
+                    
+                    events.append({
+                        "bookmaker": "bet365",
+                        "sport": sport,
+                        "event_id": event_id,
+                        "event_name": event_name,
+                        "market": market_type,
+                        "selection": selection_name,
+                        "odds": float(odds_value),
+                        "timestamp": time.time(),
+                        "normalized_name": ""  # Will be populated later
+                    })
     
-    return odds_data
+    return events
 
-def parse_bet365_json(data, sport):
+def parse_bet365_json(data, sport, events=None):
     """Parse JSON response from Bet365"""
-    events = []
+    events = [] if events is None else events
     
     try:
         # Actual Bet365 API structure - this will need adaptation to their real API
         if isinstance(data, dict) and 'events' in data:
             for event in data['events']:
-                event_name = event.get('name', 'Unknown Event')
-                event_id = event.get('id', f'bet365_{hash(event_name)}')
-                
-                # Process markets - common structure in betting APIs
-                if 'markets' in event:
-                    for market in event['markets']:
-                        market_type = market.get('type', 'moneyline')
-                        
-                        # Skip markets other than moneyline for simplicity
-                        if market_type.lower() != 'moneyline':
-                            continue
-                        
-                        # Process selections within market
-                        if 'selections' in market:
-                            for selection in market['selections']:
-                                selection_name = selection.get('name', 'Unknown')
-                                odds_value = selection.get('odds', 0.0)
-                                
-                                # Convert fractional odds to decimal if needed
-                                if isinstance(odds_value, str) and '/' in odds_value:
-                                    numerator, denominator = map(int, odds_value.split('/'))
-                                    odds_value = round(numerator / denominator + 1, 2)
-                                
-                                events.append({
-                                    "bookmaker": "bet365",
-                                    "sport": sport,
-                                    "event_id": event_id,
-                                    "event_name": event_name,
-                                    "market": market_type,
-                                    "selection": selection_name,
-                                    "odds": float(odds_value),
-                                    "timestamp": time.time(),
-                                    "normalized_name": ""  # Will be populated later
-                                })
+                parse_bet365_event(event, sport, events)
     except Exception as e:
         logger.error(f"Error parsing Bet365 JSON: {str(e)}")
     
     return events
 
-def parse_bet365_html(soup, sport):
+def iter_bet365_json(chunks, sport):
+    """Incrementally parse a streamed Bet365 API response, yielding odds records per event"""
+    for event in iter_json_items(chunks, ("events",)):
+        try:
+            yield from parse_bet365_event(event, sport)
+        except Exception as e:
+            logger.error(f"Error parsing Bet365 JSON event: {str(e)}")
+
+def parse_bet365_html(soup, sport, events=None):
     """Parse HTML response from Bet365"""
-    events = []
+    events = [] if events is None else events
     
     try:
         # Bet365 specific selectors - these need to be updated based on their actual HTML structure
@@ -226,37 +591,48 @@ def parse_bet365_html(soup, sport):
     return events
 
 # BETMGM IMPLEMENTATION
-def fetch_betmgm_odds():
-    """Fetch odds from BetMGM for all sports"""
-    logger.info("Fetching odds from BetMGM")
-    odds_data = []
+def fetch_betmgm_sport_odds(sport):
+    """
+    Fetch odds from BetMGM for a single sport, parsed straight into a new odds sink
+    Raises RuntimeError when neither the API nor the HTML page gave a usable response
+    (failed requests, an open circuit breaker, undecodable payloads), so a failed fetch
+    is told apart from a sport with no events listed.
+    """
+    odds_data = new_odds_sink()
     
-    try:
-        for sport in SPORTS:
-            # BetMGM might use different URLs based on region
-            url = f"https://sports.betmgm.com/en/sports/{sport}"
-            api_url = f"https://sports.betmgm.com/cds-api/bettingoffer/fixtures?x-bwin-accessid=NTIxOTgxNzA&lang=en&country=US&userCountry=US&fixtureTypes=Standard&sportIds={get_betmgm_sport_id(sport)}&offerMapping=Filtered&offerCategories=Gridable"
-            
-            # Try API first
-            json_response = make_request(api_url, json_response=True)
-            if json_response:
-                events = parse_betmgm_json(json_response, sport)
-                odds_data.extend(events)
-            else:
-                # Fall back to HTML scraping
-                response = make_request(url)
-                if response:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    events = parse_betmgm_html(soup, sport)
-                    odds_data.extend(events)
-            
-            # Respect rate limits
-            time.sleep(random.uniform(2.0, 4.0))
-    except Exception as e:
-        logger.error(f"Error fetching BetMGM odds: {str(e)}")
+    # BetMGM might use different URLs based on region
+    url = f"{BETMGM_BASE_URL}/en/sports/{sport}"
+    api_url = f"{BETMGM_BASE_URL}/cds-api/bettingoffer/fixtures?x-bwin-accessid=NTIxOTgxNzA&lang=en&country=US&userCountry=US&fixtureTypes=Standard&sportIds={get_betmgm_sport_id(sport)}&offerMapping=Filtered&offerCategories=Gridable"
+    
+    # Try API first
+    if JSON_STREAMING:
+        events = fetch_streamed(api_url, iter_betmgm_json, "betmgm", sport, events=odds_data)
+    else:
+        events = fetch_parsed(
+            api_url,
+            payload_parser("betmgm_json", sport),
+            "betmgm", sport,
+            events=odds_data
+        )
+    if events is None:
+        # Fall back to HTML scraping
+        events = fetch_parsed(
+            url,
+            payload_parser("betmgm_html", sport),
+            "betmgm", sport,
+            events=odds_data
+        )
+    
+    if events is None:
+        raise RuntimeError(f"No usable response from BetMGM for {sport}")
     
     return odds_data
 
+def fetch_betmgm_odds(collector=None):
+    """Fetch odds from BetMGM for all sports"""
+    logger.info("Fetching odds from BetMGM")
+    return fetch_bookmaker_odds("betmgm", collector)
+
 def get_betmgm_sport_id(sport):
     """Map sport name to BetMGM sport ID"""
     sport_map = {
@@ -273,46 +649,62 @@ def get_betmgm_sport_id(sport):
     }
     return sport_map.get(sport.lower(), "1")  # Default to soccer if not found
 
-def parse_betmgm_json(data, sport):
+def parse_betmgm_fixture(fixture, sport, events=None):
+    """Parse a single fixture object from the BetMGM API into odds records"""
+    events = [] if events is None else events
+    
+    event_name = fixture.get('name', 'Unknown Event')
+    event_id = fixture.get('id', f'betmgm_{hash(event_name)}')
+    
+    # Find moneyline markets
+    for market in fixture.get('markets', []):
+        market_type = market.get('name', '')
+        
+        # Only consider moneyline markets
+        if 'money line' in market_type.lower() or 'match winner' in market_type.lower():
+            for selection in market.get('selections', []):
+                selection_name = selection.get('name', 'Unknown')
+                odds_value = selection.get('price', {}).get('decimal', 0.0)
+                
+                events.append({
+                    "bookmaker": "betmgm",
+                    "sport": sport,
+                    "event_id": event_id,
+                    "event_name": event_name,
+                    "market": "moneyline",
+                    "selection": selection_name,
+                    "odds": float(odds_value),
+                    "timestamp": time.time(),
+                    "normalized_name": ""  # Will be populated later
+                })
+    
+    return events
+
+def parse_betmgm_json(data, sport, events=None):
     """Parse JSON response from BetMGM API"""
-    events = []
+    events = [] if events is None else events
     
     try:
         # Process fixtures from BetMGM API
         if isinstance(data, dict) and 'fixtures' in data:
             for fixture in data['fixtures']:
-                event_name = fixture.get('name', 'Unknown Event')
-                event_id = fixture.get('id', f'betmgm_{hash(event_name)}')
-                
-                # Find moneyline markets
-                for market in fixture.get('markets', []):
-                    market_type = market.get('name', '')
-                    
-                    # Only consider moneyline markets
-                    if 'money line' in market_type.lower() or 'match winner' in market_type.lower():
-                        for selection in market.get('selections', []):
-                            selection_name = selection.get('name', 'Unknown')
-                            odds_value = selection.get('price', {}).get('decimal', 0.0)
-                            
-                            events.append({
-                                "bookmaker": "betmgm",
-                                "sport": sport,
-                                "event_id": event_id,
-                                "event_name": event_name,
-                                "market": "moneyline",
-                                "selection": selection_name,
-                                "odds": float(odds_value),
-                                "timestamp": time.time(),
-                                "normalized_name": ""  # Will be populated later
-                            })
+                parse_betmgm_fixture(fixture, sport, events)
     except Exception as e:
         logger.error(f"Error parsing BetMGM JSON: {str(e)}")
     
     return events
 
-def parse_betmgm_html(soup, sport):
+def iter_betmgm_json(chunks, sport):
+    """Incrementally parse a streamed BetMGM API response, yielding odds records per fixture"""
+    for fixture in iter_json_items(chunks, ("fixtures",)):
+        try:
+            yield from parse_betmgm_fixture(fixture, sport)
+        except Exception as e:
+            logger.error(f"Error parsing BetMGM JSON fixture: {str(e)}")
+
+def parse_betmgm_html(soup, sport, events=None):
     """Parse HTML response from BetMGM"""
-    events = []
+    events = [] if events is None else events
     
     try:
         # BetMGM specific selectors
@@ -366,94 +758,82 @@ def parse_betmgm_html(soup, sport):
     return events
 
 # STAKE IMPLEMENTATION
-def fetch_stake_odds():
-    """Fetch odds from Stake for all sports"""
-    logger.info("Fetching odds from Stake")
-    odds_data = []
+def fetch_stake_sport_odds(sport):
+    """
+    Fetch odds from Stake for a single sport, parsed straight into a new odds sink
+    Raises RuntimeError when neither the GraphQL API nor the HTML page gave a usable response
+    (failed requests, an open circuit breaker, undecodable payloads), so a failed fetch
+    is told apart from a sport with no events listed.
+    """
+    odds_data = new_odds_sink()
     
-    try:
-        for sport in SPORTS:
-            # Stake likely uses a GraphQL API
-            api_url = f"https://api.stake.com/graphql"
-            
-            # GraphQL query for sports data
-            graphql_query = {
-                "operationName": "SportsList",
-                "variables": {
-                    "sport": sport,
-                    "limit": 50,
-                    "offset": 0
-                },
-                "query": """
-                query SportsList($sport: String!, $limit: Int!, $offset: Int!) {
-                    sport(slug: $sport) {
+    # Stake likely uses a GraphQL API
+    api_url = STAKE_API_URL
+    
+    # GraphQL query for sports data
+    graphql_query = {
+        "operationName": "SportsList",
+        "variables": {
+            "sport": sport,
+            "limit": 50,
+            "offset": 0
+        },
+        "query": """
+        query SportsList($sport: String!, $limit: Int!, $offset: Int!) {
+            sport(slug: $sport) {
+                id
+                name
+                matches(limit: $limit, offset: $offset) {
+                    id
+                    name
+                    markets {
                         id
                         name
-                        matches(limit: $limit, offset: $offset) {
+                        selections {
                             id
                             name
-                            markets {
-                                id
-                                name
-                                selections {
-                                    id
-                                    name
-                                    odds
-                                }
-                            }
+                            odds
                         }
                     }
                 }
-                """
             }
-            
-            # Make POST request for GraphQL
-            try:
-                headers = get_random_headers()
-                headers["Content-Type"] = "application/json"
-                proxy = get_random_proxy()
-                
-                response = requests.post(
-                    api_url,
-                    json=graphql_query,
-                    headers=headers,
-                    proxies=proxy,
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    events = parse_stake_graphql(data, sport)
-                    odds_data.extend(events)
-                else:
-                    # Fall back to HTML scraping
-                    html_url = f"https://stake.com/sports/{sport}"
-                    response = make_request(html_url)
-                    if response:
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        events = parse_stake_html(soup, sport)
-                        odds_data.extend(events)
-            except Exception as e:
-                logger.error(f"Error with Stake GraphQL request: {str(e)}")
-                
-                # Fall back to HTML scraping
-                html_url = f"https://stake.com/sports/{sport}"
-                response = make_request(html_url)
-                if response:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    events = parse_stake_html(soup, sport)
-                    odds_data.extend(events)
-            
-            # Respect rate limits
-            time.sleep(random.uniform(2.0, 4.0))
-    except Exception as e:
-        logger.error(f"Error fetching Stake odds: {str(e)}")
+        }
+        """
+    }
+    
+    # Make POST request for GraphQL over the pooled Stake session
+    events = fetch_parsed(
+        api_url,
+        payload_parser("stake_json", sport),
+        "stake", sport,
+        method="POST",
+        json_data=graphql_query,
+        max_retries=1,
+        events=odds_data
+    )
+    if events is None:
+        # Fall back to HTML scraping
+        html_url = f"{STAKE_BASE_URL}/sports/{sport}"
+        events = fetch_parsed(
+            html_url,
+            payload_parser("stake_html", sport),
+            "stake", sport,
+            events=odds_data
+        )
+    
+    if events is None:
+        raise RuntimeError(f"No usable response from Stake for {sport}")
     
     return odds_data
 
-def parse_stake_graphql(data, sport):
+def fetch_stake_odds(collector=None):
+    """Fetch odds from Stake for all sports"""
+    logger.info("Fetching odds from Stake")
+    return fetch_bookmaker_odds("stake", collector)
+
+def parse_stake_graphql(data, sport, events=None):
     """Parse GraphQL response from Stake"""
-    events = []
+    events = [] if events is None else events
     
     try:
         # Navigate the GraphQL response structure
@@ -492,9 +872,10 @@ def parse_stake_graphql(data, sport):
     
     return events
 
-def parse_stake_html(soup, sport):
+def parse_stake_html(soup, sport, events=None):
     """Parse HTML response from Stake"""
-    events = []
+    events = [] if events is None else events
+    start_count = len(events)
     
     try:
         # Look for embedded JSON data that Stake might use
@@ -541,7 +922,7 @@ def parse_stake_html(soup, sport):
                 continue
         
         # If no embedded JSON found, try HTML parsing
-        if not events:
+        if len(events) == start_count:
             event_containers = soup.select('.sport-event')
             
             for container in event_containers:
@@ -586,51 +967,259 @@ def parse_stake_html(soup, sport):
     
     return events
 
+# Parsers for each bookmaker's API and HTML payloads, looked up by payload kind
+JSON_PARSERS = {
+    "bet365": parse_bet365_json,
+    "betmgm": parse_betmgm_json,
+    "stake": parse_stake_graphql
+}
+HTML_PARSERS = {
+    "bet365": parse_bet365_html,
+    "betmgm": parse_betmgm_html,
+    "stake": parse_stake_html
+}
+
+def parse_payload(kind, body, sport, events=None):
+    """
+    Parse a raw response body of the given kind ("<bookmaker>_json" or "<bookmaker>_html")
+    Plain data in and quotes out, so it can run in a parse pool worker process.
+    Raises ValueError if a JSON body cannot be decoded
+    """
+    bookmaker, payload_format = kind.rsplit("_", 1)
+    if payload_format == "json":
+        return JSON_PARSERS[bookmaker](json.loads(body), sport, events)
+    return HTML_PARSERS[bookmaker](parse_html(body, bookmaker), sport, events)
+
 def normalize_event_names(odds_data):
     """Normalize event names to match events across bookmakers"""
+    if isinstance(odds_data, OddsBatch):
+        return odds_data.set_normalized_names(normalize_event_name)
+    
     for item in odds_data:
-        name = item["event_name"]
-        sport = item["sport"]
-        
-        # Remove common formatting differences
-        name = re.sub(r'\s+', ' ', name).strip()  # Normalize whitespace
-        name = re.sub(r'\([^)]*\)', '', name).strip()  # Remove parentheses
-        name = re.sub(r'@', 'vs', name)  # Standardize team separator
-        name = re.sub(r' v ', ' vs ', name)  # Another common separator
-        name = re.sub(r' - ', ' vs ', name)  # Another common separator
-        
-        # Extract teams
-        if "vs" in name.lower():
-            parts = re.split(r'\s+vs\s+', name, flags=re.IGNORECASE)
-            teams = [p.strip() for p in parts if p.strip()]
+        # Quotes parsed on the process pool arrive already normalized
+        if not item.get("normalized_name"):
+            item["normalized_name"] = normalize_event_name(item["event_name"], item["sport"])
+    
+    return odds_data
+
+def get_normalization_cache_stats():
+    """Get size and hit rate of the event name normalization cache"""
+    info = normalize_event_name.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "size": info.currsize,
+        "max_size": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": info.hits / lookups if lookups else 0.0
+    }
+
+# Per-sport fetchers for each bookmaker
+SPORT_FETCHERS = {
+    "bet365": fetch_bet365_sport_odds,
+    "betmgm": fetch_betmgm_sport_odds,
+    "stake": fetch_stake_sport_odds
+}
+
+# Fetch engine: "thread" walks sports sequentially per bookmaker, "async" fans out per (bookmaker, sport)
+FETCH_ENGINE = os.getenv("FETCH_ENGINE", "thread")
+
+# Maximum in-flight sport requests per bookmaker host for the asyncio engine
+HOST_CONCURRENCY = {
+    "bet365": int(os.getenv("BET365_CONCURRENCY", "3")),
+    "betmgm": int(os.getenv("BETMGM_CONCURRENCY", "3")),
+    "stake": int(os.getenv("STAKE_CONCURRENCY", "3"))
+}
+
+# Seconds a fetch cycle may run before returning whatever has arrived (0 waits for everything)
+CYCLE_DEADLINE = float(os.getenv("CYCLE_DEADLINE", "0"))
+
+# Completeness report of the most recent fetch cycle
+_last_cycle_report = None
+
+class CycleCollector:
+    """
+    Collects per-(bookmaker, sport) results of one fetch cycle as they complete
+    Once closed, late results from fetches still winding down are ignored, so the
+    cycle's output is exactly what had arrived by the deadline.
+    """
+    
+    def __init__(self, deadline=None):
+        self.deadline = deadline
+        self.started = time.time()
+        self.finished = None
+        self.results = {}
+        self.timings = {}
+        self.errors = {}
+        self.closed = False
+        self._lock = threading.Lock()
+    
+    def add(self, bookmaker, sport, odds, elapsed, error=None):
+        """Record the quotes fetched for one bookmaker and sport"""
+        with self._lock:
+            if self.closed:
+                return
+            self.results[(bookmaker, sport)] = odds
+            self.timings[(bookmaker, sport)] = elapsed
+            if error is not None:
+                self.errors[(bookmaker, sport)] = error
+    
+    def close(self):
+        """Stop accepting results and return them in bookmaker, sport order"""
+        with self._lock:
+            self.closed = True
+            self.finished = time.time()
+            return [
+                self.results[(bookmaker, sport)]
+                for bookmaker in SPORT_FETCHERS
+                for sport in SPORTS
+                if (bookmaker, sport) in self.results
+            ]
+    
+    def report(self):
+        """
+        Describe how complete the cycle was
+        Each (bookmaker, sport) is "ok" (quotes arrived), "empty" (finished without quotes),
+        "error" (the fetch raised) or "timed_out" (not finished by the deadline).
+        """
+        with self._lock:
+            finished = self.finished or time.time()
+            bookmakers = {}
+            completed = 0
+            for bookmaker in SPORT_FETCHERS:
+                sports = {}
+                quotes = 0
+                for sport in SPORTS:
+                    key = (bookmaker, sport)
+                    if key not in self.results:
+                        sports[sport] = {"status": "timed_out", "quotes": 0, "elapsed": None}
+                        continue
+                    
+                    count = len(self.results[key])
+                    if key in self.errors:
+                        status = "error"
+                    else:
+                        status = "ok" if count else "empty"
+                    sports[sport] = {"status": status, "quotes": count, "elapsed": round(self.timings[key], 3)}
+                    quotes += count
+                    completed += 1
+                
+                done = sum(1 for entry in sports.values() if entry["status"] != "timed_out")
+                bookmakers[bookmaker] = {
+                    "quotes": quotes,
+                    "sports_completed": done,
+                    "sports_total": len(SPORTS),
+                    "sports": sports
+                }
             
-            # Sort teams alphabetically for consistency
-            if len(teams) >= 2:
-                teams = sorted(teams[:2])
-                normalized_name = f"{teams[0]} vs {teams[1]}"
-            else:
-                normalized_name = name
-        else:
-            normalized_name = name
+            total = len(SPORT_FETCHERS) * len(SPORTS)
+            return {
+                "started": datetime.fromtimestamp(self.started).strftime("%Y-%m-%d %H:%M:%S"),
+                "elapsed": round(finished - self.started, 3),
+                "deadline": self.deadline,
+                "complete": completed == total,
+                "coverage": completed / total if total else 1.0,
+                "bookmakers": bookmakers
+            }
+
+def fetch_sport_into(collector, bookmaker, sport):
+    """Fetch one bookmaker and sport, recording the outcome in the cycle collector"""
+    started = time.time()
+    try:
+        odds = SPORT_FETCHERS[bookmaker](sport)
+        error = None
+    except Exception as e:
+        logger.error(f"Error fetching {bookmaker} {sport} odds: {str(e)}")
+        odds = []
+        error = str(e)
+    
+    if collector is not None and not cycle_cancelled():
+        collector.add(bookmaker, sport, odds, time.time() - started, error)
+    return odds
+
+def fetch_bookmaker_odds(bookmaker, collector=None):
+    """Walk every sport for one bookmaker; make_request paces the requests to the host's budget"""
+    odds_data = []
+    
+    for sport in SPORTS:
+        if cycle_cancelled():
+            logger.warning(f"Fetch cycle deadline reached, skipping remaining {bookmaker} sports")
+            break
         
-        # Add sport for further disambiguation
-        item["normalized_name"] = f"{normalized_name} ({sport})"
+        odds_data.extend(fetch_sport_into(collector, bookmaker, sport))
     
     return odds_data
 
-def fetch_all_odds():
-    """Fetch odds from all bookmakers in parallel"""
-    logger.info("Fetching odds from all bookmakers")
+def fetch_selected_odds(targets, deadline=None):
+    """
+    Fetch only the given (bookmaker, sport) pairs, in the order given
+    Each bookmaker's sports are fetched in turn on its own thread, as in a full cycle,
+    and the cycle deadline applies the same way: pairs still fetching when it passes
+    are left out of the results.
+    Returns the closed CycleCollector holding each pair's quotes and errors.
+    """
+    deadline = resolve_deadline(deadline)
+    collector = CycleCollector(deadline)
+    cancel_event = threading.Event()
+    sports_by_bookmaker = {}
+    for bookmaker, sport in targets:
+        sports_by_bookmaker.setdefault(bookmaker, []).append(sport)
     
-    # Use thread pool to fetch odds from all bookmakers concurrently
-    with ThreadPoolExecutor(max_workers=len(BOOKMAKERS)) as executor:
-        results = list(executor.map(
-            lambda f: f(), 
-            [fetch_bet365_odds, fetch_betmgm_odds, fetch_stake_odds]
-        ))
+    def fetch_sports(bookmaker, sports):
+        for sport in sports:
+            if cancel_event.is_set():
+                return
+            fetch_sport_into(collector, bookmaker, sport)
+    
+    if sports_by_bookmaker:
+        executor = ThreadPoolExecutor(max_workers=len(sports_by_bookmaker))
+        try:
+            futures = [
+                executor.submit(run_in_cycle, cancel_event, fetch_sports, bookmaker, sports)
+                for bookmaker, sports in sports_by_bookmaker.items()
+            ]
+            _, pending = wait(futures, timeout=deadline)
+            if pending:
+                logger.warning(f"Poll deadline of {deadline}s reached with {len(pending)} bookmakers still fetching")
+        finally:
+            cancel_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    collector.close()
+    return collector
+
+def finish_cycle(collector):
+    """Close the cycle, log and store its completeness report, and combine what arrived"""
+    global _last_cycle_report
     
+    results = collector.close()
+    report = collector.report()
+    _last_cycle_report = report
+    
+    completed = sum(entry["sports_completed"] for entry in report["bookmakers"].values())
+    total = sum(entry["sports_total"] for entry in report["bookmakers"].values())
+    logger.info(f"Fetch cycle finished in {report['elapsed']:.1f}s with {completed}/{total} "
+                f"bookmaker sports complete ({report['coverage']:.0%})")
+    for bookmaker, entry in report["bookmakers"].items():
+        missing = [sport for sport, info in entry["sports"].items() if info["status"] == "timed_out"]
+        if missing:
+            logger.warning(f"  {bookmaker}: deadline missed for {', '.join(missing)}")
+    
+    return combine_odds_results(results)
+
+def get_last_cycle_report():
+    """Get the completeness report of the most recent fetch cycle, or None before the first"""
+    return _last_cycle_report
+
+def resolve_deadline(deadline):
+    """Deadline in seconds for a cycle, or None to wait for every fetch"""
+    deadline = CYCLE_DEADLINE if deadline is None else deadline
+    return deadline if deadline and deadline > 0 else None
+
+def combine_odds_results(results):
+    """Combine per-fetcher results, normalize event names and log a summary"""
     # Combine all odds data
-    all_odds = []
+    all_odds = OddsBatch() if ODDS_BATCH else []
     for result in results:
         all_odds.extend(result)
     
@@ -638,19 +1227,23 @@ def fetch_all_odds():
     normalized_odds = normalize_event_names(all_odds)
     
     # Log detailed summary
-    bookmaker_counts = {}
-    sport_counts = {}
-    for item in normalized_odds:
-        bookmaker = item['bookmaker']
-        sport = item['sport']
-        
-        if bookmaker not in bookmaker_counts:
-            bookmaker_counts[bookmaker] = 0
-        bookmaker_counts[bookmaker] += 1
-        
-        if sport not in sport_counts:
-            sport_counts[sport] = 0
-        sport_counts[sport] += 1
+    if ODDS_BATCH:
+        bookmaker_counts = normalized_odds.value_counts('bookmaker')
+        sport_counts = normalized_odds.value_counts('sport')
+    else:
+        bookmaker_counts = {}
+        sport_counts = {}
+        for item in normalized_odds:
+            bookmaker = item['bookmaker']
+            sport = item['sport']
+            
+            if bookmaker not in bookmaker_counts:
+                bookmaker_counts[bookmaker] = 0
+            bookmaker_counts[bookmaker] += 1
+            
+            if sport not in sport_counts:
+                sport_counts[sport] = 0
+            sport_counts[sport] += 1
     
     # Log summary statistics
     logger.info(f"Fetched {len(normalized_odds)} total odds from all bookmakers")
@@ -658,5 +1251,105 @@ def fetch_all_odds():
         logger.info(f"  {bookmaker}: {count} odds")
     for sport, count in sport_counts.items():
         logger.info(f"  {sport}: {count} odds")
+    for bookmaker, stats in get_connection_stats().items():
+        logger.info(f"  {bookmaker} connections: {stats['connections_opened']} opened, "
+                    f"{stats['connections_reused']} reused over {stats['requests']} requests")
+    normalization_stats = get_normalization_cache_stats()
+    logger.info(f"  normalization cache: {normalization_stats['size']} names, "
+                f"{normalization_stats['hit_rate']:.0%} hit rate")
+    for host, stats in rate_limiter.get_stats().items():
+        logger.info(f"  {host} budget: {stats['requests']} requests at {stats['rate_per_minute']:.0f}/min, "
+                    f"{stats['waited']:.1f}s waited, {stats['throttled']} rate limited")
+    for endpoint, stats in circuit_breakers.get_stats().items():
+        if stats["state"] != "closed":
+            logger.info(f"  circuit {endpoint}: {stats['state']}, {stats['skipped']} requests skipped")
+    if RESPONSE_CACHE_ENABLED:
+        for key, stats in sorted(response_cache.get_stats().items()):
+            logger.debug(f"  cache {key}: {stats['hits']} hits "
+                         f"({stats['not_modified']} not modified), {stats['misses']} misses")
     
     return normalized_odds
+
+async def fetch_all_odds_async(host_concurrency=None, deadline=None):
+    """
+    Fetch odds with every (bookmaker, sport) request scheduled as its own asyncio task
+    Concurrency per bookmaker host is capped by HOST_CONCURRENCY (or the given overrides).
+    With a deadline, tasks still running when it passes are cancelled and the cycle
+    returns the quotes that arrived in time.
+    """
+    logger.info("Fetching odds from all bookmakers (async engine)")
+    
+    deadline = resolve_deadline(deadline)
+    limits = dict(HOST_CONCURRENCY)
+    if host_concurrency:
+        limits.update(host_concurrency)
+    
+    semaphores = {
+        bookmaker: asyncio.Semaphore(max(1, limits.get(bookmaker, 1)))
+        for bookmaker in SPORT_FETCHERS
+    }
+    collector = CycleCollector(deadline)
+    cancel_event = threading.Event()
+    
+    # The blocking fetchers run on a dedicated pool sized to the total concurrency budget
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=sum(max(1, limits.get(b, 1)) for b in SPORT_FETCHERS))
+    
+    async def fetch_task(bookmaker, sport):
+        async with semaphores[bookmaker]:
+            return await loop.run_in_executor(
+                executor, run_in_cycle, cancel_event, fetch_sport_into, collector, bookmaker, sport
+            )
+    
+    try:
+        tasks = [
+            asyncio.ensure_future(fetch_task(bookmaker, sport))
+            for bookmaker in SPORT_FETCHERS
+            for sport in SPORTS
+        ]
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        
+        if pending:
+            logger.warning(f"Fetch cycle deadline of {deadline}s reached with {len(pending)} requests outstanding")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        # Fetches already running on the pool see the flag and stop at their next request or budget wait
+        cancel_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return finish_cycle(collector)
+
+def fetch_all_odds(engine=None, deadline=None):
+    """
+    Fetch odds from all bookmakers in parallel
+    If the cycle deadline (CYCLE_DEADLINE, or the deadline argument, in seconds) passes
+    first, the quotes fetched so far are returned and get_last_cycle_report() shows
+    which bookmakers and sports were missed.
+    """
+    if (engine or FETCH_ENGINE) == "async":
+        return asyncio.run(fetch_all_odds_async(deadline=deadline))
+    
+    logger.info("Fetching odds from all bookmakers")
+    
+    deadline = resolve_deadline(deadline)
+    collector = CycleCollector(deadline)
+    cancel_event = threading.Event()
+    
+    # Use thread pool to fetch odds from all bookmakers concurrently
+    executor = ThreadPoolExecutor(max_workers=len(BOOKMAKERS))
+    try:
+        futures = [
+            executor.submit(run_in_cycle, cancel_event, fetcher, collector)
+            for fetcher in [fetch_bet365_odds, fetch_betmgm_odds, fetch_stake_odds]
+        ]
+        _, pending = wait(futures, timeout=deadline)
+        if pending:
+            logger.warning(f"Fetch cycle deadline of {deadline}s reached with {len(pending)} bookmakers still fetching")
+    finally:
+        # Stragglers see the flag and stop at their next request or budget wait instead of holding up the cycle
+        cancel_event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return finish_cycle(collector)
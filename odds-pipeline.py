@@ -0,0 +1,236 @@
+import os
+import time
+import queue
+import logging
+import threading
+from odds_fetcher import (
+    SPORT_FETCHERS, fetch_bookmaker_odds, run_in_cycle, normalize_event_names, resolve_deadline
+)
+from arbitrage_finder import find_arbitrage_opportunities
+from odds_book import OddsBook
+from opportunity_tracker import OpportunityTracker
+
+logger = logging.getLogger("ArbitrageBot.OddsPipeline")
+
+# Maximum (bookmaker, sport) batches waiting for detection before fetchers block
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+
+# Maximum opportunities waiting to be notified before detection blocks
+NOTIFY_QUEUE_SIZE = int(os.getenv("PIPELINE_NOTIFY_QUEUE_SIZE", "32"))
+
+# Seconds a bookmaker's quotes for a sport count as fresh enough to compare against
+QUOTE_MAX_AGE = float(os.getenv("PIPELINE_QUOTE_MAX_AGE", "180"))
+
+# Marks the end of a stage's input
+_DONE = object()
+
+class StageMetrics:
+    """Latency statistics for one pipeline stage"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = None
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self.last = seconds
+
+    def summary(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "mean": self.total / self.count if self.count else None,
+                "max": self.max if self.count else None,
+                "last": self.last
+            }
+
+class SportBatch:
+    """Quotes fetched for one bookmaker and sport, stamped as they move through the pipeline"""
+
+    def __init__(self, bookmaker, sport, odds, fetch_seconds, error=None):
+        self.bookmaker = bookmaker
+        self.sport = sport
+        self.odds = odds
+        self.fetch_seconds = fetch_seconds
+        self.error = error
+        self.fetched_at = time.time()
+        self.sink = None
+
+class BatchSink:
+    """
+    Collector handed to fetch_bookmaker_odds that pushes each sport's quotes onto the pipeline
+    Once closed at the cycle deadline, batches from fetchers still winding down are dropped.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.closed = False
+
+    def add(self, bookmaker, sport, odds, elapsed, error=None):
+        if self.closed:
+            return
+        batch = SportBatch(bookmaker, sport, odds, elapsed, error)
+        batch.sink = self
+        self.pipeline.submit(batch)
+
+    def close(self):
+        self.closed = True
+
+class OddsPipeline:
+    """
+    Streaming fetch -> detect -> notify pipeline
+    Fetchers push every (bookmaker, sport) batch onto a bounded queue as soon as it
+    is parsed. The detect stage folds each batch into an OddsBook and re-runs
+    detection for a sport whenever a batch arrives and at least two bookmakers
+    have fresh quotes for it. Opportunities the tracker deems worth an alert go
+    onto a second bounded queue drained by the notify stage. Full queues block the
+    stage feeding them, so a slow detector or mail server throttles fetching
+    instead of growing memory.
+    """
+
+    def __init__(self, notify, queue_size=None, notify_queue_size=None, max_age=None, tracker=None):
+        self.notify = notify
+        self.max_age = QUOTE_MAX_AGE if max_age is None else max_age
+        self.batches = queue.Queue(maxsize=queue_size or PIPELINE_QUEUE_SIZE)
+        self.opportunities = queue.Queue(maxsize=notify_queue_size or NOTIFY_QUEUE_SIZE)
+
+        # Kept across cycles so quotes still inside their TTL keep counting
+        self.book = OddsBook(ttl=self.max_age)
+        # Sports are re-checked as each bookmaker arrives; the tracker alerts each opportunity once
+        # and again only on a material change, across cycles as well as within them
+        self.tracker = tracker or OpportunityTracker()
+        self._cycle_started = None
+        self._cycle_opportunities = []
+        self._sink = None
+
+        self.metrics = {
+            "fetch": StageMetrics(),
+            "queue_wait": StageMetrics(),
+            "backpressure": StageMetrics(),
+            "detect": StageMetrics(),
+            "notify": StageMetrics(),
+            "time_to_opportunity": StageMetrics()
+        }
+
+    def submit(self, batch):
+        """Hand a fetched batch to the detect stage, blocking while the queue is full"""
+        self.metrics["fetch"].observe(batch.fetch_seconds)
+        started = time.time()
+        self.batches.put(batch)
+        self.metrics["backpressure"].observe(time.time() - started)
+
+    def detect(self, batch):
+        """Store a batch and run detection for its sport if two or more bookmakers are fresh"""
+        # A failed fetch delists nothing; the bookmaker's last quotes stay until their TTL runs out
+        if batch.error is None:
+            normalize_event_names(batch.odds)
+            self.book.update(batch.odds, listings=[(batch.sport, batch.bookmaker)])
+
+        if len(self.book.get_bookmakers(batch.sport)) < 2:
+            return []
+
+        odds_data = self.book.get_quotes(batch.sport)
+
+        return self.tracker.pending(find_arbitrage_opportunities(odds_data))
+
+    def run_detect(self):
+        """Detect stage: consume batches until the fetchers are done"""
+        while True:
+            batch = self.batches.get()
+            if batch is _DONE:
+                break
+            if batch.sink is not self._sink:
+                # Handed over by a fetcher of an earlier cycle after its deadline
+                continue
+
+            self.metrics["queue_wait"].observe(time.time() - batch.fetched_at)
+            started = time.time()
+            try:
+                opportunities = self.detect(batch)
+            except Exception as e:
+                logger.error(f"Error detecting arbitrage for {batch.bookmaker} {batch.sport}: {str(e)}")
+                opportunities = []
+            self.metrics["detect"].observe(time.time() - started)
+
+            for opportunity in opportunities:
+                self.metrics["time_to_opportunity"].observe(time.time() - self._cycle_started)
+                self._cycle_opportunities.append(opportunity)
+                self.opportunities.put(opportunity)
+
+        self.opportunities.put(_DONE)
+
+    def run_notify(self):
+        """Notify stage: hand each opportunity to the notify callback, which returns False if delivery failed"""
+        while True:
+            opportunity = self.opportunities.get()
+            if opportunity is _DONE:
+                break
+
+            started = time.time()
+            try:
+                delivered = self.notify(opportunity) is not False
+            except Exception as e:
+                logger.error(f"Error notifying opportunity {opportunity['event_name']}: {str(e)}")
+                delivered = False
+            if delivered:
+                self.tracker.mark_sent(opportunity)
+            else:
+                self.tracker.mark_failed(opportunity)
+            self.metrics["notify"].observe(time.time() - started)
+
+    def run_cycle(self, deadline=None):
+        """
+        Fetch every bookmaker once, detecting and notifying as batches arrive
+        Returns the new opportunities found during the cycle
+        """
+        deadline = resolve_deadline(deadline)
+        self._cycle_started = time.time()
+        self._cycle_opportunities = []
+        cancel_event = threading.Event()
+        sink = self._sink = BatchSink(self)
+
+        detector = threading.Thread(target=self.run_detect, name="pipeline-detect", daemon=True)
+        notifier = threading.Thread(target=self.run_notify, name="pipeline-notify", daemon=True)
+        detector.start()
+        notifier.start()
+
+        fetchers = [
+            threading.Thread(
+                target=run_in_cycle, args=(cancel_event, fetch_bookmaker_odds, bookmaker, sink),
+                name=f"pipeline-fetch-{bookmaker}", daemon=True
+            )
+            for bookmaker in SPORT_FETCHERS
+        ]
+        for fetcher in fetchers:
+            fetcher.start()
+
+        for fetcher in fetchers:
+            remaining = None if deadline is None else max(0.0, deadline - (time.time() - self._cycle_started))
+            fetcher.join(remaining)
+        if any(fetcher.is_alive() for fetcher in fetchers):
+            # Stragglers stop at their next request or budget wait; the cycle does not wait for them
+            logger.warning(f"Pipeline cycle deadline of {deadline}s reached, leaving fetchers to finish in the background")
+            sink.close()
+            cancel_event.set()
+
+        self.batches.put(_DONE)
+        detector.join()
+        notifier.join()
+
+        elapsed = time.time() - self._cycle_started
+        logger.info(f"Pipeline cycle finished in {elapsed:.1f}s with {len(self._cycle_opportunities)} new opportunities")
+        for stage, stats in self.get_metrics().items():
+            if stats["count"]:
+                logger.info(f"  {stage}: {stats['count']} samples, mean {stats['mean']:.3f}s, max {stats['max']:.3f}s")
+
+        return list(self._cycle_opportunities)
+
+    def get_metrics(self):
+        """Latency summary for each stage since the pipeline was created"""
+        return {stage: metrics.summary() for stage, metrics in self.metrics.items()}
@@ -0,0 +1,135 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+logger = logging.getLogger("ArbitrageBot.OddsWriter")
+
+# Maximum odds batches waiting to be written before submit() blocks
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "64"))
+
+# Rows gathered into one transaction, and the longest a submitted batch waits for its commit (seconds)
+INGEST_COMMIT_ROWS = int(os.getenv("INGEST_COMMIT_ROWS", "20000"))
+INGEST_FLUSH_INTERVAL = float(os.getenv("INGEST_FLUSH_INTERVAL", "1.0"))
+
+# Marks the end of input
+_STOP = object()
+
+class OddsWriter:
+    """
+    Write-behind ingest of odds history
+    Callers hand batches to submit(), which only queues them. A background thread
+    turns queued batches into rows and commits them in large group transactions,
+    once INGEST_COMMIT_ROWS rows have gathered or the oldest has waited
+    INGEST_FLUSH_INTERVAL seconds. The queue is bounded, so if the disk falls
+    behind, submit() blocks and slows the fetch loop rather than growing memory.
+    close() writes everything still queued.
+    """
+
+    def __init__(self, storage, queue_size=None, commit_rows=None, flush_interval=None):
+        self.storage = storage
+        self.commit_rows = commit_rows or INGEST_COMMIT_ROWS
+        self.flush_interval = INGEST_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.batches = queue.Queue(maxsize=queue_size or INGEST_QUEUE_SIZE)
+        self.stats = {
+            "submitted": 0, "rows": 0, "commits": 0, "failed_rows": 0,
+            "blocked": 0.0, "write_seconds": 0.0, "max_commit_rows": 0
+        }
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self.run, name="odds-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, odds_data):
+        """Queue a batch of quotes (a list or an OddsBatch) for writing, blocking while the queue is full"""
+        if self._closed:
+            raise RuntimeError("OddsWriter is closed")
+        if not len(odds_data):
+            return
+
+        started = time.time()
+        self.batches.put(odds_data)
+        with self._stats_lock:
+            self.stats["submitted"] += 1
+            self.stats["blocked"] += time.time() - started
+
+    def run(self):
+        """Writer thread: gather queued batches into group commits until stopped"""
+        pending = []
+        pending_rows = 0
+        deadline = None
+        waiters = []
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            try:
+                item = self.batches.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None and not stop:
+                try:
+                    records = self.storage.prepare_odds_records(item)
+                except Exception as e:
+                    logger.error(f"Error preparing odds batch for writing: {str(e)}")
+                    records = []
+                pending.extend(records)
+                pending_rows += len(records)
+                if deadline is None:
+                    deadline = time.time() + self.flush_interval
+
+            due = deadline is not None and time.time() >= deadline
+            if pending and (pending_rows >= self.commit_rows or due or waiters or stop):
+                self.commit(pending)
+                pending = []
+                pending_rows = 0
+            if not pending:
+                deadline = None
+
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+            if stop:
+                break
+
+    def commit(self, records):
+        started = time.time()
+        saved = self.storage.save_odds_records(records)
+        elapsed = time.time() - started
+        with self._stats_lock:
+            self.stats["write_seconds"] += elapsed
+            if saved:
+                self.stats["rows"] += len(records)
+                self.stats["commits"] += 1
+                self.stats["max_commit_rows"] = max(self.stats["max_commit_rows"], len(records))
+            else:
+                self.stats["failed_rows"] += len(records)
+        logger.debug(f"Committed {len(records)} odds rows in {elapsed:.3f}s")
+
+    def flush(self, timeout=None):
+        """Wait until everything submitted so far has been written"""
+        done = threading.Event()
+        self.batches.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self.batches.put(_STOP)
+        self._thread.join()
+        stats = self.get_stats()
+        logger.info(f"Odds writer stopped after {stats['rows']} rows in {stats['commits']} commits")
+
+    def get_stats(self):
+        """Ingest counters, including seconds submitters spent blocked on a full queue"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["queued"] = self.batches.qsize()
+        stats["rows_per_commit"] = stats["rows"] / stats["commits"] if stats["commits"] else 0.0
+        return stats
@@ -0,0 +1,116 @@
+import os
+import time
+import logging
+import threading
+from event_matcher import normalize_event_name
+
+logger = logging.getLogger("ArbitrageBot.OpportunityTracker")
+
+# Change in arbitrage percentage (percentage points) since the last alert that warrants a new one
+ALERT_MIN_CHANGE = float(os.getenv("ALERT_MIN_CHANGE", "0.5"))
+
+# Seconds an opportunity must be gone before it counts as closed and alerts again when it reopens
+ALERT_CLOSE_AFTER = float(os.getenv("ALERT_CLOSE_AFTER", "300"))
+
+def opportunity_fingerprint(opportunity):
+    """Identity of an opportunity: the event, market and bookmaker backing each selection"""
+    return (
+        opportunity["sport"],
+        normalize_event_name(opportunity["event_name"], opportunity["sport"]).lower(),
+        opportunity["market"],
+        tuple(sorted((s["selection"], s["bookmaker"]) for s in opportunity["selections"]))
+    )
+
+class OpportunityTracker:
+    """
+    Decides which detected opportunities are worth an alert
+    Each fingerprint remembers the arbitrage percentage it was last alerted at and
+    when it was last seen. An opportunity alerts when it is new, when it reopens
+    after being gone for close_after seconds, or when its percentage has moved at
+    least min_change points from the last alert. Smaller moves, and brief gaps from
+    a bookmaker missing a cycle, are absorbed so a persistent arb alerts once. An
+    alert only counts once it is marked sent, so a failed delivery is retried.
+    """
+
+    def __init__(self, min_change=None, close_after=None):
+        self.min_change = ALERT_MIN_CHANGE if min_change is None else min_change
+        self.close_after = ALERT_CLOSE_AFTER if close_after is None else close_after
+
+        # fingerprint -> {"alerted_pct", "pending_pct", "first_seen", "last_seen", "alerts"}
+        self.state = {}
+        self.counters = {"new": 0, "changed": 0, "suppressed": 0, "closed": 0}
+        self._lock = threading.Lock()
+
+    def pending(self, opportunities, now=None):
+        """
+        Return the opportunities that should be alerted
+        They count as in flight until mark_sent() or mark_failed(), so a repeat
+        detection meanwhile is suppressed instead of alerting twice.
+        """
+        now = time.time() if now is None else now
+        alerts = []
+
+        with self._lock:
+            self._close_stale(now)
+
+            for opportunity in opportunities:
+                fingerprint = opportunity_fingerprint(opportunity)
+                pct = opportunity["arbitrage_percentage"]
+                state = self.state.get(fingerprint)
+
+                if state is None:
+                    state = self.state[fingerprint] = {
+                        "alerted_pct": None, "pending_pct": None, "first_seen": now, "alerts": 0
+                    }
+                state["last_seen"] = now
+
+                reference = state["alerted_pct"] if state["pending_pct"] is None else state["pending_pct"]
+                if reference is not None and abs(pct - reference) < self.min_change:
+                    self.counters["suppressed"] += 1
+                    continue
+
+                state["pending_pct"] = pct
+                alerts.append(opportunity)
+
+        suppressed = len(opportunities) - len(alerts)
+        if suppressed:
+            logger.debug(f"Suppressed {suppressed} repeat alerts for unchanged opportunities")
+        return alerts
+
+    def mark_sent(self, opportunity):
+        """Record that an alert from pending() was delivered"""
+        with self._lock:
+            state = self.state.get(opportunity_fingerprint(opportunity))
+            if state is None:
+                return
+            self.counters["new" if state["alerts"] == 0 else "changed"] += 1
+            state["alerted_pct"] = opportunity["arbitrage_percentage"]
+            state["pending_pct"] = None
+            state["alerts"] += 1
+
+    def mark_failed(self, opportunity):
+        """Record that an alert from pending() was not delivered, so the next detection retries it"""
+        with self._lock:
+            state = self.state.get(opportunity_fingerprint(opportunity))
+            if state is not None:
+                state["pending_pct"] = None
+
+    def filter(self, opportunities, now=None):
+        """Return the opportunities that should be alerted, counting them as delivered"""
+        alerts = self.pending(opportunities, now)
+        for opportunity in alerts:
+            self.mark_sent(opportunity)
+        return alerts
+
+    def _close_stale(self, now):
+        closed = [fp for fp, state in self.state.items() if now - state["last_seen"] > self.close_after]
+        for fingerprint in closed:
+            del self.state[fingerprint]
+        self.counters["closed"] += len(closed)
+
+    def get_stats(self):
+        """Open opportunity count and alert counters"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["open"] = len(self.state)
+            return stats
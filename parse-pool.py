@@ -0,0 +1,57 @@
+import os
+import atexit
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger("ArbitrageBot.ParsePool")
+
+# Worker processes for parsing and normalizing payloads (0 parses in the fetching thread)
+PARSE_PROCESSES = int(os.getenv("PARSE_PROCESSES", "0"))
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+def init_worker():
+    """Prepare a worker process before it imports the fetcher"""
+    # Recording and replay belong to the parent; a worker importing odds_fetcher must not reopen the archive
+    os.environ.pop("RECORD_PATH", None)
+    os.environ.pop("REPLAY_PATH", None)
+
+def parse_in_worker(kind, text, sport):
+    """Parse and normalize a raw payload in a worker, returning a compact OddsBatch"""
+    from odds_fetcher import parse_payload, normalize_event_name
+    from odds_batch import OddsBatch
+
+    batch = parse_payload(kind, text, sport, OddsBatch())
+    return batch.set_normalized_names(normalize_event_name)
+
+def get_parse_pool(workers=None):
+    """Get the shared process pool, creating it (or resizing it) on first use"""
+    global _pool, _pool_workers
+    workers = workers or PARSE_PROCESSES
+
+    with _pool_lock:
+        if _pool is not None and _pool_workers != workers:
+            _pool.shutdown(wait=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+            _pool_workers = workers
+            logger.info(f"Started parse pool with {workers} worker processes")
+        return _pool
+
+def parse_in_pool(kind, text, sport, workers=None):
+    """Parse a payload on the process pool, blocking the calling thread (not the GIL) until done"""
+    return get_parse_pool(workers).submit(parse_in_worker, kind, text, sport).result()
+
+def shutdown_parse_pool():
+    """Stop the worker processes"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+atexit.register(shutdown_parse_pool)
@@ -0,0 +1,175 @@
+import os
+import time
+import logging
+import threading
+from odds_book import ODDS_TTL, ODDS_TTLS
+from arbitrage_finder import find_matching_events
+
+logger = logging.getLogger("ArbitrageBot.PollScheduler")
+
+# Shortest and longest seconds between polls of one bookmaker and sport (the longest is also capped per sport below)
+POLL_FLOOR = float(os.getenv("POLL_FLOOR", "30"))
+POLL_CEILING = float(os.getenv("POLL_CEILING", "240"))
+
+# Best implied probability sum at which a market counts as hot (polled at the floor) and as cold
+POLL_HOT_SUM = float(os.getenv("POLL_HOT_SUM", "1.0"))
+POLL_COLD_SUM = float(os.getenv("POLL_COLD_SUM", "1.1"))
+
+# Share of a bookmaker's prices moving between polls that counts as fully volatile
+POLL_VOLATILE_SHARE = float(os.getenv("POLL_VOLATILE_SHARE", "0.2"))
+
+# Weight of the latest poll in the smoothed volatility (0-1)
+POLL_VOLATILITY_SMOOTHING = 0.3
+
+# Share of a sport's quote TTL its targets may go between polls, leaving time for the fetch
+# itself so a quiet market's quotes are refreshed before the odds book expires them
+POLL_TTL_SHARE = 0.8
+
+class PollTarget:
+    """Polling state of one bookmaker and sport"""
+
+    def __init__(self, bookmaker, sport):
+        self.bookmaker = bookmaker
+        self.sport = sport
+        self.ceiling = None
+        # (normalized name, market, selection) -> odds at the last poll
+        self.prices = {}
+        self.volatility = 0.0
+        self.best_sum = None
+        self.interval = None
+        self.last_poll = None
+        self.next_due = 0.0
+        self.polls = 0
+
+class PollScheduler:
+    """
+    Decides when each (bookmaker, sport) is next polled
+    A target's priority is the larger of how close its markets are to arbitrage
+    (the lowest implied probability sum over the best prices of the events it
+    quotes, between POLL_COLD_SUM and POLL_HOT_SUM) and how volatile its prices
+    have been (the smoothed share that moved between polls). Its interval slides
+    geometrically from the ceiling at priority 0 to the floor at priority 1, so a
+    market nearing arbitrage is watched closely while quiet ones use little of
+    the host's request budget. Each target's ceiling is capped at POLL_TTL_SHARE
+    of its sport's quote TTL (ttl_for, by default ODDS_TTL and ODDS_TTLS).
+    """
+
+    def __init__(self, targets, floor=None, ceiling=None, hot_sum=None, cold_sum=None, volatile_share=None,
+                 ttl_for=None):
+        self.floor = POLL_FLOOR if floor is None else floor
+        self.ceiling = max(self.floor, POLL_CEILING if ceiling is None else ceiling)
+        self.hot_sum = POLL_HOT_SUM if hot_sum is None else hot_sum
+        self.cold_sum = POLL_COLD_SUM if cold_sum is None else cold_sum
+        self.volatile_share = POLL_VOLATILE_SHARE if volatile_share is None else volatile_share
+
+        # Everything is due straight away, so the first pass polls all targets
+        self.targets = {(bookmaker, sport): PollTarget(bookmaker, sport) for bookmaker, sport in targets}
+        ttl_for = ttl_for or (lambda sport: ODDS_TTLS.get(sport, ODDS_TTL))
+        for target in self.targets.values():
+            target.ceiling = max(self.floor, min(self.ceiling, ttl_for(target.sport) * POLL_TTL_SHARE))
+        self._lock = threading.Lock()
+
+    def closeness(self, target):
+        """0 for a market at or above the cold sum, 1 at or below the hot sum"""
+        if target.best_sum is None:
+            return 0.0
+        span = self.cold_sum - self.hot_sum
+        return min(1.0, max(0.0, (self.cold_sum - target.best_sum) / span)) if span > 0 else 0.0
+
+    def priority(self, target):
+        return max(self.closeness(target), min(1.0, target.volatility / self.volatile_share))
+
+    def interval(self, target):
+        """Seconds between polls for a target's current priority"""
+        return self.floor * (target.ceiling / self.floor) ** (1.0 - self.priority(target))
+
+    def _reschedule(self, target):
+        target.interval = self.interval(target)
+        if target.last_poll is not None:
+            target.next_due = target.last_poll + target.interval
+
+    def due(self, now=None):
+        """Targets due for a poll, highest priority first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [target for target in self.targets.values() if target.next_due <= now]
+            due.sort(key=self.priority, reverse=True)
+            return [(target.bookmaker, target.sport) for target in due]
+
+    def next_wakeup(self, now=None):
+        """Seconds until the next target falls due"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return max(0.0, min(target.next_due for target in self.targets.values()) - now)
+
+    def record_poll(self, bookmaker, sport, odds, now=None):
+        """Note a completed poll, updating the target's volatility from the prices it returned"""
+        now = time.time() if now is None else now
+        with self._lock:
+            target = self.targets[(bookmaker, sport)]
+            prices = {(quote["normalized_name"], quote["market"], quote["selection"]): quote["odds"] for quote in odds}
+
+            # Only prices seen both times can have moved; new and pulled listings do not count as movement
+            common = [key for key in prices if key in target.prices]
+            if common:
+                moved = sum(1 for key in common if prices[key] != target.prices[key]) / len(common)
+                target.volatility += POLL_VOLATILITY_SMOOTHING * (moved - target.volatility)
+
+            target.prices = prices
+            target.last_poll = now
+            target.polls += 1
+            self._reschedule(target)
+
+    def record_failure(self, bookmaker, sport, now=None):
+        """Note a failed poll; the target keeps its prices and is retried after its interval"""
+        now = time.time() if now is None else now
+        with self._lock:
+            target = self.targets[(bookmaker, sport)]
+            target.last_poll = now
+            self._reschedule(target)
+
+    def update_closeness(self, quotes, matching=None):
+        """
+        Recompute every target's distance from arbitrage from the current book
+        Events are grouped with find_matching_events, as in detection, so listings
+        joined by fuzzy matching count as one event; each bookmaker quoting an event
+        is credited with the event's best-price implied probability sum. As in
+        detection, an event with a selection nobody prices above zero is incomplete
+        and left out rather than summed without it.
+        """
+        sums = {}
+        for event_odds in find_matching_events(quotes, matching).values():
+            best = {}
+            for quote in event_odds:
+                # Zero-priced selections are kept so the event is known to be incomplete
+                if quote["odds"] > best.get(quote["selection"], float("-inf")):
+                    best[quote["selection"]] = quote["odds"]
+            quoted_by = {(quote["bookmaker"], quote["sport"]) for quote in event_odds}
+
+            if len(best) < 2 or len({bookmaker for bookmaker, _ in quoted_by}) < 2:
+                continue
+            if not all(odds > 0 for odds in best.values()):
+                continue
+            total = sum(1.0 / odds for odds in best.values())
+            for key in quoted_by:
+                if total < sums.get(key, float("inf")):
+                    sums[key] = total
+
+        with self._lock:
+            for key, target in self.targets.items():
+                target.best_sum = sums.get(key)
+                self._reschedule(target)
+
+    def get_stats(self):
+        """Priority and interval of every target"""
+        with self._lock:
+            return {
+                f"{target.bookmaker}/{target.sport}": {
+                    "priority": round(self.priority(target), 3),
+                    "interval": round(target.interval, 1) if target.interval is not None else None,
+                    "best_sum": round(target.best_sum, 4) if target.best_sum is not None else None,
+                    "volatility": round(target.volatility, 3),
+                    "polls": target.polls
+                }
+                for target in self.targets.values()
+            }
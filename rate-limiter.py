@@ -0,0 +1,126 @@
+import time
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger("ArbitrageBot.RateLimiter")
+
+def parse_retry_after(value, default=None):
+    """Seconds to wait from a Retry-After header (delay in seconds or an HTTP date)"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+class TokenBucket:
+    """
+    Request budget for one host: `rate` requests per second with bursts of up to `burst`
+    Implemented as a virtual schedule (GCRA): each caller reserves the next free slot
+    under the lock and then waits outside it, so concurrent callers are spaced out
+    without holding each other up. defer() pushes every slot past a Retry-After.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.next_slot = 0.0
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.waited = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, scale=1.0):
+        """Reserve the next request slot, returning how many seconds to wait for it"""
+        interval = scale / self.rate if self.rate > 0 else 0.0
+        with self._lock:
+            now = time.monotonic()
+            earliest = max(now, self.blocked_until)
+            slot = max(self.next_slot, earliest)
+            start = max(earliest, slot - (self.burst - 1) * interval)
+            self.next_slot = slot + interval
+            wait = start - now
+            self.waited += wait
+            return wait
+
+    def admit(self):
+        """Count a request that went out"""
+        with self._lock:
+            self.requests += 1
+
+    def blocked_for(self):
+        """Seconds left on the current Retry-After hold"""
+        with self._lock:
+            return max(0.0, self.blocked_until - time.monotonic())
+
+    def defer(self, seconds):
+        """Hold every request to the host for the given number of seconds"""
+        with self._lock:
+            self.throttled += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "rate_per_minute": self.rate * 60,
+                "burst": self.burst,
+                "requests": self.requests,
+                "waited": round(self.waited, 3),
+                "throttled": self.throttled
+            }
+
+class HostRateLimiter:
+    """Token buckets per host, configured with each host's permitted request rate"""
+
+    def __init__(self, limits, default_limit=12.0, burst=1):
+        # Limits are in requests per minute
+        self.limits = dict(limits)
+        self.default_limit = default_limit
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.limits.get(host, self.default_limit) / 60.0, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def acquire(self, host, scale=1.0, cancel_event=None):
+        """
+        Wait until the host's budget allows another request
+        Returns False if cancel_event was set while waiting.
+        """
+        bucket = self.bucket(host)
+        while True:
+            wait = bucket.reserve(scale)
+            if wait > 0:
+                if cancel_event is not None:
+                    if cancel_event.wait(wait):
+                        return False
+                else:
+                    time.sleep(wait)
+
+            # A Retry-After that arrived while we waited voids the slot we reserved
+            if bucket.blocked_for() <= 0:
+                bucket.admit()
+                return True
+
+    def defer(self, host, seconds):
+        """Apply a Retry-After to every request to the host"""
+        logger.warning(f"{host} asked us to back off, holding requests for {seconds:.1f}s")
+        self.bucket(host).defer(seconds)
+
+    def get_stats(self):
+        """Get budget usage for every host seen so far"""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {host: bucket.get_stats() for host, bucket in buckets.items()}
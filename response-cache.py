@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("ArbitrageBot.ResponseCache")
+
+class ResponseCache:
+    """
+    Cache of parsed bookmaker responses keyed by request
+    Uses ETag/Last-Modified validators when the server offers them and a hash
+    of the payload otherwise, so unchanged responses skip re-parsing
+    """
+
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(method, url, json_data=None):
+        """Build the cache key for a request"""
+        body = json.dumps(json_data, sort_keys=True) if json_data is not None else ""
+        return f"{method} {url} {body}"
+
+    def conditional_headers(self, key):
+        """Get If-None-Match / If-Modified-Since headers for a cached request"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_parsed(self, key, response, bookmaker, sport, check_content=True):
+        """
+        Return the previously parsed events if the response is unchanged
+        Returns None when the payload is new and must be parsed. Pass
+        check_content=False for streamed responses whose body must not be read here.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            stats = self._stats.setdefault(f"{bookmaker}/{sport}", {"hits": 0, "not_modified": 0, "misses": 0})
+
+            if entry is not None:
+                if response.status_code == 304:
+                    stats["hits"] += 1
+                    stats["not_modified"] += 1
+                    self._entries.move_to_end(key)
+                    return self._refresh(entry["parsed"])
+
+                if check_content and entry["content_hash"] == self._hash(response.content):
+                    stats["hits"] += 1
+                    self._entries.move_to_end(key)
+                    return self._refresh(entry["parsed"])
+
+            stats["misses"] += 1
+            return None
+
+    def store(self, key, response, parsed, check_content=True):
+        """
+        Store the parsed events for a response along with its validators
+        With check_content=False (streamed responses) no payload hash is kept, so the
+        entry is only reused on a 304 Not Modified.
+        """
+        with self._lock:
+            self._entries[key] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_hash": self._hash(response.content) if check_content else None,
+                "parsed": parsed
+            }
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self):
+        """Get hit/miss counters per bookmaker and sport"""
+        with self._lock:
+            return {key: dict(value) for key, value in self._stats.items()}
+
+    def clear(self):
+        """Drop all cached responses and counters"""
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    @staticmethod
+    def _hash(content):
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _refresh(parsed):
+        # The prices are confirmed current, so hand out copies stamped with the fetch time
+        now = time.time()
+        return [dict(item, timestamp=now) for item in parsed]
@@ -0,0 +1,177 @@
+import os
+import gzip
+import json
+import time
+import atexit
+import base64
+import logging
+import threading
+from collections import deque
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger("ArbitrageBot.ResponseRecorder")
+
+# Headers describing the wire encoding, which no longer apply to the decoded body we archive
+SKIPPED_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection"}
+
+def request_key(method, url, json_data=None):
+    """Key identifying a request in the archive"""
+    body = json.dumps(json_data, sort_keys=True) if json_data is not None else ""
+    return f"{method} {url} {body}"
+
+class ResponseRecorder:
+    """
+    Archives raw bookmaker responses and serves them back for offline runs
+    In record mode every response passing through make_request is appended to a
+    gzip-compressed JSON lines archive with its URL, status, headers and timing.
+    In replay mode make_request is answered from that archive in recorded order,
+    waiting the recorded time divided by `speed` (0 means no waiting).
+    """
+
+    def __init__(self):
+        self.mode = None
+        self.path = None
+        self.speed = 1.0
+        self._archive = None
+        self._entries = {}
+        self._last_full = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        self.missing = 0
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def start_recording(self, path):
+        """Start appending responses to the archive at path"""
+        self.stop()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._archive = gzip.open(path, "at", encoding="utf-8")
+        self.path = path
+        self.mode = "record"
+        logger.info(f"Recording responses to {path}")
+
+    def start_replay(self, path, speed=1.0):
+        """Serve responses from the archive at path, at `speed` times the recorded pace"""
+        self.stop()
+        entries = {}
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            for line in archive:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = request_key(entry["method"], entry["url"], entry.get("json_data"))
+                entries.setdefault(key, deque()).append(entry)
+
+        self._entries = entries
+        self._last_full = {}
+        self.path = path
+        self.speed = speed
+        self.mode = "replay"
+        logger.info(f"Replaying {sum(len(q) for q in entries.values())} responses from {path} at {speed}x")
+
+    def stop(self):
+        """Stop recording or replaying"""
+        with self._lock:
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+            self.mode = None
+
+    def record(self, method, url, json_data, response, elapsed):
+        """Append a response to the archive"""
+        entry = {
+            "recorded_at": time.time(),
+            "method": method,
+            "url": url,
+            "json_data": json_data,
+            "status": response.status_code,
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in SKIPPED_HEADERS
+            },
+            "encoding": response.encoding,
+            "elapsed": elapsed,
+            "body": base64.b64encode(response.content).decode("ascii")
+        }
+        line = json.dumps(entry) + "\n"
+
+        with self._lock:
+            if self._archive is not None:
+                self._archive.write(line)
+                self.recorded += 1
+
+    def replay(self, method, url, json_data=None, headers=None):
+        """
+        Get the next archived response for a request, or None if none was recorded
+        Entries for a request are served in recorded order, the last one repeating
+        once the archive runs out.
+        """
+        key = request_key(method, url, json_data)
+        conditional = bool(headers) and any(
+            name in headers for name in ("If-None-Match", "If-Modified-Since")
+        )
+
+        with self._lock:
+            queue = self._entries.get(key)
+            if not queue:
+                self.missing += 1
+                return None
+
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+
+            # A recorded 304 only makes sense if this run also sent validators
+            if entry["status"] == 304 and not conditional:
+                entry = self._last_full.get(key, entry)
+            elif entry["status"] != 304:
+                self._last_full[key] = entry
+            self.replayed += 1
+
+        if self.speed:
+            time.sleep(entry["elapsed"] / self.speed)
+
+        return self.build_response(entry)
+
+    @staticmethod
+    def build_response(entry):
+        """Rebuild a requests.Response from an archive entry"""
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.url = entry["url"]
+        response.encoding = entry.get("encoding")
+        response._content = base64.b64decode(entry["body"])
+        response._content_consumed = True
+        return response
+
+    def get_stats(self):
+        """Get counts of recorded, replayed and missing responses"""
+        return {
+            "mode": self.mode,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "missing": self.missing
+        }
+
+def recorder_from_env():
+    """Create a recorder configured from RECORD_PATH / REPLAY_PATH / REPLAY_SPEED"""
+    recorder = ResponseRecorder()
+    replay_path = os.getenv("REPLAY_PATH")
+    record_path = os.getenv("RECORD_PATH")
+
+    if replay_path:
+        recorder.start_replay(replay_path, float(os.getenv("REPLAY_SPEED", "1.0")))
+    elif record_path:
+        recorder.start_recording(record_path)
+
+    atexit.register(recorder.stop)
+    return recorder
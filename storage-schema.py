@@ -0,0 +1,226 @@
+import time
+import logging
+
+logger = logging.getLogger("ArbitrageBot.StorageSchema")
+
+# Schema version kept in PRAGMA user_version; databases from before versioning read 0
+SCHEMA_VERSION = 3
+
+# Version 1: every row carries its names as text and its time as a local "%Y-%m-%d %H:%M:%S" string
+SCHEMA_V1 = [
+    '''
+    CREATE TABLE IF NOT EXISTS arbitrage_opportunities (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_name TEXT,
+        sport TEXT,
+        market TEXT,
+        arbitrage_percentage REAL,
+        guaranteed_profit REAL,
+        timestamp TEXT,
+        details TEXT,
+        notified INTEGER DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS odds_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bookmaker TEXT,
+        sport TEXT,
+        event_name TEXT,
+        market TEXT,
+        selection TEXT,
+        odds REAL,
+        timestamp TEXT
+    )
+    '''
+]
+
+# Version 2: names live once in dimension tables and rows refer to them by integer key;
+# times are epoch seconds
+DIMENSION_TABLES = ("bookmakers", "sports", "markets", "selections")
+
+SCHEMA_V2_TABLES = [
+    f'''
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    '''
+    for table in DIMENSION_TABLES
+] + [
+    # Unique on (name, sport_id) so events can also be looked up by name alone
+    '''
+    CREATE TABLE events (
+        id INTEGER PRIMARY KEY,
+        sport_id INTEGER NOT NULL REFERENCES sports(id),
+        name TEXT NOT NULL,
+        UNIQUE (name, sport_id)
+    )
+    ''',
+    # sport_id repeats the event's sport so the per-sport counts never join events
+    '''
+    CREATE TABLE arbitrage_opportunities (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_id INTEGER NOT NULL REFERENCES events(id),
+        sport_id INTEGER NOT NULL REFERENCES sports(id),
+        market_id INTEGER NOT NULL REFERENCES markets(id),
+        arbitrage_percentage REAL,
+        guaranteed_profit REAL,
+        timestamp INTEGER NOT NULL,
+        details TEXT,
+        notified INTEGER DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TABLE odds_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bookmaker_id INTEGER NOT NULL REFERENCES bookmakers(id),
+        event_id INTEGER NOT NULL REFERENCES events(id),
+        market_id INTEGER NOT NULL REFERENCES markets(id),
+        selection_id INTEGER NOT NULL REFERENCES selections(id),
+        odds REAL,
+        timestamp INTEGER NOT NULL
+    )
+    '''
+]
+
+# odds_history gets no secondary index: on the hottest insert path each would cost a page write
+# per row somewhere in its tree. Its readers go by id, which is time order.
+SCHEMA_V2_INDEXES = [
+    # Newest opportunities first (get_recent_opportunities, CSV export)
+    "CREATE INDEX idx_opportunities_timestamp ON arbitrage_opportunities (timestamp)",
+    # Counts per sport, read from the index alone
+    "CREATE INDEX idx_opportunities_sport ON arbitrage_opportunities (sport_id)",
+    # Average and best opportunity, read from the index alone
+    '''
+    CREATE INDEX idx_opportunities_percentage
+    ON arbitrage_opportunities (arbitrage_percentage, guaranteed_profit, event_id, timestamp)
+    '''
+]
+
+# Version 3: facts about how the data was written, e.g. the keyframe interval of delta-encoded odds history
+SCHEMA_V3_TABLES = [
+    '''
+    CREATE TABLE storage_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    '''
+]
+
+def _tables(cursor):
+    return {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def _create_v2(cursor):
+    for statement in SCHEMA_V2_TABLES + SCHEMA_V2_INDEXES:
+        cursor.execute(statement)
+
+def _migrate_to_v2(cursor):
+    """Move version 1 rows into dimension tables, integer keys and epoch timestamps, keeping their ids"""
+    cursor.execute("ALTER TABLE arbitrage_opportunities RENAME TO arbitrage_opportunities_v1")
+    cursor.execute("ALTER TABLE odds_history RENAME TO odds_history_v1")
+    for statement in SCHEMA_V2_TABLES:
+        cursor.execute(statement)
+
+    # Names from both tables; NULL names are not kept, nor are the rows that carry them
+    cursor.execute("INSERT OR IGNORE INTO bookmakers (name) SELECT DISTINCT bookmaker FROM odds_history_v1")
+    cursor.execute("INSERT OR IGNORE INTO selections (name) SELECT DISTINCT selection FROM odds_history_v1")
+    for table, column in (("sports", "sport"), ("markets", "market")):
+        cursor.execute(f'''
+        INSERT OR IGNORE INTO {table} (name)
+        SELECT {column} FROM odds_history_v1 UNION SELECT {column} FROM arbitrage_opportunities_v1
+        ''')
+    cursor.execute('''
+    INSERT OR IGNORE INTO events (sport_id, name)
+    SELECT s.id, v.event_name
+    FROM (SELECT sport, event_name FROM odds_history_v1
+          UNION SELECT sport, event_name FROM arbitrage_opportunities_v1) v
+    JOIN sports s ON s.name = v.sport
+    ''')
+
+    # The 'utc' modifier reads the stored local time and converts it to UTC, as epochs are
+    cursor.execute('''
+    INSERT INTO odds_history (id, bookmaker_id, event_id, market_id, selection_id, odds, timestamp)
+    SELECT o.id, b.id, e.id, m.id, sel.id, o.odds, CAST(strftime('%s', o.timestamp, 'utc') AS INTEGER)
+    FROM odds_history_v1 o
+    JOIN bookmakers b ON b.name = o.bookmaker
+    JOIN sports s ON s.name = o.sport
+    JOIN events e ON e.name = o.event_name AND e.sport_id = s.id
+    JOIN markets m ON m.name = o.market
+    JOIN selections sel ON sel.name = o.selection
+    WHERE o.timestamp IS NOT NULL
+    ORDER BY o.id
+    ''')
+    odds_rows = cursor.rowcount
+    cursor.execute('''
+    INSERT INTO arbitrage_opportunities
+    (id, event_id, sport_id, market_id, arbitrage_percentage, guaranteed_profit, timestamp, details, notified)
+    SELECT o.id, e.id, s.id, m.id, o.arbitrage_percentage, o.guaranteed_profit,
+           CAST(strftime('%s', o.timestamp, 'utc') AS INTEGER), o.details, o.notified
+    FROM arbitrage_opportunities_v1 o
+    JOIN sports s ON s.name = o.sport
+    JOIN events e ON e.name = o.event_name AND e.sport_id = s.id
+    JOIN markets m ON m.name = o.market
+    WHERE o.timestamp IS NOT NULL
+    ORDER BY o.id
+    ''')
+    opportunity_rows = cursor.rowcount
+
+    dropped = cursor.execute("SELECT COUNT(*) FROM odds_history_v1").fetchone()[0] - odds_rows
+    dropped += cursor.execute("SELECT COUNT(*) FROM arbitrage_opportunities_v1").fetchone()[0] - opportunity_rows
+    if dropped:
+        logger.warning(f"Dropped {dropped} rows with missing names or timestamps while migrating")
+    logger.info(f"Migrated {odds_rows} odds rows and {opportunity_rows} opportunities")
+
+    # Indexes are built once over the copied rows rather than updated row by row
+    for statement in SCHEMA_V2_INDEXES:
+        cursor.execute(statement)
+    cursor.execute("DROP TABLE odds_history_v1")
+    cursor.execute("DROP TABLE arbitrage_opportunities_v1")
+
+def _migrate_to_v3(cursor):
+    """Add the storage metadata table"""
+    for statement in SCHEMA_V3_TABLES:
+        cursor.execute(statement)
+
+# Migrations by the version they produce; each runs on the schema of the version before it
+MIGRATIONS = {2: _migrate_to_v2, 3: _migrate_to_v3}
+
+def migrate(conn):
+    """
+    Create the schema, or bring an older database up to SCHEMA_VERSION
+    Runs in one immediate transaction, so a migration is all or nothing and
+    concurrent bots opening the same old database migrate it only once.
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            tables = _tables(cursor)
+            if "odds_history" in tables or "arbitrage_opportunities" in tables:
+                # Created before the schema was versioned; make sure both version 1 tables are there
+                for statement in SCHEMA_V1:
+                    cursor.execute(statement)
+                version = 1
+            else:
+                # A new database starts at version 2; the later migrations only add to it
+                _create_v2(cursor)
+                version = 2
+                logger.info(f"Created database schema version {version}")
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"Database schema version {version} is newer than this bot's {SCHEMA_VERSION}")
+
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            started = time.time()
+            logger.info(f"Migrating database schema from version {target - 1} to {target}")
+            MIGRATIONS[target](cursor)
+            logger.info(f"Migrated database schema to version {target} in {time.time() - started:.1f}s")
+            version = target
+
+        cursor.execute(f"PRAGMA user_version = {version}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return version
@@ -0,0 +1,124 @@
+import codecs
+import json
+import logging
+
+logger = logging.getLogger("ArbitrageBot.StreamingJSON")
+
+_WHITESPACE = " \t\n\r"
+
+# Drop the consumed part of the buffer once it grows past this many characters
+_COMPACT_THRESHOLD = 64 * 1024
+
+class _ChunkReader:
+    """Text buffer fed incrementally from an iterable of byte chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder_json = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self):
+        """Read the next chunk into the buffer, returning False at end of stream"""
+        if self.exhausted:
+            return False
+
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            if self.pos > _COMPACT_THRESHOLD:
+                self.buffer = self.buffer[self.pos:]
+                self.pos = 0
+            self.buffer += self._decoder.decode(chunk)
+            return True
+
+        self.buffer += self._decoder.decode(b"", final=True)
+        self.exhausted = True
+        return False
+
+    def peek(self):
+        """Skip whitespace and return the next character, or None at end of stream"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return None
+
+    def peek_or_fail(self):
+        """Like peek(), but the stream ending here means the document was cut short"""
+        char = self.peek()
+        if char is None:
+            raise ValueError(f"JSON stream ended early at offset {self.pos}")
+        return char
+
+    def expect(self, char):
+        """Consume the given structural character"""
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of JSON stream")
+        self.pos += 1
+
+    def decode_value(self):
+        """Decode one complete JSON value at the current position"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder_json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # A value ending exactly at the buffer edge may be a truncated number
+            if end == len(self.buffer) and not self.exhausted and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+def iter_json_items(chunks, path):
+    """
+    Yield the elements of the array found at `path` in a JSON document, one at a time
+    `chunks` is an iterable of bytes (e.g. response.iter_content()) and `path` a sequence
+    of object keys, so peak memory is bounded by the largest single element rather than
+    the whole document. Yields nothing if the path is not present, and raises ValueError
+    if the stream ends before the document does, so a truncated body is never taken as
+    a short but complete list.
+    """
+    reader = _ChunkReader(chunks)
+
+    for depth, target in enumerate(path):
+        if reader.peek_or_fail() != "{":
+            return
+        reader.expect("{")
+
+        # Walk the object's keys, skipping values until the target key is found
+        while True:
+            char = reader.peek_or_fail()
+            if char == "}":
+                return
+            if char == ",":
+                reader.pos += 1
+                continue
+
+            key = reader.decode_value()
+            reader.expect(":")
+            if key == target:
+                break
+            reader.decode_value()
+
+    if reader.peek_or_fail() != "[":
+        return
+    reader.expect("[")
+
+    while True:
+        char = reader.peek_or_fail()
+        if char == "]":
+            return
+        if char == ",":
+            reader.pos += 1
+            continue
+        yield reader.decode_value()
@@ -0,0 +1,332 @@
+"""
+Local stand-in for the Bet365, BetMGM and Stake endpoints, for load testing
+
+Serves payloads shaped like the ones the odds_fetcher parsers expect, generated
+from a synthetic world of events whose prices move over time and which has
+arbitrage opportunities injected at a configurable rate. Point the fetchers at
+it with BET365_BASE_URL / BETMGM_BASE_URL / STAKE_BASE_URL / STAKE_API_URL.
+
+Usage: python synthetic-bookmaker.py [--port 8365] [--events 20] [--markets 3]
+                                     [--movement-rate 0.1] [--arb-rate 0.01] [--tick 5]
+"""
+import argparse
+import hashlib
+import html
+import json
+import logging
+import random
+import threading
+import time
+from flask import Flask, Response, jsonify, request
+from odds_fetcher import SPORTS, get_betmgm_sport_id
+
+logger = logging.getLogger("ArbitrageBot.SyntheticBookmaker")
+
+BOOKMAKERS = ["bet365", "betmgm", "stake"]
+
+# Each bookmaker writes event names its own way
+NAME_SEPARATORS = {"bet365": " v ", "betmgm": " @ ", "stake": " - "}
+
+# Sports with a draw outcome
+THREE_WAY_SPORTS = {"soccer", "hockey", "rugby"}
+
+# Bookmaker margin applied to fair prices
+MARGIN = 1.06
+
+# Implied probability sum of an injected arbitrage (best prices across bookmakers)
+ARBITRAGE_IMPLIED_SUM = 0.93
+
+class SyntheticWorld:
+    """Events with fair probabilities and per-bookmaker prices that move every tick"""
+
+    def __init__(self, events_per_sport=20, markets=3, movement_rate=0.1, arb_rate=0.01,
+                 tick_seconds=5.0, failure_rate=0.0, seed=None):
+        self.events_per_sport = events_per_sport
+        self.markets = markets
+        self.movement_rate = movement_rate
+        self.arb_rate = arb_rate
+        self.tick_seconds = tick_seconds
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.last_tick = time.time()
+        self.ticks = 0
+        self.injected = []
+        self.events = {sport: [self._new_event(sport, i) for i in range(events_per_sport)] for sport in SPORTS}
+
+        # Start with some arbitrages open so the first fetch has something to find
+        for sport, events in self.events.items():
+            for event in events:
+                if self.rng.random() < self.arb_rate:
+                    self._inject_arbitrage(sport, event)
+
+    def _new_event(self, sport, i):
+        home, away = f"{sport.title()} Home {i}", f"{sport.title()} Away {i}"
+        selections = [home, away] + (["Draw"] if sport in THREE_WAY_SPORTS else [])
+        weights = [self.rng.uniform(0.5, 1.5) for _ in selections]
+        total = sum(weights)
+        event = {
+            "id": f"{sport}-{i}",
+            "home": home,
+            "away": away,
+            "selections": selections,
+            "probabilities": [w / total for w in weights],
+            "prices": {},
+            "arbitrage": None
+        }
+        self._reprice(event)
+        return event
+
+    def _reprice(self, event):
+        """Quote fresh prices with each bookmaker's margin and noise"""
+        event["prices"] = {
+            bookmaker: [
+                round(1 / (p * MARGIN * self.rng.uniform(0.97, 1.03)), 2)
+                for p in event["probabilities"]
+            ]
+            for bookmaker in BOOKMAKERS
+        }
+        event["arbitrage"] = None
+
+    def _inject_arbitrage(self, sport, event):
+        """Give each selection its best price at a different bookmaker so the book sums below 1"""
+        for i, p in enumerate(event["probabilities"]):
+            bookmaker = BOOKMAKERS[i % len(BOOKMAKERS)]
+            event["prices"][bookmaker][i] = round(1 / (p * ARBITRAGE_IMPLIED_SUM), 2)
+        event["arbitrage"] = time.time()
+        self.injected.append({
+            "sport": sport,
+            "event_id": event["id"],
+            "home": event["home"],
+            "away": event["away"],
+            "injected_at": event["arbitrage"]
+        })
+
+    def advance(self):
+        """Apply any ticks that are due: move prices and inject new arbitrages"""
+        with self.lock:
+            now = time.time()
+            while now - self.last_tick >= self.tick_seconds:
+                self.last_tick += self.tick_seconds
+                self.ticks += 1
+                for sport, events in self.events.items():
+                    for event in events:
+                        if self.rng.random() < self.movement_rate:
+                            self._reprice(event)
+                        if self.rng.random() < self.arb_rate:
+                            self._inject_arbitrage(sport, event)
+
+    def snapshot(self, sport):
+        """Events for a sport with their current prices"""
+        self.advance()
+        with self.lock:
+            return [
+                dict(event, prices={b: list(p) for b, p in event["prices"].items()})
+                for event in self.events.get(sport, [])
+            ]
+
+    def should_fail(self):
+        return self.failure_rate and self.rng.random() < self.failure_rate
+
+def event_name(event, bookmaker):
+    return f"{event['home']}{NAME_SEPARATORS[bookmaker]}{event['away']}"
+
+def filler_markets(event, count):
+    """Non-moneyline markets the parsers skip, to give payloads realistic bulk"""
+    return [
+        {
+            "name": f"Total Points {2.5 + m}",
+            "selections": [{"name": f"Over {2.5 + m}", "odds": 1.9}, {"name": f"Under {2.5 + m}", "odds": 1.9}]
+        }
+        for m in range(max(count - 1, 0))
+    ]
+
+def bet365_payload(events, markets):
+    return {"events": [
+        {
+            "id": f"bet365-{event['id']}",
+            "name": event_name(event, "bet365"),
+            "markets": [{
+                "type": "moneyline",
+                "selections": [
+                    {"name": name, "odds": price}
+                    for name, price in zip(event["selections"], event["prices"]["bet365"])
+                ]
+            }] + [
+                {"type": "total", "selections": m["selections"]} for m in filler_markets(event, markets)
+            ]
+        }
+        for event in events
+    ]}
+
+def betmgm_payload(events, markets):
+    return {"fixtures": [
+        {
+            "id": f"betmgm-{event['id']}",
+            "name": event_name(event, "betmgm"),
+            "markets": [{
+                "name": "Money Line",
+                "selections": [
+                    {"name": name, "price": {"decimal": price}}
+                    for name, price in zip(event["selections"], event["prices"]["betmgm"])
+                ]
+            }] + [
+                {
+                    "name": m["name"],
+                    "selections": [{"name": s["name"], "price": {"decimal": s["odds"]}} for s in m["selections"]]
+                }
+                for m in filler_markets(event, markets)
+            ]
+        }
+        for event in events
+    ]}
+
+def stake_matches(events, markets, price_key):
+    return [
+        {
+            "id": f"stake-{event['id']}",
+            "name": event_name(event, "stake"),
+            "markets": [{
+                "id": f"stake-{event['id']}-ml",
+                "name": "Match Winner",
+                "selections": [
+                    {"id": f"stake-{event['id']}-{i}", "name": name, price_key: price}
+                    for i, (name, price) in enumerate(zip(event["selections"], event["prices"]["stake"]))
+                ]
+            }] + [
+                {
+                    "id": f"stake-{event['id']}-{m['name']}",
+                    "name": m["name"],
+                    "selections": [{"name": s["name"], price_key: s["odds"]} for s in m["selections"]]
+                }
+                for m in filler_markets(event, markets)
+            ]
+        }
+        for event in events
+    ]
+
+def bet365_html(events):
+    containers = "".join(
+        f'<div class="gl-Market_Container"><div class="rcl-MarketHeaderLabel">{html.escape(event_name(event, "bet365"))}</div>'
+        f'<div class="gl-MarketGroup"><div class="gl-MarketGroupButton_Text">Match Winner</div>'
+        + "".join(
+            f'<div class="gl-Participant"><span class="gl-Participant_Name">{html.escape(name)}</span>'
+            f'<span class="gl-Participant_Odds">{price}</span></div>'
+            for name, price in zip(event["selections"], event["prices"]["bet365"])
+        )
+        + '</div></div>'
+        for event in events
+    )
+    return f"<html><body>{containers}</body></html>"
+
+def betmgm_html(events):
+    containers = "".join(
+        f'<div class="option-group"><div class="event-header-description">{html.escape(event_name(event, "betmgm"))}</div>'
+        + "".join(
+            f'<div class="market-option"><span class="option-name">{html.escape(name)}</span>'
+            f'<span class="option-price">{price}</span></div>'
+            for name, price in zip(event["selections"], event["prices"]["betmgm"])
+        )
+        + '</div>'
+        for event in events
+    )
+    return f"<html><body>{containers}</body></html>"
+
+def stake_html(events, markets):
+    data = {"props": {"pageProps": {"matches": stake_matches(events, markets, "price")}}}
+    script = json.dumps(data).replace("</", "<\\/")
+    return f'<html><head><script type="application/json">{script}</script></head><body></body></html>'
+
+def conditional_response(body, content_type):
+    """Serve a body with an ETag, answering 304 when the client already has it"""
+    etag = '"' + hashlib.blake2b(body.encode(), digest_size=12).hexdigest() + '"'
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status=304, headers={"ETag": etag})
+    return Response(body, content_type=content_type, headers={"ETag": etag})
+
+def create_app(world):
+    """Build the Flask app serving the synthetic bookmaker endpoints"""
+    app = Flask(__name__)
+    sport_by_betmgm_id = {get_betmgm_sport_id(sport): sport for sport in SPORTS}
+
+    def unavailable():
+        return Response("Service Unavailable", status=503)
+
+    @app.route("/SportsBook.API/web")
+    def bet365_api():
+        if world.should_fail():
+            return unavailable()
+        events = world.snapshot(request.args.get("sport", ""))
+        return conditional_response(json.dumps(bet365_payload(events, world.markets)), "application/json")
+
+    @app.route("/")
+    def bet365_page():
+        # The sport is in the URL fragment, which browsers never send, so serve soccer
+        return conditional_response(bet365_html(world.snapshot("soccer")), "text/html")
+
+    @app.route("/cds-api/bettingoffer/fixtures")
+    def betmgm_api():
+        if world.should_fail():
+            return unavailable()
+        sport = sport_by_betmgm_id.get(request.args.get("sportIds", ""), "")
+        events = world.snapshot(sport)
+        return conditional_response(json.dumps(betmgm_payload(events, world.markets)), "application/json")
+
+    @app.route("/en/sports/<sport>")
+    def betmgm_page(sport):
+        return conditional_response(betmgm_html(world.snapshot(sport)), "text/html")
+
+    @app.route("/graphql", methods=["POST"])
+    def stake_graphql():
+        if world.should_fail():
+            return unavailable()
+        sport = (request.get_json(silent=True) or {}).get("variables", {}).get("sport", "")
+        events = world.snapshot(sport)
+        data = {"data": {"sport": {
+            "id": sport,
+            "name": sport.title(),
+            "matches": stake_matches(events, world.markets, "odds")
+        }}}
+        return conditional_response(json.dumps(data), "application/json")
+
+    @app.route("/sports/<sport>")
+    def stake_page(sport):
+        return conditional_response(stake_html(world.snapshot(sport), world.markets), "text/html")
+
+    @app.route("/_synthetic/arbitrages")
+    def injected_arbitrages():
+        """Ground truth: every arbitrage injected so far and those still open, with injection times"""
+        world.advance()
+        with world.lock:
+            active = [
+                {"sport": sport, "event_id": event["id"], "home": event["home"],
+                 "away": event["away"], "injected_at": event["arbitrage"]}
+                for sport, events in world.events.items()
+                for event in events
+                if event["arbitrage"] is not None
+            ]
+            return jsonify({"ticks": world.ticks, "injected": list(world.injected), "active": active})
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8365)
+    parser.add_argument("--events", type=int, default=20, help="events per sport")
+    parser.add_argument("--markets", type=int, default=3, help="markets per event (one is moneyline)")
+    parser.add_argument("--movement-rate", type=float, default=0.1, help="fraction of events repriced per tick")
+    parser.add_argument("--arb-rate", type=float, default=0.01, help="chance per event per tick of an arbitrage")
+    parser.add_argument("--tick", type=float, default=5.0, help="seconds between price ticks")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of API requests answered 503")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    world = SyntheticWorld(args.events, args.markets, args.movement_rate, args.arb_rate,
+                           args.tick, args.failure_rate, args.seed)
+    logger.info(f"Serving {args.events} events per sport for {len(SPORTS)} sports on {args.host}:{args.port}")
+    create_app(world).run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arbitrage_finder import IncrementalArbitrageEngine, find_arbitrage_opportunities
+from odds_fetcher import normalize_event_names
+
+def quote(bookmaker, event_name, selection, odds):
+    return {
+        "bookmaker": bookmaker, "sport": "soccer", "event_id": f"{bookmaker}_{event_name}",
+        "event_name": event_name, "market": "moneyline", "selection": selection,
+        "odds": odds, "timestamp": 0.0, "normalized_name": ""
+    }
+
+def summary(opportunities):
+    return sorted(
+        (round(o["arbitrage_percentage"], 6), sorted((s["bookmaker"], s["odds"]) for s in o["selections"]))
+        for o in opportunities
+    )
+
+def test_incremental_matches_stateless_across_rematch():
+    # bet365 alone in cycle 1; betmgm lists the same match under another name in cycle 2,
+    # completing a cross-book arbitrage while bet365's unchanged price moves to the merged event
+    bet365 = [quote("bet365", "Chelsea vs Man Utd", "Chelsea", 2.4),
+              quote("bet365", "Chelsea vs Man Utd", "Man Utd", 1.5)]
+    betmgm = [quote("betmgm", "Chelsea vs Manchester United", "Chelsea", 1.6),
+              quote("betmgm", "Chelsea vs Manchester United", "Manchester United", 2.5)]
+    cycles = [bet365, bet365 + betmgm, bet365 + betmgm]
+
+    engine = IncrementalArbitrageEngine(matching="fuzzy")
+    for number, cycle in enumerate(cycles, 1):
+        odds_data = normalize_event_names([dict(q) for q in cycle])
+        expected = find_arbitrage_opportunities([dict(q) for q in odds_data], engine="python", matching="fuzzy")
+        assert summary(engine.update([dict(q) for q in odds_data])) == summary(expected), f"cycle {number}"
+    assert len(expected) == 1
+
+def test_incremental_keeps_unchanged_prices_of_moved_listings():
+    # Only betmgm is in the update; bet365's listing keeps its last price under the merged event
+    engine = IncrementalArbitrageEngine(matching="fuzzy")
+    engine.update(normalize_event_names([quote("bet365", "Chelsea vs Man Utd", "Chelsea", 2.4),
+                                         quote("bet365", "Chelsea vs Man Utd", "Man Utd", 1.5)]))
+    opportunities = engine.update(
+        normalize_event_names([quote("betmgm", "Chelsea vs Manchester United", "Chelsea", 1.6),
+                               quote("betmgm", "Chelsea vs Manchester United", "Manchester United", 2.5)]),
+        snapshot=False
+    )
+    assert len(opportunities) == 1
@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from odds_fetcher import normalize_event_names
+from poll_scheduler import PollScheduler
+
+def quote(bookmaker, event_name, selection, odds):
+    return {
+        "bookmaker": bookmaker, "sport": "soccer", "event_id": f"{bookmaker}_{event_name}",
+        "event_name": event_name, "market": "moneyline", "selection": selection,
+        "odds": odds, "timestamp": 0.0, "normalized_name": ""
+    }
+
+def test_closeness_covers_events_joined_by_fuzzy_matching():
+    # The bookmakers list one match under different names, so only fuzzy matching joins them
+    quotes = normalize_event_names([
+        quote("bet365", "Man Utd vs Chelsea", "Man Utd", 2.4),
+        quote("bet365", "Man Utd vs Chelsea", "Chelsea", 1.5),
+        quote("betmgm", "Manchester United vs Chelsea", "Manchester United", 1.6),
+        quote("betmgm", "Manchester United vs Chelsea", "Chelsea", 2.5)
+    ])
+    scheduler = PollScheduler([("bet365", "soccer"), ("betmgm", "soccer"), ("stake", "soccer")])
+
+    scheduler.update_closeness(quotes, matching="fuzzy")
+
+    expected = 1 / 2.4 + 1 / 2.5
+    assert abs(scheduler.targets[("bet365", "soccer")].best_sum - expected) < 1e-9
+    assert abs(scheduler.targets[("betmgm", "soccer")].best_sum - expected) < 1e-9
+    assert scheduler.targets[("stake", "soccer")].best_sum is None